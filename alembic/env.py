@@ -9,7 +9,7 @@ from sqlalchemy.ext.asyncio import create_async_engine
 
 from app.config import get_settings
 from app.database import Base
-from app.models import Category, Link, SiteSettings, TokenBlacklist, UpdateLog, VisitLog
+from app.models import ArticleIndexEntry, Category, Link, LogCounter, SiteSettings, TokenBlacklist, UpdateLog, UserAgent, VisitLog, VisitRollup
 
 config = context.config
 settings = get_settings()
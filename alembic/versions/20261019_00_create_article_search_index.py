@@ -0,0 +1,64 @@
+"""create article full-text search index
+
+Revision ID: 20261019_00
+Revises: 20260324_03
+Create Date: 2026-10-19 00:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_00"
+down_revision = "20260324_03"
+branch_labels = None
+depends_on = None
+
+FTS_STATEMENTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5("
+    "title, path, body, content='article_index', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS article_index_ai AFTER INSERT ON article_index BEGIN "
+    "INSERT INTO article_search(rowid, title, path, body) VALUES (new.id, new.title, new.path, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS article_index_ad AFTER DELETE ON article_index BEGIN "
+    "INSERT INTO article_search(article_search, rowid, title, path, body) "
+    "VALUES ('delete', old.id, old.title, old.path, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS article_index_au AFTER UPDATE ON article_index BEGIN "
+    "INSERT INTO article_search(article_search, rowid, title, path, body) "
+    "VALUES ('delete', old.id, old.title, old.path, old.body); "
+    "INSERT INTO article_search(rowid, title, path, body) VALUES (new.id, new.title, new.path, new.body); END",
+)
+
+
+def upgrade() -> None:
+    """Create the article index table; the background indexer fills it from disk."""
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    article_index = sa.Table(
+        "article_index",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("path", sa.String(length=1000), nullable=False, unique=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False, server_default=""),
+        sa.Column("mtime", sa.Float(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("indexed_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+    )
+    sa.Index("idx_article_index_mtime_path", article_index.c.mtime.desc(), article_index.c.path)
+    metadata.create_all(bind=bind, checkfirst=True)
+
+    if bind.dialect.name == "sqlite":
+        for statement in FTS_STATEMENTS:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS article_index_au")
+        op.execute("DROP TRIGGER IF EXISTS article_index_ad")
+        op.execute("DROP TRIGGER IF EXISTS article_index_ai")
+        op.execute("DROP TABLE IF EXISTS article_search")
+    sa.Table("article_index", sa.MetaData()).drop(bind=bind, checkfirst=True)
@@ -0,0 +1,65 @@
+"""create trigger-maintained log counters
+
+Revision ID: 20261019_01
+Revises: 20261019_00
+Create Date: 2026-10-19 01:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_01"
+down_revision = "20261019_00"
+branch_labels = None
+depends_on = None
+
+COUNTED_TABLES = ("visit_logs", "update_logs")
+
+
+def _trigger_statements(table_name: str) -> tuple[str, str]:
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_count_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO log_counters (name, value) VALUES ('{table_name}', 1) "
+        f"ON CONFLICT(name) DO UPDATE SET value = value + 1; END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_count_ad AFTER DELETE ON {table_name} BEGIN "
+        f"UPDATE log_counters SET value = value - 1 WHERE name = '{table_name}'; END",
+    )
+
+
+def upgrade() -> None:
+    """Create log_counters, seed it from the current row counts, and install triggers."""
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    log_counters = sa.Table(
+        "log_counters",
+        metadata,
+        sa.Column("name", sa.String(length=50), primary_key=True, nullable=False),
+        sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+    )
+    metadata.create_all(bind=bind, checkfirst=True)
+
+    # Counters are only maintained on SQLite; other dialects keep counting rows.
+    if bind.dialect.name != "sqlite":
+        return
+
+    existing_tables = set(sa.inspect(bind).get_table_names())
+    for table_name in COUNTED_TABLES:
+        if table_name not in existing_tables:
+            continue
+        count = bind.execute(sa.text(f"SELECT count(*) FROM {table_name}")).scalar() or 0
+        bind.execute(sa.delete(log_counters).where(log_counters.c.name == table_name))
+        bind.execute(sa.insert(log_counters).values(name=table_name, value=count))
+        for statement in _trigger_statements(table_name):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for table_name in COUNTED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table_name}_count_ai")
+            op.execute(f"DROP TRIGGER IF EXISTS {table_name}_count_ad")
+    sa.Table("log_counters", sa.MetaData()).drop(bind=bind, checkfirst=True)
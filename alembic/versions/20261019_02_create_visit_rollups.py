@@ -0,0 +1,44 @@
+"""create visit rollups
+
+Revision ID: 20261019_02
+Revises: 20261019_01
+Create Date: 2026-10-19 02:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_02"
+down_revision = "20261019_01"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create visit_rollups; the rollup job folds existing visit logs in on its first run."""
+    metadata = sa.MetaData()
+    visit_rollups = sa.Table(
+        "visit_rollups",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("granularity", sa.String(length=10), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(), nullable=False),
+        sa.Column("path", sa.String(length=500), nullable=False),
+        sa.Column("visits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("ip_sketch", sa.LargeBinary(), nullable=True),
+    )
+    sa.Index(
+        "uq_visit_rollups_bucket",
+        visit_rollups.c.granularity,
+        visit_rollups.c.path,
+        visit_rollups.c.bucket_start,
+        unique=True,
+    )
+    metadata.create_all(bind=op.get_bind(), checkfirst=True)
+
+
+def downgrade() -> None:
+    sa.Table("visit_rollups", sa.MetaData()).drop(bind=op.get_bind(), checkfirst=True)
@@ -0,0 +1,130 @@
+"""move visit user agents into a deduplicated dimension table
+
+Revision ID: 20261019_03
+Revises: 20261019_02
+Create Date: 2026-10-19 03:00:00
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_03"
+down_revision = "20261019_02"
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def _user_agent_hash(value: str) -> str:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _counter_triggers(bind) -> list[str]:
+    """Return the visit_logs trigger statements as installed by 20261019_01."""
+    if bind.dialect.name != "sqlite":
+        return []
+    return list(
+        bind.execute(
+            sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'visit_logs'")
+        ).scalars()
+    )
+
+
+def _restore_counter_triggers(bind, triggers: list[str]) -> None:
+    """Batch mode rebuilds visit_logs, which drops its triggers; recreate and reseed them."""
+    if bind.dialect.name != "sqlite":
+        return
+    for statement in triggers:
+        op.execute(statement)
+    op.execute("DELETE FROM log_counters WHERE name = 'visit_logs'")
+    op.execute("INSERT INTO log_counters (name, value) SELECT 'visit_logs', count(*) FROM visit_logs")
+
+
+def upgrade() -> None:
+    """Create user_agents, point visits at it by id, and drop the inline strings."""
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    user_agents = sa.Table(
+        "user_agents",
+        metadata,
+        sa.Column("id", sa.Integer(), primary_key=True, nullable=False),
+        sa.Column("ua_hash", sa.String(length=32), nullable=False, unique=True),
+        sa.Column("value", sa.Text(), nullable=False),
+    )
+    metadata.create_all(bind=bind, checkfirst=True)
+
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("visit_logs")}
+    if "user_agent" not in columns:
+        return
+
+    triggers = _counter_triggers(bind)
+    with op.batch_alter_table("visit_logs") as batch_op:
+        batch_op.add_column(sa.Column("user_agent_id", sa.Integer(), nullable=True))
+
+    visit_logs = sa.table(
+        "visit_logs",
+        sa.column("id", sa.Integer()),
+        sa.column("user_agent", sa.Text()),
+        sa.column("user_agent_id", sa.Integer()),
+    )
+    distinct_values = [
+        row[0]
+        for row in bind.execute(
+            sa.select(visit_logs.c.user_agent).where(visit_logs.c.user_agent != "").distinct()
+        )
+        if row[0]
+    ]
+    for start in range(0, len(distinct_values), BACKFILL_BATCH_SIZE):
+        batch = distinct_values[start : start + BACKFILL_BATCH_SIZE]
+        bind.execute(
+            sa.insert(user_agents),
+            [{"ua_hash": _user_agent_hash(value), "value": value} for value in batch],
+        )
+
+    # A temporary index on the string keeps the correlated backfill linear.
+    op.create_index("tmp_user_agents_value", "user_agents", ["value"])
+    bind.execute(
+        visit_logs.update()
+        .where(visit_logs.c.user_agent.is_not(None), visit_logs.c.user_agent != "")
+        .values(
+            user_agent_id=sa.select(user_agents.c.id)
+            .where(user_agents.c.value == visit_logs.c.user_agent)
+            .scalar_subquery()
+        )
+    )
+    op.drop_index("tmp_user_agents_value", table_name="user_agents")
+
+    with op.batch_alter_table("visit_logs") as batch_op:
+        batch_op.create_foreign_key(
+            "fk_visit_logs_user_agent_id",
+            "user_agents",
+            ["user_agent_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+        batch_op.drop_column("user_agent")
+    _restore_counter_triggers(bind, triggers)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    columns = {column["name"] for column in sa.inspect(bind).get_columns("visit_logs")}
+    if "user_agent_id" in columns:
+        triggers = _counter_triggers(bind)
+        with op.batch_alter_table("visit_logs") as batch_op:
+            batch_op.add_column(sa.Column("user_agent", sa.Text(), nullable=True))
+        op.execute(
+            "UPDATE visit_logs SET user_agent = "
+            "(SELECT value FROM user_agents WHERE user_agents.id = visit_logs.user_agent_id)"
+        )
+        with op.batch_alter_table("visit_logs") as batch_op:
+            batch_op.drop_constraint("fk_visit_logs_user_agent_id", type_="foreignkey")
+            batch_op.drop_column("user_agent_id")
+        _restore_counter_triggers(bind, triggers)
+    sa.Table("user_agents", sa.MetaData()).drop(bind=bind, checkfirst=True)
@@ -0,0 +1,47 @@
+"""move the visit rollup watermark into its own table
+
+Revision ID: 20261019_04
+Revises: 20261019_03
+Create Date: 2026-10-19 04:00:00
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20261019_04"
+down_revision = "20261019_03"
+branch_labels = None
+depends_on = None
+
+ROLLUP_STATE_NAME = "visits"
+LEGACY_WATERMARK = "visit_rollups_watermark"
+
+
+def upgrade() -> None:
+    """Create visit_rollup_state seeded from the watermark previously kept in log_counters."""
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    sa.Table(
+        "visit_rollup_state",
+        metadata,
+        sa.Column("name", sa.String(length=50), primary_key=True, nullable=False),
+        sa.Column("watermark", sa.Integer(), nullable=False, server_default="0"),
+    )
+    metadata.create_all(bind=bind, checkfirst=True)
+    op.execute(
+        "INSERT OR IGNORE INTO visit_rollup_state (name, watermark) "
+        f"SELECT '{ROLLUP_STATE_NAME}', coalesce(max(value), 0) FROM log_counters WHERE name = '{LEGACY_WATERMARK}'"
+    )
+    op.execute(f"DELETE FROM log_counters WHERE name = '{LEGACY_WATERMARK}'")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    op.execute(
+        "INSERT OR REPLACE INTO log_counters (name, value) "
+        f"SELECT '{LEGACY_WATERMARK}', watermark FROM visit_rollup_state WHERE name = '{ROLLUP_STATE_NAME}'"
+    )
+    sa.Table("visit_rollup_state", sa.MetaData()).drop(bind=bind, checkfirst=True)
@@ -0,0 +1,39 @@
+"""Per-route rate limiting dependencies."""
+
+import math
+
+from fastapi import HTTPException, Request
+
+from app.config import get_settings
+from app.services.rate_limit import get_route_limiter
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+RATE_LIMITED_DETAIL = "请求过于频繁，请稍后再试"
+
+
+def rate_limit_writes(scope: str):
+    """Build a dependency that limits write requests per client IP within ``scope``.
+
+    Attach it to a router with ``APIRouter(dependencies=[Depends(...)])``; read
+    requests pass through untouched. Limits come from ``WRITE_RATE_LIMIT_*``.
+    """
+
+    async def dependency(request: Request) -> None:
+        if request.method not in WRITE_METHODS:
+            return
+        settings = get_settings()
+        if settings.write_rate_limit_per_minute <= 0:
+            return
+        limiter = get_route_limiter(
+            scope, settings.write_rate_limit_per_minute, 60, settings.write_rate_limit_burst
+        )
+        client_ip = request.client.host if request.client else "unknown"
+        allowed, retry_after = limiter.hit(client_ip)
+        if not allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=RATE_LIMITED_DETAIL,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+    return dependency
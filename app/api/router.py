@@ -10,6 +10,7 @@ from app.routers import (
     folders_router,
     links_router,
     logs_router,
+    profiles_router,
     settings_router,
 )
 
@@ -24,3 +25,4 @@ def register_api_router(app: FastAPI) -> None:
     app.include_router(settings_router)
     app.include_router(logs_router)
     app.include_router(favicon_router)
+    app.include_router(profiles_router)
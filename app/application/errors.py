@@ -31,3 +31,19 @@ class NotFoundError(ApplicationError):
     """404 error."""
 
     status_code = 404
+
+
+class TooManyRequestsError(ApplicationError):
+    """429 error with the seconds a client should wait before retrying."""
+
+    status_code = 429
+
+    def __init__(self, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.headers = {"Retry-After": str(retry_after)}
+
+
+class ServiceUnavailableError(ApplicationError):
+    """503 error for work the server cannot finish right now."""
+
+    status_code = 503
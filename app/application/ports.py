@@ -1,5 +1,7 @@
 """Repository, domain-service, and unit-of-work ports."""
 
+from datetime import datetime
+from pathlib import Path
 from typing import Any, Protocol
 
 from app.schemas.site_settings import SiteSettingsUpdateRequest
@@ -45,6 +47,7 @@ class NavigationRepository(Protocol):
 
 class NavigationService(Protocol):
     async def get_all_categories(self, include_auth_required: bool = True) -> dict: ...
+    async def search_links(self, query: str, include_auth_required: bool = True, limit: int = 20) -> list[dict]: ...
     async def get_category_by_name(self, name: str) -> Any | None: ...
     async def create_category(self, name: str, auth_required: bool = False) -> Any: ...
     async def update_category(self, old_name: str, new_name: str, auth_required: bool) -> Any | None: ...
@@ -70,6 +73,8 @@ class NavigationService(Protocol):
     async def reorder_link(self, link_id: str, direction: str) -> bool: ...
     async def batch_reorder_links(self, link_ids: list[str]) -> bool: ...
     async def batch_reorder_categories(self, category_names: list[str]) -> bool: ...
+    def publish_cache_patches(self) -> None: ...
+    def discard_cache_patches(self) -> None: ...
 
 
 class ArticleRepository(Protocol):
@@ -77,13 +82,28 @@ class ArticleRepository(Protocol):
         self,
         protected_paths: list[str],
         include_protected: bool,
+        folder: str | None = None,
     ) -> list[dict]: ...
+    async def list_page_async(
+        self,
+        protected_paths: list[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict: ...
     async def get_article_async(
         self,
         path: str,
         protected_paths: list[str],
         allow_protected: bool,
     ) -> dict: ...
+    async def get_article_html_path_async(
+        self,
+        path: str,
+        protected_paths: list[str],
+        allow_protected: bool,
+    ) -> Path: ...
     async def sync_article_async(
         self,
         path: str,
@@ -95,6 +115,29 @@ class ArticleRepository(Protocol):
     async def delete_article_async(self, path: str) -> dict: ...
 
 
+class ArticleSearchRepository(Protocol):
+    def is_ready(self) -> bool: ...
+    async def index_article(self, path: str) -> None: ...
+    async def remove_article(self, path: str) -> None: ...
+    async def rename_folder(self, name: str, new_name: str) -> None: ...
+    async def remove_folder(self, name: str) -> None: ...
+    async def search(
+        self,
+        query: str,
+        protected_paths: list[str],
+        include_protected: bool,
+        limit: int = 20,
+    ) -> list[dict]: ...
+    async def list_page(
+        self,
+        protected_paths: list[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict: ...
+
+
 class FolderRepository(Protocol):
     async def list_folders_async(self) -> list[dict]: ...
     async def create_folder_async(self, name: str) -> dict: ...
@@ -118,15 +161,38 @@ class LogRepository(Protocol):
         details: str = "",
         username: str = "",
     ) -> None: ...
-    async def get_visits(self, limit: int = 100) -> dict: ...
+    async def get_visits(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        path: str | None = None,
+        ip: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict: ...
     async def clear_visits(self) -> None: ...
-    async def get_updates(self, limit: int = 100) -> dict: ...
+    async def get_visit_stats(
+        self,
+        granularity: str = "day",
+        path: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict: ...
+    async def get_updates(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        target_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict: ...
     async def clear_updates(self) -> None: ...
 
 
 class UnitOfWork(Protocol):
     navigation: NavigationService
     articles: ArticleRepository
+    article_search: ArticleSearchRepository
     folders: FolderRepository
     settings: SettingsRepository
     logs: LogRepository
@@ -7,6 +7,7 @@ from app.infrastructure.navigation import SqlAlchemyNavigationRepository
 from app.infrastructure.repositories import (
     FileArticleRepository,
     FileFolderRepository,
+    SqlAlchemyArticleSearchRepository,
     SqlAlchemyLogRepository,
     SqlAlchemySettingsRepository,
 )
@@ -19,12 +20,15 @@ class SqlAlchemyUnitOfWork:
         self.db = db
         self.navigation = NavigationDomainService(SqlAlchemyNavigationRepository(db))
         self.articles = FileArticleRepository()
+        self.article_search = SqlAlchemyArticleSearchRepository(db)
         self.folders = FileFolderRepository()
         self.settings = SqlAlchemySettingsRepository(db)
         self.logs = SqlAlchemyLogRepository(db)
 
     async def commit(self) -> None:
         await self.db.commit()
+        self.navigation.publish_cache_patches()
 
     async def rollback(self) -> None:
         await self.db.rollback()
+        self.navigation.discard_cache_patches()
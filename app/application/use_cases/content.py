@@ -1,21 +1,87 @@
 """Markdown content and folder use cases."""
 
-from app.application.errors import BadRequestError, ForbiddenError, NotFoundError, UnauthorizedError
+import math
+from pathlib import Path
+
+from app.application.errors import (
+    BadRequestError,
+    ForbiddenError,
+    NotFoundError,
+    ServiceUnavailableError,
+    TooManyRequestsError,
+    UnauthorizedError,
+)
 from app.application.ports import UnitOfWork
+from app.services.admission import RenderRateLimitedError
 from app.services.articles import ArticleAuthenticationRequiredError
+from app.services.markdown_pool import MarkdownRenderTimeoutError
+
+MAX_SEARCH_LIMIT = 100
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 
 class ListArticlesUseCase:
     def __init__(self, uow: UnitOfWork):
         self.uow = uow
 
-    async def execute(self, include_protected: bool) -> dict:
+    async def execute(
+        self,
+        include_protected: bool,
+        limit: int | None = None,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict:
         site_settings = await self.uow.settings.get_settings()
-        articles = await self.uow.articles.list_articles_async(
+        protected_paths = site_settings.get("protected_article_paths", [])
+        try:
+            if limit is None and cursor is None:
+                articles = await self.uow.articles.list_articles_async(
+                    protected_paths=protected_paths,
+                    include_protected=include_protected,
+                    folder=folder,
+                )
+                return {"articles": articles}
+
+            page_size = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+            if not self.uow.article_search.is_ready():
+                # Without a reconciled index the vault on disk is the only source of truth.
+                return await self.uow.articles.list_page_async(
+                    protected_paths,
+                    include_protected=include_protected,
+                    limit=page_size,
+                    cursor=cursor,
+                    folder=folder,
+                )
+            # Paged listings are served from the pre-sorted article index.
+            return await self.uow.article_search.list_page(
+                protected_paths,
+                include_protected=include_protected,
+                limit=page_size,
+                cursor=cursor,
+                folder=folder,
+            )
+        except ValueError as exc:
+            raise BadRequestError(str(exc)) from exc
+
+
+class SearchArticlesUseCase:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def execute(self, query: str, include_protected: bool, limit: int = 20) -> dict:
+        query = (query or "").strip()
+        if not query:
+            raise BadRequestError("搜索关键词不能为空")
+
+        site_settings = await self.uow.settings.get_settings()
+        results = await self.uow.article_search.search(
+            query,
             protected_paths=site_settings.get("protected_article_paths", []),
             include_protected=include_protected,
+            limit=max(1, min(limit, MAX_SEARCH_LIMIT)),
         )
-        return {"articles": articles}
+        return {"query": query, "results": results}
 
 
 class GetArticleUseCase:
@@ -32,6 +98,34 @@ class GetArticleUseCase:
             )
         except ArticleAuthenticationRequiredError as exc:
             raise UnauthorizedError(str(exc)) from exc
+        except MarkdownRenderTimeoutError as exc:
+            raise ServiceUnavailableError(str(exc)) from exc
+        except RenderRateLimitedError as exc:
+            raise TooManyRequestsError(str(exc), max(1, math.ceil(exc.retry_after))) from exc
+        except ValueError as exc:
+            raise ForbiddenError(str(exc)) from exc
+        except FileNotFoundError as exc:
+            raise NotFoundError(str(exc)) from exc
+
+
+class GetArticleHtmlUseCase:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def execute(self, path: str, allow_protected: bool) -> Path:
+        site_settings = await self.uow.settings.get_settings()
+        try:
+            return await self.uow.articles.get_article_html_path_async(
+                path,
+                protected_paths=site_settings.get("protected_article_paths", []),
+                allow_protected=allow_protected,
+            )
+        except ArticleAuthenticationRequiredError as exc:
+            raise UnauthorizedError(str(exc)) from exc
+        except MarkdownRenderTimeoutError as exc:
+            raise ServiceUnavailableError(str(exc)) from exc
+        except RenderRateLimitedError as exc:
+            raise TooManyRequestsError(str(exc), max(1, math.ceil(exc.retry_after))) from exc
         except ValueError as exc:
             raise ForbiddenError(str(exc)) from exc
         except FileNotFoundError as exc:
@@ -48,6 +142,7 @@ class CreateArticleUseCase:
         except ValueError as exc:
             raise ForbiddenError(str(exc)) from exc
 
+        await self.uow.article_search.index_article(result["path"])
         await self.uow.logs.record_update("add", "article", result["title"] or "", f"路径: {result['path']}", username)
         await self.uow.commit()
         return result
@@ -65,6 +160,7 @@ class UpdateArticleUseCase:
         except FileNotFoundError as exc:
             raise NotFoundError(str(exc)) from exc
 
+        await self.uow.article_search.index_article(result["path"])
         await self.uow.logs.record_update("update", "article", result["title"], f"路径: {result['path']}", username)
         await self.uow.commit()
         return {"message": "文章已更新", "path": result["path"], "title": result["title"]}
@@ -82,6 +178,7 @@ class DeleteArticleUseCase:
         except FileNotFoundError as exc:
             raise NotFoundError(str(exc)) from exc
 
+        await self.uow.article_search.remove_article(result["path"])
         await self.uow.logs.record_update("delete", "article", result["title"], f"路径: {result['path']}", username)
         await self.uow.commit()
         return {"message": "文章已删除", "path": result["path"], "title": result["title"]}
@@ -124,6 +221,7 @@ class RenameFolderUseCase:
         except FileNotFoundError as exc:
             raise NotFoundError(str(exc)) from exc
 
+        await self.uow.article_search.rename_folder(result["old_name"], result["new_name"])
         await self.uow.logs.record_update("update", "folder", result["old_name"], f"重命名为: {result['new_name']}", username)
         await self.uow.commit()
         return {"message": "目录重命名成功", "old_name": result["old_name"], "new_name": result["new_name"]}
@@ -141,6 +239,7 @@ class DeleteFolderUseCase:
         except FileNotFoundError as exc:
             raise NotFoundError(str(exc)) from exc
 
+        await self.uow.article_search.remove_folder(result["name"])
         await self.uow.logs.record_update("delete", "folder", result["name"], f"包含 {result['article_count']} 篇文章", username)
         await self.uow.commit()
         return {"message": "目录已删除"}
@@ -1,16 +1,42 @@
 """Log-related use cases."""
 
 from collections.abc import Callable
+from datetime import datetime
 
+from app.application.errors import BadRequestError
 from app.application.ports import UnitOfWork
 
+MAX_LOG_PAGE_SIZE = 500
+
+
+def _page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_LOG_PAGE_SIZE))
+
 
 class GetVisitLogsUseCase:
     def __init__(self, uow: UnitOfWork):
         self.uow = uow
 
-    async def execute(self, limit: int) -> dict:
-        return await self.uow.logs.get_visits(limit)
+    async def execute(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        path: str | None = None,
+        ip: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        try:
+            return await self.uow.logs.get_visits(
+                _page_size(limit),
+                cursor=cursor,
+                path=path,
+                ip=ip,
+                since=since,
+                until=until,
+            )
+        except ValueError as exc:
+            raise BadRequestError(str(exc)) from exc
 
 
 class ClearVisitLogsUseCase:
@@ -23,12 +49,45 @@ class ClearVisitLogsUseCase:
         return {"message": "访问记录已清空"}
 
 
+class GetVisitStatsUseCase:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def execute(
+        self,
+        granularity: str = "day",
+        path: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        try:
+            return await self.uow.logs.get_visit_stats(granularity, path=path, since=since, until=until)
+        except ValueError as exc:
+            raise BadRequestError(str(exc)) from exc
+
+
 class GetUpdateLogsUseCase:
     def __init__(self, uow: UnitOfWork):
         self.uow = uow
 
-    async def execute(self, limit: int) -> dict:
-        return await self.uow.logs.get_updates(limit)
+    async def execute(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        target_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        try:
+            return await self.uow.logs.get_updates(
+                _page_size(limit),
+                cursor=cursor,
+                target_type=target_type,
+                since=since,
+                until=until,
+            )
+        except ValueError as exc:
+            raise BadRequestError(str(exc)) from exc
 
 
 class ClearUpdateLogsUseCase:
@@ -10,6 +10,7 @@ from app.core import validate_url
 logger = logging.getLogger(__name__)
 
 CATEGORY_NAME_ERROR = "分类名称不能为空，且不能包含 / 或 \\"
+MAX_SEARCH_LIMIT = 100
 
 
 def _normalize_category_name(name: str) -> str:
@@ -27,6 +28,22 @@ class ListNavigationUseCase:
         return await self.uow.navigation.get_all_categories(include_auth_required=include_private)
 
 
+class SearchLinksUseCase:
+    def __init__(self, uow: UnitOfWork):
+        self.uow = uow
+
+    async def execute(self, query: str, include_private: bool, limit: int = 20) -> dict:
+        query = (query or "").strip()
+        if not query:
+            raise BadRequestError("搜索关键词不能为空")
+        links = await self.uow.navigation.search_links(
+            query,
+            include_auth_required=include_private,
+            limit=max(1, min(limit, MAX_SEARCH_LIMIT)),
+        )
+        return {"query": query, "links": links}
+
+
 class AddLinkUseCase:
     def __init__(self, uow: UnitOfWork):
         self.uow = uow
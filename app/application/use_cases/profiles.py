@@ -0,0 +1,26 @@
+"""Request profile use cases."""
+
+from pathlib import Path
+
+from app.application.errors import NotFoundError
+from app.config import get_settings
+from app.utils.profiling import ProfileStore
+
+
+def _store() -> ProfileStore:
+    settings = get_settings()
+    return ProfileStore(settings.profiles_dir, settings.profile_max_files)
+
+
+class ListProfilesUseCase:
+    def execute(self) -> dict:
+        profiles = _store().list_profiles()
+        return {"profiles": profiles, "total": len(profiles)}
+
+
+class GetProfileFileUseCase:
+    def execute(self, filename: str) -> Path:
+        target = _store().resolve(filename)
+        if target is None:
+            raise NotFoundError("性能剖析文件不存在")
+        return target
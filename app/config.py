@@ -34,15 +34,68 @@ class Settings:
     max_login_attempts: int
     login_window_seconds: int
     lockout_seconds: int
+    rate_limit_backend: str
+    rate_limit_path: Path
+    rate_limit_max_keys: int
+    rate_limit_sweep_interval_seconds: int
+    write_rate_limit_per_minute: int
+    write_rate_limit_burst: int
+    favicon_rate_limit_per_minute: int
+    favicon_rate_limit_burst: int
+    import_rate_limit_per_minute: int
+    import_rate_limit_burst: int
+    render_rate_limit_per_minute: int
+    render_rate_limit_burst: int
+    max_in_flight_requests: int
+    markdown_process_workers: int
+    markdown_process_min_chars: int
+    markdown_process_max_pending: int
+    markdown_render_timeout_seconds: float
+    highlight_cache_entries: int
+    highlight_cache_persist: bool
+    highlight_cache_path: Path
+    highlight_cache_max_bytes: int
     max_visit_records: int
     max_update_records: int
+    max_visit_age_days: int
+    max_update_age_days: int
+    log_cleanup_batch_size: int
+    enable_log_archive: bool
+    log_archive_dir: Path
     enable_log_cleanup: bool
     log_cleanup_interval_seconds: int
+    enable_article_indexer: bool
+    article_index_interval_seconds: int
+    cache_backend: str
+    cache_shared_path: Path
+    cache_shared_busy_timeout_ms: int
+    cache_max_entries: int
+    cache_max_bytes: int
+    cache_stale_grace_seconds: int
+    enable_metrics: bool
+    metrics_token: str
+    slow_query_ms: int
+    query_repeat_threshold: int
+    query_debug_headers: bool
+    enable_profiling: bool
+    profile_sample_rate: float
+    profiles_dir: Path
+    profile_max_files: int
+    enable_visit_filter: bool
+    visit_bot_sample_rate: float
+    visit_monitor_sample_rate: float
+    visit_human_sample_rate: float
+    visit_allow_cidrs: str
+    visit_deny_cidrs: str
+    visit_bot_patterns: str
+    enable_visit_rollups: bool
+    visit_rollup_interval_seconds: int
 
     @classmethod
     def from_env(cls) -> "Settings":
         """Build the settings object from the current process environment."""
         base_dir = Path(__file__).resolve().parent.parent
+        cache_dir = Path(os.getenv("CACHE_DIR") or base_dir / "data" / "cache")
         return cls(
             base_dir=base_dir,
             data_dir=base_dir / "data",
@@ -59,10 +112,62 @@ class Settings:
             max_login_attempts=int(os.getenv("MAX_LOGIN_ATTEMPTS", "5")),
             login_window_seconds=int(os.getenv("LOGIN_WINDOW_SECONDS", "300")),
             lockout_seconds=int(os.getenv("LOCKOUT_SECONDS", "900")),
+            rate_limit_backend=os.getenv("RATE_LIMIT_BACKEND", "memory").lower(),
+            rate_limit_path=base_dir / "data" / "rate_limits.sqlite3",
+            rate_limit_max_keys=max(1, int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))),
+            rate_limit_sweep_interval_seconds=int(os.getenv("RATE_LIMIT_SWEEP_INTERVAL_SECONDS", "60")),
+            write_rate_limit_per_minute=int(os.getenv("WRITE_RATE_LIMIT_PER_MINUTE", "300")),
+            write_rate_limit_burst=max(1, int(os.getenv("WRITE_RATE_LIMIT_BURST", "60"))),
+            favicon_rate_limit_per_minute=int(os.getenv("FAVICON_RATE_LIMIT_PER_MINUTE", "20")),
+            favicon_rate_limit_burst=max(1, int(os.getenv("FAVICON_RATE_LIMIT_BURST", "5"))),
+            import_rate_limit_per_minute=int(os.getenv("IMPORT_RATE_LIMIT_PER_MINUTE", "6")),
+            import_rate_limit_burst=max(1, int(os.getenv("IMPORT_RATE_LIMIT_BURST", "3"))),
+            render_rate_limit_per_minute=int(os.getenv("RENDER_RATE_LIMIT_PER_MINUTE", "600")),
+            render_rate_limit_burst=max(1, int(os.getenv("RENDER_RATE_LIMIT_BURST", "120"))),
+            max_in_flight_requests=int(os.getenv("MAX_IN_FLIGHT_REQUESTS", "256")),
+            markdown_process_workers=int(os.getenv("MARKDOWN_PROCESS_WORKERS", "0")),
+            markdown_process_min_chars=int(os.getenv("MARKDOWN_PROCESS_MIN_CHARS", "50000")),
+            markdown_process_max_pending=max(1, int(os.getenv("MARKDOWN_PROCESS_MAX_PENDING", "16"))),
+            markdown_render_timeout_seconds=float(os.getenv("MARKDOWN_RENDER_TIMEOUT_SECONDS", "10")),
+            highlight_cache_entries=int(os.getenv("HIGHLIGHT_CACHE_ENTRIES", "2048")),
+            highlight_cache_persist=os.getenv("HIGHLIGHT_CACHE_PERSIST", "true").lower() == "true",
+            highlight_cache_path=cache_dir / "highlight.sqlite3",
+            highlight_cache_max_bytes=int(os.getenv("HIGHLIGHT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
             max_visit_records=int(os.getenv("MAX_VISIT_RECORDS", "1000")),
             max_update_records=int(os.getenv("MAX_UPDATE_RECORDS", "500")),
+            max_visit_age_days=int(os.getenv("MAX_VISIT_AGE_DAYS", "0")),
+            max_update_age_days=int(os.getenv("MAX_UPDATE_AGE_DAYS", "0")),
+            log_cleanup_batch_size=max(1, int(os.getenv("LOG_CLEANUP_BATCH_SIZE", "1000"))),
+            enable_log_archive=os.getenv("ENABLE_LOG_ARCHIVE", "true").lower() == "true",
+            log_archive_dir=base_dir / "data" / "log_archive",
             enable_log_cleanup=os.getenv("ENABLE_LOG_CLEANUP", "true").lower() == "true",
             log_cleanup_interval_seconds=int(os.getenv("LOG_CLEANUP_INTERVAL_SECONDS", "21600")),
+            enable_article_indexer=os.getenv("ENABLE_ARTICLE_INDEXER", "true").lower() == "true",
+            article_index_interval_seconds=int(os.getenv("ARTICLE_INDEX_INTERVAL_SECONDS", "3600")),
+            cache_backend=os.getenv("CACHE_BACKEND", "memory").lower(),
+            cache_shared_path=cache_dir / "shared_cache.sqlite3",
+            cache_shared_busy_timeout_ms=max(1, int(os.getenv("CACHE_SHARED_BUSY_TIMEOUT_MS", "50"))),
+            cache_max_entries=max(1, int(os.getenv("CACHE_MAX_ENTRIES", "10000"))),
+            cache_max_bytes=max(1, int(os.getenv("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))),
+            cache_stale_grace_seconds=max(0, int(os.getenv("CACHE_STALE_GRACE_SECONDS", "30"))),
+            enable_metrics=os.getenv("ENABLE_METRICS", "false").lower() == "true",
+            metrics_token=os.getenv("METRICS_TOKEN", ""),
+            slow_query_ms=int(os.getenv("SLOW_QUERY_MS", "200")),
+            query_repeat_threshold=int(os.getenv("QUERY_REPEAT_THRESHOLD", "5")),
+            query_debug_headers=os.getenv("QUERY_DEBUG_HEADERS", "false").lower() == "true",
+            enable_profiling=os.getenv("ENABLE_PROFILING", "false").lower() == "true",
+            profile_sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            profiles_dir=base_dir / "data" / "profiles",
+            profile_max_files=max(1, int(os.getenv("PROFILE_MAX_FILES", "100"))),
+            enable_visit_filter=os.getenv("ENABLE_VISIT_FILTER", "false").lower() == "true",
+            visit_bot_sample_rate=float(os.getenv("VISIT_BOT_SAMPLE_RATE", "0")),
+            visit_monitor_sample_rate=float(os.getenv("VISIT_MONITOR_SAMPLE_RATE", "0")),
+            visit_human_sample_rate=float(os.getenv("VISIT_HUMAN_SAMPLE_RATE", "1")),
+            visit_allow_cidrs=os.getenv("VISIT_ALLOW_CIDRS", ""),
+            visit_deny_cidrs=os.getenv("VISIT_DENY_CIDRS", ""),
+            visit_bot_patterns=os.getenv("VISIT_BOT_PATTERNS", ""),
+            enable_visit_rollups=os.getenv("ENABLE_VISIT_ROLLUPS", "true").lower() == "true",
+            visit_rollup_interval_seconds=int(os.getenv("VISIT_ROLLUP_INTERVAL_SECONDS", "300")),
         )
 
 
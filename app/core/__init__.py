@@ -1,5 +1,7 @@
 """Shared core helpers."""
 
+from app.core.cursors import decode_cursor, encode_cursor
+from app.core.hyperloglog import HyperLogLog
 from app.core.pathing import (
     ensure_posix_path,
     is_path_protected,
@@ -9,6 +11,9 @@ from app.core.pathing import (
 from app.core.urls import validate_safe_external_url, validate_url
 
 __all__ = [
+    "HyperLogLog",
+    "decode_cursor",
+    "encode_cursor",
     "ensure_posix_path",
     "is_path_protected",
     "normalize_article_path",
@@ -0,0 +1,23 @@
+"""Opaque keyset pagination cursors."""
+
+import base64
+import binascii
+import json
+
+
+def encode_cursor(*values) -> str:
+    """Encode keyset values into an opaque URL-safe cursor."""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """Decode a cursor produced by encode_cursor and check its arity."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError, binascii.Error) as exc:
+        raise ValueError("分页游标无效") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("分页游标无效")
+    return values
@@ -0,0 +1,77 @@
+"""Compact HyperLogLog sketches for unique-visitor estimates."""
+
+import hashlib
+import math
+
+DEFAULT_PRECISION = 10
+_SPARSE_TAG = b"S"
+_DENSE_TAG = b"D"
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """HyperLogLog counter with ``2 ** precision`` one-byte registers.
+
+    Sketches serialize to a sparse ``(index, rank)`` list while few registers
+    are set, and to the dense register array once that is smaller.
+    """
+
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: bytearray | None = None):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    def add(self, value: str) -> None:
+        hashed = _hash64(value)
+        index = hashed >> (64 - self.precision)
+        remaining_bits = 64 - self.precision
+        remainder = hashed & ((1 << remaining_bits) - 1)
+        rank = remaining_bits - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        size = len(self.registers)
+        zeros = self.registers.count(0)
+        if zeros == size:
+            return 0
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -register for register in self.registers)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        entries = [(index, rank) for index, rank in enumerate(self.registers) if rank]
+        header = bytes([self.precision])
+        if len(entries) * 3 < len(self.registers):
+            return _SPARSE_TAG + header + b"".join(
+                index.to_bytes(2, "big") + bytes([rank]) for index, rank in entries
+            )
+        return _DENSE_TAG + header + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes | None, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        if not data:
+            return cls(precision)
+        tag, precision, body = data[:1], data[1], data[2:]
+        sketch = cls(precision)
+        if tag == _DENSE_TAG:
+            sketch.registers = bytearray(body)
+        elif tag == _SPARSE_TAG:
+            for offset in range(0, len(body), 3):
+                sketch.registers[int.from_bytes(body[offset : offset + 2], "big")] = body[offset + 2]
+        else:
+            raise ValueError("unknown sketch encoding")
+        return sketch
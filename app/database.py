@@ -8,6 +8,7 @@ from sqlalchemy.orm import declarative_base
 from sqlalchemy.pool import NullPool
 
 from app.config import get_settings
+from app.utils.metrics import instrument_engine
 
 Base = declarative_base()
 
@@ -30,6 +31,7 @@ def _build_engine():
             cursor.execute("PRAGMA foreign_keys=ON")
             cursor.close()
 
+    instrument_engine(engine)
     return engine
 
 
@@ -1,5 +1,14 @@
 """Domain services."""
 
+from app.domain.link_search import LinkSearchIndex, get_link_search_index, reset_link_search_index
 from app.domain.navigation import NavigationDomainService
+from app.domain.navigation_snapshot import NavigationSnapshot, SnapshotMismatchError
 
-__all__ = ["NavigationDomainService"]
+__all__ = [
+    "LinkSearchIndex",
+    "NavigationDomainService",
+    "NavigationSnapshot",
+    "SnapshotMismatchError",
+    "get_link_search_index",
+    "reset_link_search_index",
+]
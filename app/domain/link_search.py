@@ -0,0 +1,190 @@
+"""In-memory inverted index for navigation link search."""
+
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+from app.domain.navigation_snapshot import NavigationSnapshot
+
+CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+TOKEN_PATTERN = re.compile(f"[{CJK_RANGES}]+|[0-9a-z]+")
+CJK_PATTERN = re.compile(f"[{CJK_RANGES}]")
+
+TITLE_WEIGHT = 3
+CATEGORY_WEIGHT = 2
+URL_WEIGHT = 1
+EXACT_MATCH_BONUS = 1
+
+
+def tokenize(text: str | None, for_query: bool = False) -> list[str]:
+    """Split text into lowercase word tokens and CJK bigrams.
+
+    Indexed CJK runs also emit their final character, so every character of a
+    run is the prefix of some token and single-character queries still match.
+    """
+    if not text:
+        return []
+    normalized = unicodedata.normalize("NFKC", text).lower()
+    tokens: list[str] = []
+    for run in TOKEN_PATTERN.findall(normalized):
+        if not CJK_PATTERN.match(run):
+            tokens.append(run)
+            continue
+        if len(run) == 1:
+            tokens.append(run)
+            continue
+        tokens.extend(run[index : index + 2] for index in range(len(run) - 1))
+        if not for_query:
+            tokens.append(run[-1])
+    return tokens
+
+
+def _url_text(url: str) -> str:
+    parts = urlsplit(url)
+    if parts.hostname:
+        return f"{parts.hostname} {parts.path} {parts.query}"
+    return url.split(":", 1)[-1]
+
+
+@dataclass(slots=True)
+class _IndexedLink:
+    link: dict
+    category: str
+    auth_required: bool
+    position: int
+    weights: dict[str, int]
+
+
+class LinkSearchIndex:
+    """Token -> link postings with prefix expansion over a sorted vocabulary.
+
+    The index follows a ``NavigationSnapshot``; ``sync`` only re-tokenizes
+    links whose payload or category changed since the last synced version.
+    """
+
+    def __init__(self):
+        self.version: int | None = None
+        self._docs: dict[str, _IndexedLink] = {}
+        self._postings: dict[str, dict[str, int]] = {}
+        self._vocabulary: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def sync(self, snapshot: NavigationSnapshot) -> None:
+        """Bring the index up to date with a snapshot."""
+        if self.version == snapshot.version:
+            return
+
+        seen: set[str] = set()
+        position = 0
+        for category in snapshot.categories:
+            for link in category["links"]:
+                link_id = link["id"]
+                seen.add(link_id)
+                doc = self._docs.get(link_id)
+                if (
+                    doc is None
+                    or doc.category != category["name"]
+                    or doc.auth_required != category["auth_required"]
+                    or (doc.link is not link and doc.link != link)
+                ):
+                    self._remove(link_id)
+                    self._add(link, category["name"], category["auth_required"], position)
+                else:
+                    doc.position = position
+                position += 1
+
+        for link_id in [link_id for link_id in self._docs if link_id not in seen]:
+            self._remove(link_id)
+        self.version = snapshot.version
+
+    def search(self, query: str, include_auth_required: bool, limit: int = 20) -> list[dict]:
+        """Return links matching every query token, best matches first."""
+        query_tokens = list(dict.fromkeys(tokenize(query, for_query=True)))
+        if not query_tokens or limit <= 0:
+            return []
+
+        scores: dict[str, int] | None = None
+        for token in query_tokens:
+            token_scores = self._match_prefix(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    link_id: score + token_scores[link_id]
+                    for link_id, score in scores.items()
+                    if link_id in token_scores
+                }
+            if not scores:
+                return []
+
+        docs = self._docs
+        candidates = [
+            (link_id, score)
+            for link_id, score in scores.items()
+            if include_auth_required or not docs[link_id].auth_required
+        ]
+        candidates.sort(key=lambda item: (-item[1], docs[item[0]].position))
+        return [{**docs[link_id].link, "category": docs[link_id].category} for link_id, _ in candidates[:limit]]
+
+    def _match_prefix(self, prefix: str) -> dict[str, int]:
+        matches: dict[str, int] = {}
+        vocabulary = self._vocabulary
+        index = bisect_left(vocabulary, prefix)
+        while index < len(vocabulary) and vocabulary[index].startswith(prefix):
+            token = vocabulary[index]
+            bonus = EXACT_MATCH_BONUS if token == prefix else 0
+            for link_id, weight in self._postings[token].items():
+                score = weight + bonus
+                if score > matches.get(link_id, 0):
+                    matches[link_id] = score
+            index += 1
+        return matches
+
+    def _add(self, link: dict, category: str, auth_required: bool, position: int) -> None:
+        weights: dict[str, int] = {}
+        for text, weight in (
+            (link.get("title"), TITLE_WEIGHT),
+            (category, CATEGORY_WEIGHT),
+            (_url_text(link.get("url") or ""), URL_WEIGHT),
+        ):
+            for token in tokenize(text):
+                if weight > weights.get(token, 0):
+                    weights[token] = weight
+
+        link_id = link["id"]
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[link_id] = weight
+        self._docs[link_id] = _IndexedLink(link, category, auth_required, position, weights)
+
+    def _remove(self, link_id: str) -> None:
+        doc = self._docs.pop(link_id, None)
+        if doc is None:
+            return
+        for token in doc.weights:
+            postings = self._postings[token]
+            postings.pop(link_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+
+_link_search_index = LinkSearchIndex()
+
+
+def get_link_search_index() -> LinkSearchIndex:
+    """Return the process-wide link search index."""
+    return _link_search_index
+
+
+def reset_link_search_index() -> None:
+    """Drop the process-wide link search index."""
+    global _link_search_index
+    _link_search_index = LinkSearchIndex()
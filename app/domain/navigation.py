@@ -1,25 +1,73 @@
 """Navigation domain service."""
 
+import logging
+from collections.abc import Callable
+
 from app.application.ports import NavigationRepository
-from app.utils.cache import CACHE_LINKS_ALL, CACHE_LINKS_PUBLIC, cache, invalidate_links_cache
+from app.domain.link_search import LinkSearchIndex, get_link_search_index
+from app.domain.navigation_snapshot import NavigationSnapshot, SnapshotMismatchError
+from app.utils.cache import CACHE_LINKS_ALL, bump_links_version, cache, get_links_version
+
+logger = logging.getLogger(__name__)
+
+LINKS_CACHE_TTL = 60
+
+SnapshotPatch = Callable[[NavigationSnapshot], NavigationSnapshot]
 
 
 class NavigationDomainService:
-    """Encapsulate navigation-specific rules, shaping, and cache behavior."""
+    """Encapsulate navigation-specific rules, shaping, and cache behavior.
+
+    Mutations queue patches against the cached snapshot instead of dropping it.
+    The unit of work publishes them after a successful commit, so the cache
+    never reflects writes that were rolled back.
+    """
 
     def __init__(self, repository: NavigationRepository):
         self.repository = repository
+        self._pending_patches: list[SnapshotPatch] = []
 
     async def get_all_categories(self, include_auth_required: bool = True) -> dict:
-        cache_key = CACHE_LINKS_ALL if include_auth_required else CACHE_LINKS_PUBLIC
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
+        snapshot = await self._get_snapshot()
+        return snapshot.get_payload(include_auth_required)
+
+    async def search_links(self, query: str, include_auth_required: bool = True, limit: int = 20) -> list[dict]:
+        snapshot = await self._get_snapshot()
+        if self._pending_patches:
+            index = LinkSearchIndex()
+        else:
+            index = get_link_search_index()
+        index.sync(snapshot)
+        return index.search(query, include_auth_required=include_auth_required, limit=limit)
+
+    def publish_cache_patches(self) -> None:
+        """Apply queued patches to the cached snapshot after a commit."""
+        patches, self._pending_patches = self._pending_patches, []
+        if patches:
+            _patch_snapshot(patches)
+
+    def discard_cache_patches(self) -> None:
+        """Drop queued patches after a rollback."""
+        self._pending_patches.clear()
+
+    async def _get_snapshot(self) -> NavigationSnapshot:
+        # Uncommitted writes in this session are not in the snapshot yet.
+        if self._pending_patches:
+            return await self._build_snapshot()
+        return await cache.get_or_load(
+            CACHE_LINKS_ALL,
+            self._build_snapshot,
+            ttl=LINKS_CACHE_TTL,
+            validate=_is_current_snapshot,
+        )
 
-        categories = await self.repository.list_categories(include_auth_required=include_auth_required)
-        payload = {"categories": [self._serialize_category(category) for category in categories]}
-        cache.set(cache_key, payload, ttl=60)
-        return payload
+    async def _build_snapshot(self) -> NavigationSnapshot:
+        version = get_links_version()
+        categories = await self.repository.list_categories(include_auth_required=True)
+        return NavigationSnapshot(
+            version=version,
+            categories=tuple(self._serialize_category(category) for category in categories),
+        )
 
     async def get_category_by_name(self, name: str):
         return await self.repository.get_category_by_name(name)
@@ -27,7 +75,7 @@ class NavigationDomainService:
     async def create_category(self, name: str, auth_required: bool = False):
         sort_order = await self.repository.get_max_category_order() + 1
         category = await self.repository.create_category(name, auth_required, sort_order)
-        invalidate_links_cache()
+        self._pending_patches.append(lambda snapshot: snapshot.with_category_added(name, auth_required))
         return category
 
     async def update_category(self, old_name: str, new_name: str, auth_required: bool):
@@ -35,7 +83,9 @@ class NavigationDomainService:
         if not category:
             return None
         updated = await self.repository.update_category(category, new_name, auth_required)
-        invalidate_links_cache()
+        self._pending_patches.append(
+            lambda snapshot: snapshot.with_category_updated(old_name, new_name, auth_required)
+        )
         return updated
 
     async def delete_category(self, name: str) -> bool:
@@ -43,7 +93,7 @@ class NavigationDomainService:
         if not category:
             return False
         await self.repository.delete_category(category)
-        invalidate_links_cache()
+        self._pending_patches.append(lambda snapshot: snapshot.with_category_deleted(name))
         return True
 
     async def add_link(
@@ -60,8 +110,9 @@ class NavigationDomainService:
 
         sort_order = await self.repository.get_max_link_order(category.id) + 1
         link = await self.repository.create_link(category.id, title, url, icon, sort_order, link_id)
-        invalidate_links_cache()
-        return self._serialize_link(link)
+        serialized = self._serialize_link(link)
+        self._pending_patches.append(lambda snapshot: snapshot.with_link_added(category_name, serialized))
+        return serialized
 
     async def get_link_by_id(self, link_id: str):
         return await self.repository.get_link_by_id(link_id)
@@ -79,11 +130,13 @@ class NavigationDomainService:
             return None
 
         next_category_id = None
+        next_category_name = None
         next_sort_order = None
         if new_category_name:
             new_category = await self.repository.get_category_by_name(new_category_name)
             if new_category and new_category.id != link.category_id:
                 next_category_id = new_category.id
+                next_category_name = new_category.name
                 next_sort_order = await self.repository.get_max_link_order(new_category.id) + 1
 
         updated = await self.repository.update_link(
@@ -94,15 +147,16 @@ class NavigationDomainService:
             category_id=next_category_id,
             sort_order=next_sort_order,
         )
-        invalidate_links_cache()
-        return self._serialize_link(updated)
+        serialized = self._serialize_link(updated)
+        self._pending_patches.append(lambda snapshot: snapshot.with_link_updated(serialized, next_category_name))
+        return serialized
 
     async def delete_link(self, link_id: str) -> bool:
         link = await self.repository.get_link_by_id(link_id)
         if not link:
             return False
         await self.repository.delete_link(link)
-        invalidate_links_cache()
+        self._pending_patches.append(lambda snapshot: snapshot.with_link_deleted(link_id))
         return True
 
     async def reorder_link(self, link_id: str, direction: str) -> bool:
@@ -116,15 +170,14 @@ class NavigationDomainService:
                 continue
             if direction == "up" and index > 0:
                 current.sort_order, links[index - 1].sort_order = links[index - 1].sort_order, current.sort_order
-                await self.repository.flush()
-                invalidate_links_cache()
-                return True
-            if direction == "down" and index < len(links) - 1:
+            elif direction == "down" and index < len(links) - 1:
                 current.sort_order, links[index + 1].sort_order = links[index + 1].sort_order, current.sort_order
-                await self.repository.flush()
-                invalidate_links_cache()
-                return True
-            return False
+            else:
+                return False
+            await self.repository.flush()
+            ordered_ids = [str(item.id) for item in sorted(links, key=lambda item: item.sort_order)]
+            self._pending_patches.append(lambda snapshot: snapshot.with_links_reordered(ordered_ids))
+            return True
         return False
 
     async def batch_reorder_links(self, link_ids: list[str]) -> bool:
@@ -146,7 +199,7 @@ class NavigationDomainService:
 
         order_map = {link_id: index for index, link_id in enumerate(link_ids)}
         await self.repository.reorder_links(order_map)
-        invalidate_links_cache()
+        self._pending_patches.append(lambda snapshot: snapshot.with_links_reordered(list(link_ids)))
         return True
 
     async def batch_reorder_categories(self, category_names: list[str]) -> bool:
@@ -159,7 +212,7 @@ class NavigationDomainService:
 
         order_map = {name: index for index, name in enumerate(category_names)}
         await self.repository.reorder_categories(order_map)
-        invalidate_links_cache()
+        self._pending_patches.append(lambda snapshot: snapshot.with_categories_reordered(list(category_names)))
         return True
 
     @staticmethod
@@ -181,3 +234,53 @@ class NavigationDomainService:
             "url": link.url,
             "icon": link.icon,
         }
+
+
+def _is_current_snapshot(snapshot: NavigationSnapshot) -> bool:
+    return snapshot.version == get_links_version()
+
+
+def _patch_snapshot(patches: list[SnapshotPatch]) -> None:
+    """Advance the snapshot version and fold patches into the cached snapshot.
+
+    The version bump is atomic, so concurrent writers (also in other workers
+    sharing the cache) each own one version step. The patched snapshot is
+    stored with a compare-and-set against the previous version: a snapshot
+    that was not stamped with it (for example a rebuild, or another writer's
+    patch that raced with this one) or that fails a consistency check is
+    dropped so the next reader rebuilds it from the database.
+    """
+    next_version = bump_links_version()
+    if next_version is None:
+        # The bump is queued behind a busy shared cache; let the next reader rebuild.
+        cache.delete(CACHE_LINKS_ALL)
+        return
+    previous_version = next_version - 1
+    snapshot = cache.get(CACHE_LINKS_ALL)
+    if snapshot is None:
+        return
+    if snapshot.version != previous_version:
+        cache.delete(CACHE_LINKS_ALL)
+        return
+
+    try:
+        for patch in patches:
+            snapshot = patch(snapshot)
+    except SnapshotMismatchError as exc:
+        logger.info("Navigation snapshot patch mismatch, rebuilding on next read: %s", exc)
+        cache.delete(CACHE_LINKS_ALL)
+        return
+    snapshot = snapshot.with_version(next_version)
+    if not cache.set_if(
+        CACHE_LINKS_ALL,
+        snapshot,
+        LINKS_CACHE_TTL,
+        lambda current: current is not None and current.version == previous_version,
+    ):
+        # Another writer replaced or dropped the base snapshot; let the next reader rebuild it.
+        cache.delete(CACHE_LINKS_ALL)
+        return
+
+    index = get_link_search_index()
+    if index.version is not None:
+        index.sync(snapshot)
@@ -0,0 +1,132 @@
+"""Versioned navigation snapshot with incremental patch operations."""
+
+from dataclasses import dataclass, field, replace
+
+
+class SnapshotMismatchError(Exception):
+    """Raised when a patch does not line up with the cached snapshot."""
+
+
+@dataclass(frozen=True, slots=True)
+class NavigationSnapshot:
+    """Immutable serialized navigation tree tagged with a cache version.
+
+    Patch methods never mutate the receiver; they return a new snapshot that
+    shares untouched category payloads with the previous one.
+    """
+
+    version: int
+    categories: tuple[dict, ...]
+    payload: dict = field(init=False, repr=False, compare=False)
+    public_payload: dict = field(init=False, repr=False, compare=False)
+    link_index: dict[str, str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "payload", {"categories": list(self.categories)})
+        object.__setattr__(
+            self,
+            "public_payload",
+            {"categories": [category for category in self.categories if not category["auth_required"]]},
+        )
+        object.__setattr__(
+            self,
+            "link_index",
+            {link["id"]: category["name"] for category in self.categories for link in category["links"]},
+        )
+
+    def get_payload(self, include_auth_required: bool) -> dict:
+        return self.payload if include_auth_required else self.public_payload
+
+    def with_version(self, version: int) -> "NavigationSnapshot":
+        return replace(self, version=version)
+
+    def with_category_added(self, name: str, auth_required: bool) -> "NavigationSnapshot":
+        if self._find_category(name) is not None:
+            raise SnapshotMismatchError(f"category already cached: {name}")
+        category = {"name": name, "auth_required": auth_required, "links": []}
+        return self._with_categories([*self.categories, category])
+
+    def with_category_updated(self, old_name: str, new_name: str, auth_required: bool) -> "NavigationSnapshot":
+        index = self._require_category(old_name)
+        if new_name != old_name and self._find_category(new_name) is not None:
+            raise SnapshotMismatchError(f"category already cached: {new_name}")
+        categories = list(self.categories)
+        categories[index] = {**categories[index], "name": new_name, "auth_required": auth_required}
+        return self._with_categories(categories)
+
+    def with_category_deleted(self, name: str) -> "NavigationSnapshot":
+        index = self._require_category(name)
+        categories = list(self.categories)
+        del categories[index]
+        return self._with_categories(categories)
+
+    def with_categories_reordered(self, names: list[str]) -> "NavigationSnapshot":
+        by_name = {category["name"]: category for category in self.categories}
+        if len(names) != len(by_name) or set(names) != set(by_name):
+            raise SnapshotMismatchError("category order does not cover cached categories")
+        return self._with_categories([by_name[name] for name in names])
+
+    def with_link_added(self, category_name: str, link: dict) -> "NavigationSnapshot":
+        if link["id"] in self.link_index:
+            raise SnapshotMismatchError(f"link already cached: {link['id']}")
+        index = self._require_category(category_name)
+        categories = list(self.categories)
+        category = categories[index]
+        categories[index] = {**category, "links": [*category["links"], link]}
+        return self._with_categories(categories)
+
+    def with_link_updated(self, link: dict, new_category_name: str | None = None) -> "NavigationSnapshot":
+        current_category = self.link_index.get(link["id"])
+        if current_category is None:
+            raise SnapshotMismatchError(f"link not cached: {link['id']}")
+        if new_category_name is not None and new_category_name != current_category:
+            return self.with_link_deleted(link["id"]).with_link_added(new_category_name, link)
+
+        index = self._require_category(current_category)
+        categories = list(self.categories)
+        category = categories[index]
+        categories[index] = {
+            **category,
+            "links": [link if item["id"] == link["id"] else item for item in category["links"]],
+        }
+        return self._with_categories(categories)
+
+    def with_link_deleted(self, link_id: str) -> "NavigationSnapshot":
+        category_name = self.link_index.get(link_id)
+        if category_name is None:
+            raise SnapshotMismatchError(f"link not cached: {link_id}")
+        index = self._require_category(category_name)
+        categories = list(self.categories)
+        category = categories[index]
+        categories[index] = {**category, "links": [item for item in category["links"] if item["id"] != link_id]}
+        return self._with_categories(categories)
+
+    def with_links_reordered(self, link_ids: list[str]) -> "NavigationSnapshot":
+        if not link_ids:
+            raise SnapshotMismatchError("empty link order")
+        category_name = self.link_index.get(link_ids[0])
+        if category_name is None:
+            raise SnapshotMismatchError(f"link not cached: {link_ids[0]}")
+        index = self._require_category(category_name)
+        categories = list(self.categories)
+        category = categories[index]
+        by_id = {link["id"]: link for link in category["links"]}
+        if len(link_ids) != len(by_id) or set(link_ids) != set(by_id):
+            raise SnapshotMismatchError("link order does not cover cached category links")
+        categories[index] = {**category, "links": [by_id[link_id] for link_id in link_ids]}
+        return self._with_categories(categories)
+
+    def _with_categories(self, categories: list[dict]) -> "NavigationSnapshot":
+        return NavigationSnapshot(version=self.version, categories=tuple(categories))
+
+    def _find_category(self, name: str) -> int | None:
+        for index, category in enumerate(self.categories):
+            if category["name"] == name:
+                return index
+        return None
+
+    def _require_category(self, name: str) -> int:
+        index = self._find_category(name)
+        if index is None:
+            raise SnapshotMismatchError(f"category not cached: {name}")
+        return index
@@ -2,11 +2,13 @@
 
 import asyncio
 import logging
+import random
 from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from dotenv import load_dotenv
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -14,8 +16,17 @@ from fastapi.templating import Jinja2Templates
 from app.api.router import register_api_router
 from app.config import get_settings
 from app.database import check_db_connection, get_async_session_factory
-from app.services.auth import CredentialService, reset_auth_service_state
+from app.services.admission import admit_request
+from app.services.article_search import run_article_index_job, set_article_index_ready
+from app.services.auth import CredentialService, get_token_service, reset_auth_service_state
 from app.services.log import run_log_cleanup_job
+from app.services.markdown_pool import shutdown_markdown_pool
+from app.services.rate_limit import sweep_rate_limiters
+from app.services.visit_stats import run_visit_rollup_job
+from app.utils.cache import reset_cache_backend
+from app.utils.metrics import record_request_metrics
+from app.utils.profiling import ProfileStore, StackSampler
+from app.utils.query_stats import record_query_stats
 from app.web.pages import register_page_router
 
 logger = logging.getLogger(__name__)
@@ -26,6 +37,7 @@ def create_app() -> FastAPI:
     load_dotenv(dotenv_path=Path(__file__).resolve().parent.parent / ".env")
     reset_auth_service_state()
     settings = get_settings()
+    reset_cache_backend()
     ensure_runtime_directories(settings.base_dir, settings.data_dir, settings.articles_dir, settings.static_dir / "icons")
 
     app = FastAPI(title="个人主页导航系统", lifespan=build_lifespan())
@@ -62,6 +74,48 @@ def register_middlewares(app: FastAPI) -> None:
         response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
         return response
 
+    app.middleware("http")(record_query_stats)
+
+    @app.middleware("http")
+    async def profile_request(request, call_next):
+        settings = request.app.state.settings
+        if not settings.enable_profiling or not await _should_profile(request):
+            return await call_next(request)
+        sampler = StackSampler()
+        if not sampler.start():
+            return await call_next(request)
+        try:
+            response = await call_next(request)
+        finally:
+            sampler.stop()
+        store = ProfileStore(settings.profiles_dir, settings.profile_max_files)
+        try:
+            profile_id = await run_in_threadpool(store.save, sampler, request.method, request.url.path)
+        except OSError:
+            logger.exception("Failed to store request profile", extra={"path": request.url.path})
+            return response
+        response.headers["X-Profile-Id"] = profile_id
+        return response
+
+    app.middleware("http")(admit_request)
+
+    if app.state.settings.enable_metrics:
+        # Registered last so it wraps every other middleware.
+        app.middleware("http")(record_request_metrics)
+
+
+async def _should_profile(request) -> bool:
+    """Profile on an admin ``X-Profile`` header, otherwise at PROFILE_SAMPLE_RATE."""
+    if request.headers.get("x-profile", "").lower() in {"1", "true"}:
+        authorization = request.headers.get("authorization", "")
+        if not authorization.startswith("Bearer "):
+            return False
+        async with request.app.state.session_factory() as db:
+            username = await get_token_service().verify_token(authorization.removeprefix("Bearer ").strip(), db)
+        return username is not None
+    rate = request.app.state.settings.profile_sample_rate
+    return rate > 0 and random.random() < rate
+
 
 def build_lifespan():
     """Build the FastAPI lifespan handler."""
@@ -91,15 +145,25 @@ async def startup_jobs(app: FastAPI) -> None:
     app.state.log_cleanup_task = cleanup_task
     if cleanup_task is not None:
         await _run_log_cleanup_once(app, "startup")
+    app.state.article_index_task = _start_article_index_task(app)
+    app.state.visit_rollup_task = _start_visit_rollup_task(app)
+    app.state.rate_limit_sweep_task = _start_rate_limit_sweep_task(app)
 
 
 async def shutdown_jobs(app: FastAPI) -> None:
     """Tear down background jobs."""
-    cleanup_task = getattr(app.state, "log_cleanup_task", None)
-    if cleanup_task is not None:
-        cleanup_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await cleanup_task
+    for task_name in (
+        "log_cleanup_task",
+        "article_index_task",
+        "visit_rollup_task",
+        "rate_limit_sweep_task",
+    ):
+        task = getattr(app.state, task_name, None)
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    shutdown_markdown_pool()
 
 
 def ensure_runtime_directories(*paths: Path) -> None:
@@ -141,3 +205,84 @@ async def _run_log_cleanup_once(app: FastAPI, reason: str) -> None:
             "remaining_updates": summary["remaining_updates"],
         },
     )
+
+
+def _start_article_index_task(app: FastAPI) -> asyncio.Task | None:
+    # Paged listings read the filesystem until the startup reconcile finishes.
+    set_article_index_ready(False)
+    if not app.state.settings.enable_article_indexer:
+        return None
+    return asyncio.create_task(_run_periodic_article_index(app))
+
+
+async def _run_periodic_article_index(app: FastAPI) -> None:
+    # The first pass runs in the background so a large vault does not delay startup.
+    await _run_article_index_once(app, "startup")
+    interval = app.state.settings.article_index_interval_seconds
+    if interval <= 0:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        await _run_article_index_once(app, "scheduled")
+
+
+async def _run_article_index_once(app: FastAPI, reason: str) -> None:
+    try:
+        summary = await run_article_index_job(app.state.session_factory, app.state.settings.articles_dir)
+    except Exception:
+        logger.exception("Article index reconcile failed", extra={"reason": reason})
+        return
+
+    logger.info(
+        "Article index reconcile completed",
+        extra={
+            "reason": reason,
+            "indexed_articles": summary["indexed"],
+            "removed_articles": summary["removed"],
+            "total_articles": summary["total"],
+        },
+    )
+
+
+def _start_visit_rollup_task(app: FastAPI) -> asyncio.Task | None:
+    settings = app.state.settings
+    if not settings.enable_visit_rollups:
+        return None
+    if settings.visit_rollup_interval_seconds <= 0:
+        logger.warning("Periodic visit rollups disabled because VISIT_ROLLUP_INTERVAL_SECONDS <= 0")
+        return None
+    return asyncio.create_task(_run_periodic_visit_rollup(app))
+
+
+async def _run_periodic_visit_rollup(app: FastAPI) -> None:
+    while True:
+        await asyncio.sleep(app.state.settings.visit_rollup_interval_seconds)
+        await _run_visit_rollup_once(app, "scheduled")
+
+
+async def _run_visit_rollup_once(app: FastAPI, reason: str) -> None:
+    try:
+        folded = await run_visit_rollup_job(app.state.session_factory)
+    except Exception:
+        logger.exception("Visit rollup failed", extra={"reason": reason})
+        return
+
+    logger.info("Visit rollup completed", extra={"reason": reason, "folded_visits": folded})
+
+
+def _start_rate_limit_sweep_task(app: FastAPI) -> asyncio.Task | None:
+    if app.state.settings.rate_limit_sweep_interval_seconds <= 0:
+        return None
+    return asyncio.create_task(_run_periodic_rate_limit_sweep(app))
+
+
+async def _run_periodic_rate_limit_sweep(app: FastAPI) -> None:
+    while True:
+        await asyncio.sleep(app.state.settings.rate_limit_sweep_interval_seconds)
+        try:
+            removed = await run_in_threadpool(sweep_rate_limiters)
+        except Exception:
+            logger.exception("Rate limit sweep failed")
+            continue
+        if removed:
+            logger.debug("Rate limit sweep completed", extra={"removed_keys": removed})
@@ -1,10 +1,15 @@
 """Repository adapters over the existing service layer."""
 
+from datetime import datetime
+from pathlib import Path
+
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.article_search import ArticleSearchService, is_article_index_ready
 from app.services.articles import ArticleService
 from app.services.folders import FolderService
 from app.services.log import LogService
 from app.services.settings import SettingsService
+from app.services.visit_stats import VisitStatsService
 
 
 class FileArticleRepository:
@@ -13,12 +18,30 @@ class FileArticleRepository:
     def __init__(self):
         self.service = ArticleService()
 
-    async def list_articles_async(self, protected_paths: list[str], include_protected: bool) -> list[dict]:
-        return await self.service.list_articles_async(protected_paths, include_protected)
+    async def list_articles_async(
+        self,
+        protected_paths: list[str],
+        include_protected: bool,
+        folder: str | None = None,
+    ) -> list[dict]:
+        return await self.service.list_articles_async(protected_paths, include_protected, folder)
+
+    async def list_page_async(
+        self,
+        protected_paths: list[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict:
+        return await self.service.list_page_async(protected_paths, include_protected, limit, cursor, folder)
 
     async def get_article_async(self, path: str, protected_paths: list[str], allow_protected: bool) -> dict:
         return await self.service.get_article_async(path, protected_paths, allow_protected)
 
+    async def get_article_html_path_async(self, path: str, protected_paths: list[str], allow_protected: bool) -> Path:
+        return await self.service.get_article_html_path_async(path, protected_paths, allow_protected)
+
     async def sync_article_async(
         self,
         path: str,
@@ -35,6 +58,47 @@ class FileArticleRepository:
         return await self.service.delete_article_async(path)
 
 
+class SqlAlchemyArticleSearchRepository:
+    """Article search index backed by SQLite FTS5."""
+
+    def __init__(self, db: AsyncSession):
+        self.service = ArticleSearchService(db)
+
+    def is_ready(self) -> bool:
+        return is_article_index_ready()
+
+    async def index_article(self, path: str) -> None:
+        await self.service.index_article(path)
+
+    async def remove_article(self, path: str) -> None:
+        await self.service.remove_article(path)
+
+    async def rename_folder(self, name: str, new_name: str) -> None:
+        await self.service.rename_folder(name, new_name)
+
+    async def remove_folder(self, name: str) -> None:
+        await self.service.remove_folder(name)
+
+    async def search(
+        self,
+        query: str,
+        protected_paths: list[str],
+        include_protected: bool,
+        limit: int = 20,
+    ) -> list[dict]:
+        return await self.service.search(query, protected_paths, include_protected, limit)
+
+    async def list_page(
+        self,
+        protected_paths: list[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict:
+        return await self.service.list_page(protected_paths, include_protected, limit, cursor, folder)
+
+
 class FileFolderRepository:
     """Folder repository backed by the filesystem service."""
 
@@ -75,6 +139,7 @@ class SqlAlchemyLogRepository:
 
     def __init__(self, db: AsyncSession):
         self.service = LogService(db)
+        self.stats = VisitStatsService(db)
 
     async def record_visit(self, ip: str, path: str, user_agent: str = "") -> None:
         await self.service.record_visit(ip, path, user_agent)
@@ -89,14 +154,38 @@ class SqlAlchemyLogRepository:
     ) -> None:
         await self.service.record_update(action, target_type, target_name, details, username)
 
-    async def get_visits(self, limit: int = 100) -> dict:
-        return await self.service.get_visits(limit)
+    async def get_visits(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        path: str | None = None,
+        ip: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        return await self.service.get_visits(limit, cursor=cursor, path=path, ip=ip, since=since, until=until)
 
     async def clear_visits(self) -> None:
         await self.service.clear_visits()
 
-    async def get_updates(self, limit: int = 100) -> dict:
-        return await self.service.get_updates(limit)
+    async def get_visit_stats(
+        self,
+        granularity: str = "day",
+        path: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        return await self.stats.get_trend(granularity, path=path, since=since, until=until)
+
+    async def get_updates(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        target_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        return await self.service.get_updates(limit, cursor=cursor, target_type=target_type, since=since, until=until)
 
     async def clear_updates(self) -> None:
         await self.service.clear_updates()
@@ -1,8 +1,11 @@
 """SQLAlchemy models"""
+from app.models.article_index import ArticleIndexEntry
 from app.models.category import Category
 from app.models.link import Link
 from app.models.site_settings import SiteSettings
-from app.models.log import VisitLog, UpdateLog
+from app.models.log import LogCounter, VisitLog, UpdateLog
 from app.models.token_blacklist import TokenBlacklist
+from app.models.user_agent import UserAgent
+from app.models.visit_rollup import VisitRollup, VisitRollupState
 
-__all__ = ["Category", "Link", "SiteSettings", "VisitLog", "UpdateLog", "TokenBlacklist"]
+__all__ = ["ArticleIndexEntry", "Category", "Link", "SiteSettings", "LogCounter", "VisitLog", "UpdateLog", "TokenBlacklist", "UserAgent", "VisitRollup", "VisitRollupState"]
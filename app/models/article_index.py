@@ -0,0 +1,51 @@
+"""Article search index model."""
+
+from datetime import datetime
+
+from sqlalchemy import DDL, Column, DateTime, Float, Index, Integer, String, Text, event
+
+from app.database import Base
+
+ARTICLE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS article_search USING fts5("
+    "title, path, body, content='article_index', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS article_index_ai AFTER INSERT ON article_index BEGIN "
+    "INSERT INTO article_search(rowid, title, path, body) VALUES (new.id, new.title, new.path, new.body); END",
+    "CREATE TRIGGER IF NOT EXISTS article_index_ad AFTER DELETE ON article_index BEGIN "
+    "INSERT INTO article_search(article_search, rowid, title, path, body) "
+    "VALUES ('delete', old.id, old.title, old.path, old.body); END",
+    "CREATE TRIGGER IF NOT EXISTS article_index_au AFTER UPDATE ON article_index BEGIN "
+    "INSERT INTO article_search(article_search, rowid, title, path, body) "
+    "VALUES ('delete', old.id, old.title, old.path, old.body); "
+    "INSERT INTO article_search(rowid, title, path, body) VALUES (new.id, new.title, new.path, new.body); END",
+)
+ARTICLE_SEARCH_DROP_DDL = (
+    "DROP TRIGGER IF EXISTS article_index_au",
+    "DROP TRIGGER IF EXISTS article_index_ad",
+    "DROP TRIGGER IF EXISTS article_index_ai",
+    "DROP TABLE IF EXISTS article_search",
+)
+
+
+class ArticleIndexEntry(Base):
+    __tablename__ = "article_index"
+
+    id = Column(Integer, primary_key=True)
+    path = Column(String(1000), unique=True, nullable=False)
+    title = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False, default="")
+    mtime = Column(Float, nullable=False)
+    size = Column(Integer, nullable=False, default=0)
+    indexed_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("idx_article_index_mtime_path", mtime.desc(), path),
+    )
+
+
+# The FTS5 shadow table and its sync triggers are SQLite-only; other dialects
+# fall back to LIKE queries over article_index.
+for _statement in ARTICLE_SEARCH_DDL:
+    event.listen(ArticleIndexEntry.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+for _statement in ARTICLE_SEARCH_DROP_DDL:
+    event.listen(ArticleIndexEntry.__table__, "before_drop", DDL(_statement).execute_if(dialect="sqlite"))
@@ -1,6 +1,6 @@
 """Log models"""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy import DDL, Column, ForeignKey, Integer, String, Text, DateTime, Index, event
 from app.database import Base
 
 class VisitLog(Base):
@@ -9,7 +9,7 @@ class VisitLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     ip = Column(String(45), nullable=True)
     path = Column(String(500), nullable=True)
-    user_agent = Column(Text, nullable=True)
+    user_agent_id = Column(Integer, ForeignKey("user_agents.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     __table_args__ = (
@@ -30,3 +30,27 @@ class UpdateLog(Base):
     __table_args__ = (
         Index("idx_update_logs_created_at", created_at.desc()),
     )
+
+class LogCounter(Base):
+    """Row counts for log tables, maintained by triggers instead of COUNT(*)."""
+
+    __tablename__ = "log_counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+def log_counter_trigger_ddl(table_name: str) -> tuple[str, str]:
+    """Return the SQLite trigger statements that keep a table's counter current."""
+    return (
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_count_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO log_counters (name, value) VALUES ('{table_name}', 1) "
+        f"ON CONFLICT(name) DO UPDATE SET value = value + 1; END",
+        f"CREATE TRIGGER IF NOT EXISTS {table_name}_count_ad AFTER DELETE ON {table_name} BEGIN "
+        f"UPDATE log_counters SET value = value - 1 WHERE name = '{table_name}'; END",
+    )
+
+
+for _table in (VisitLog.__table__, UpdateLog.__table__):
+    for _statement in log_counter_trigger_ddl(_table.name):
+        event.listen(_table, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
@@ -0,0 +1,13 @@
+"""User-agent dimension model"""
+from sqlalchemy import Column, Integer, String, Text
+from app.database import Base
+
+
+class UserAgent(Base):
+    """Distinct user-agent strings, referenced from visit logs by id."""
+
+    __tablename__ = "user_agents"
+
+    id = Column(Integer, primary_key=True)
+    ua_hash = Column(String(32), nullable=False, unique=True)
+    value = Column(Text, nullable=False)
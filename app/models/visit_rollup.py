@@ -0,0 +1,41 @@
+"""Pre-aggregated visit statistics model."""
+
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+
+from app.database import Base
+
+ALL_PATHS = "*"
+
+
+class VisitRollup(Base):
+    """Visit count and unique-IP sketch for one path in one hour or day bucket.
+
+    Site-wide totals are stored under the ``ALL_PATHS`` path so trend queries
+    never have to sum across paths.
+    """
+
+    __tablename__ = "visit_rollups"
+
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String(10), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    path = Column(String(500), nullable=False)
+    visits = Column(Integer, nullable=False, default=0)
+    ip_sketch = Column(LargeBinary, nullable=True)
+
+    __table_args__ = (
+        Index("uq_visit_rollups_bucket", "granularity", "path", "bucket_start", unique=True),
+    )
+
+
+class VisitRollupState(Base):
+    """Rollup progress: the id of the last visit folded into ``visit_rollups``.
+
+    Workers claim each batch with a conditional update of ``watermark``, so
+    only one of them folds a given range of visits.
+    """
+
+    __tablename__ = "visit_rollup_state"
+
+    name = Column(String(50), primary_key=True)
+    watermark = Column(Integer, nullable=False, default=0)
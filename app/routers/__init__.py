@@ -7,9 +7,10 @@ from app.routers.folders import router as folders_router
 from app.routers.settings import router as settings_router
 from app.routers.logs import router as logs_router
 from app.routers.favicon import router as favicon_router
+from app.routers.profiles import router as profiles_router
 
 __all__ = [
     "auth_router", "links_router", "categories_router",
     "articles_router", "folders_router", "settings_router",
-    "logs_router", "favicon_router"
+    "logs_router", "favicon_router", "profiles_router"
 ]
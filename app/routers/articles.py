@@ -1,6 +1,9 @@
 """Articles routes."""
 
+from typing import Literal
+
 from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user, require_auth
@@ -10,8 +13,10 @@ from app.application.unit_of_work import SqlAlchemyUnitOfWork
 from app.application.use_cases.content import (
     CreateArticleUseCase,
     DeleteArticleUseCase,
+    GetArticleHtmlUseCase,
     GetArticleUseCase,
     ListArticlesUseCase,
+    SearchArticlesUseCase,
     UpdateArticleUseCase,
 )
 from app.database import get_db
@@ -19,6 +24,7 @@ from app.schemas.article import (
     ArticleDetailResponse,
     ArticleListResponse,
     ArticleMutationResponse,
+    ArticleSearchResponse,
     ArticleSyncRequest,
     ArticleUpdateRequest,
 )
@@ -28,21 +34,56 @@ router = APIRouter(prefix="/api/v1/articles", tags=["articles"])
 
 @router.get("")
 async def list_articles(
+    limit: int | None = None,
+    cursor: str | None = None,
+    folder: str | None = None,
     current_user: str | None = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> ArticleListResponse:
-    """Get article list filtered by login status."""
-    return await ListArticlesUseCase(SqlAlchemyUnitOfWork(db)).execute(include_protected=current_user is not None)
+    """Get article list filtered by login status, optionally paged by cursor."""
+    try:
+        return await ListArticlesUseCase(SqlAlchemyUnitOfWork(db)).execute(
+            include_protected=current_user is not None,
+            limit=limit,
+            cursor=cursor,
+            folder=folder,
+        )
+    except ApplicationError as exc:
+        raise_http_error(exc)
+
+
+@router.get("/search")
+async def search_articles(
+    q: str,
+    limit: int = 20,
+    current_user: str | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> ArticleSearchResponse:
+    """Full-text search over article titles, paths, and bodies."""
+    try:
+        return await SearchArticlesUseCase(SqlAlchemyUnitOfWork(db)).execute(
+            q,
+            include_protected=current_user is not None,
+            limit=limit,
+        )
+    except ApplicationError as exc:
+        raise_http_error(exc)
 
 
 @router.get("/{path:path}")
 async def get_article(
     path: str,
+    format: Literal["json", "html"] = "json",
     current_user: str | None = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ) -> ArticleDetailResponse:
-    """Get article content."""
+    """Get article content, or with ``format=html`` only the pre-rendered HTML file."""
     try:
+        if format == "html":
+            html_path = await GetArticleHtmlUseCase(SqlAlchemyUnitOfWork(db)).execute(
+                path, allow_protected=current_user is not None
+            )
+            return FileResponse(html_path, media_type="text/html; charset=utf-8")
         return await GetArticleUseCase(SqlAlchemyUnitOfWork(db)).execute(path, allow_protected=current_user is not None)
     except ApplicationError as exc:
         raise_http_error(exc)
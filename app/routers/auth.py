@@ -26,7 +26,7 @@ async def login(
 ):
     """User login."""
     client_ip = req.client.host if req.client else "unknown"
-    result = credential_service.authenticate(request.username, request.password, client_ip)
+    result = await credential_service.authenticate_async(request.username, request.password, client_ip)
     if "error" in result:
         raise HTTPException(status_code=result["status"], detail=result["error"])
     return result
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import require_auth
+from app.api.dependencies.rate_limit import rate_limit_writes
 from app.api.http import raise_http_error
 from app.application.errors import ApplicationError
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
@@ -17,7 +18,11 @@ from app.database import get_db
 from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.schemas.link import BatchReorderRequest
 
-router = APIRouter(prefix="/api/v1/categories", tags=["categories"])
+router = APIRouter(
+    prefix="/api/v1/categories",
+    tags=["categories"],
+    dependencies=[Depends(rate_limit_writes("categories"))],
+)
 
 
 @router.post("")
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import require_auth
+from app.api.dependencies.rate_limit import rate_limit_writes
 from app.api.http import raise_http_error
 from app.application.errors import ApplicationError
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
@@ -16,7 +17,11 @@ from app.application.use_cases.content import (
 from app.database import get_db
 from app.schemas.folder import FolderListResponse, FolderRenameRequest
 
-router = APIRouter(prefix="/api/v1/folders", tags=["folders"])
+router = APIRouter(
+    prefix="/api/v1/folders",
+    tags=["folders"],
+    dependencies=[Depends(rate_limit_writes("folders"))],
+)
 
 
 @router.get("")
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import get_current_user, require_auth
+from app.api.dependencies.rate_limit import rate_limit_writes
 from app.api.http import raise_http_error
 from app.application.errors import ApplicationError
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
@@ -15,12 +16,17 @@ from app.application.use_cases.navigation import (
     ImportNavigationUseCase,
     ListNavigationUseCase,
     ReorderLinkUseCase,
+    SearchLinksUseCase,
     UpdateLinkUseCase,
 )
 from app.database import get_db
 from app.schemas.link import BatchReorderRequest, ImportRequest, LinkCreate, LinkUpdate, ReorderRequest
 
-router = APIRouter(prefix="/api/v1/links", tags=["links"])
+router = APIRouter(
+    prefix="/api/v1/links",
+    tags=["links"],
+    dependencies=[Depends(rate_limit_writes("links"))],
+)
 
 
 @router.get("")
@@ -32,6 +38,24 @@ async def get_links(
     return await ListNavigationUseCase(SqlAlchemyUnitOfWork(db)).execute(include_private=current_user is not None)
 
 
+@router.get("/search")
+async def search_links(
+    q: str,
+    limit: int = 20,
+    current_user: str | None = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Search navigation links by title, URL, and category name."""
+    try:
+        return await SearchLinksUseCase(SqlAlchemyUnitOfWork(db)).execute(
+            q,
+            include_private=current_user is not None,
+            limit=limit,
+        )
+    except ApplicationError as exc:
+        raise_http_error(exc)
+
+
 @router.post("")
 async def add_link(
     category_name: str,
@@ -1,15 +1,20 @@
 """Logs routes."""
 
+from datetime import datetime
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import require_auth
+from app.api.http import raise_http_error
+from app.application.errors import ApplicationError
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
 from app.application.use_cases.logs import (
     ClearUpdateLogsUseCase,
     ClearVisitLogsUseCase,
     GetUpdateLogsUseCase,
     GetVisitLogsUseCase,
+    GetVisitStatsUseCase,
 )
 from app.database import get_db
 
@@ -19,11 +24,47 @@ router = APIRouter(prefix="/api/v1/logs", tags=["logs"])
 @router.get("/visits")
 async def get_visits(
     limit: int = 100,
+    cursor: str | None = None,
+    path: str | None = None,
+    ip: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
+    username: str = Depends(require_auth),
+    db: AsyncSession = Depends(get_db),
+):
+    """Get visit logs, newest first, paged by cursor."""
+    try:
+        return await GetVisitLogsUseCase(SqlAlchemyUnitOfWork(db)).execute(
+            limit,
+            cursor=cursor,
+            path=path,
+            ip=ip,
+            since=since,
+            until=until,
+        )
+    except ApplicationError as exc:
+        raise_http_error(exc)
+
+
+@router.get("/visits/stats")
+async def get_visit_stats(
+    granularity: str = "day",
+    path: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
     username: str = Depends(require_auth),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get visit logs."""
-    return await GetVisitLogsUseCase(SqlAlchemyUnitOfWork(db)).execute(limit)
+    """Get hourly or daily visit trends from the pre-aggregated rollups."""
+    try:
+        return await GetVisitStatsUseCase(SqlAlchemyUnitOfWork(db)).execute(
+            granularity,
+            path=path,
+            since=since,
+            until=until,
+        )
+    except ApplicationError as exc:
+        raise_http_error(exc)
 
 
 @router.delete("/visits")
@@ -38,11 +79,24 @@ async def clear_visits(
 @router.get("/updates")
 async def get_updates(
     limit: int = 100,
+    cursor: str | None = None,
+    target_type: str | None = None,
+    since: datetime | None = None,
+    until: datetime | None = None,
     username: str = Depends(require_auth),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get update logs."""
-    return await GetUpdateLogsUseCase(SqlAlchemyUnitOfWork(db)).execute(limit)
+    """Get update logs, newest first, paged by cursor."""
+    try:
+        return await GetUpdateLogsUseCase(SqlAlchemyUnitOfWork(db)).execute(
+            limit,
+            cursor=cursor,
+            target_type=target_type,
+            since=since,
+            until=until,
+        )
+    except ApplicationError as exc:
+        raise_http_error(exc)
 
 
 @router.delete("/updates")
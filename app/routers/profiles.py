@@ -0,0 +1,30 @@
+"""Request profile routes."""
+
+from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+
+from app.api.dependencies.auth import require_auth
+from app.api.http import raise_http_error
+from app.application.errors import ApplicationError
+from app.application.use_cases.profiles import GetProfileFileUseCase, ListProfilesUseCase
+from app.utils.profiling import SPEEDSCOPE_SUFFIX
+
+router = APIRouter(prefix="/api/v1/profiles", tags=["profiles"])
+
+
+@router.get("")
+async def list_profiles(username: str = Depends(require_auth)):
+    """List captured request profiles, newest first."""
+    return await run_in_threadpool(ListProfilesUseCase().execute)
+
+
+@router.get("/{filename}")
+async def download_profile(filename: str, username: str = Depends(require_auth)):
+    """Download a speedscope or collapsed-stack profile file."""
+    try:
+        target = GetProfileFileUseCase().execute(filename)
+    except ApplicationError as exc:
+        raise_http_error(exc)
+    media_type = "application/json" if filename.endswith(SPEEDSCOPE_SUFFIX) else "text/plain; charset=utf-8"
+    return FileResponse(target, media_type=media_type, filename=filename)
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.dependencies.auth import require_auth
+from app.api.dependencies.rate_limit import rate_limit_writes
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
 from app.application.use_cases.settings import GetAdminSettingsUseCase, GetSettingsUseCase, UpdateSettingsUseCase
 from app.database import get_db
@@ -14,7 +15,11 @@ from app.schemas.site_settings import (
     SiteSettingsUpdateResponse,
 )
 
-router = APIRouter(prefix="/api/v1/settings", tags=["settings"])
+router = APIRouter(
+    prefix="/api/v1/settings",
+    tags=["settings"],
+    dependencies=[Depends(rate_limit_writes("settings"))],
+)
 
 
 @router.get("", response_model=PublicSiteSettingsResponse)
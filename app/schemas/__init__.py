@@ -4,6 +4,7 @@ from app.schemas.article import (
     ArticleDetailResponse,
     ArticleListResponse,
     ArticleMutationResponse,
+    ArticleSearchResponse,
     ArticleSyncRequest,
     ArticleUpdateRequest,
 )
@@ -30,6 +31,7 @@ __all__ = [
     "ArticleDetailResponse",
     "ArticleListResponse",
     "ArticleMutationResponse",
+    "ArticleSearchResponse",
     "ArticleSyncRequest",
     "ArticleUpdateRequest",
     "FolderListResponse",
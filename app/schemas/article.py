@@ -27,12 +27,23 @@ class ArticleSummary(BaseModel):
 
 class ArticleListResponse(BaseModel):
     articles: list[ArticleSummary] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+class ArticleSearchResult(ArticleSummary):
+    snippet: str = ""
+
+
+class ArticleSearchResponse(BaseModel):
+    query: str
+    results: list[ArticleSearchResult] = Field(default_factory=list)
 
 
 class ArticleDetailResponse(BaseModel):
     path: str
     content: str
     html: str
+    toc: list[dict[str, Any]] = Field(default_factory=list)
 
 
 class ArticleMutationResponse(BaseModel):
@@ -1,5 +1,6 @@
 """Service modules."""
 
+from app.services.article_search import ArticleSearchService
 from app.services.articles import ArticleService
 from app.services.auth import (
     AuthService,
@@ -12,8 +13,10 @@ from app.services.auth import (
 from app.services.folders import FolderService
 from app.services.log import LogService
 from app.services.settings import SettingsService
+from app.services.visit_stats import VisitStatsService
 
 __all__ = [
+    "ArticleSearchService",
     "ArticleService",
     "AuthService",
     "CredentialService",
@@ -21,6 +24,7 @@ __all__ = [
     "LogService",
     "SettingsService",
     "TokenService",
+    "VisitStatsService",
     "get_auth_service",
     "get_credential_service",
     "get_token_service",
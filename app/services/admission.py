@@ -0,0 +1,156 @@
+"""Admission control: per-route-class rate limits and a global in-flight cap."""
+
+import math
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi.responses import JSONResponse
+
+from app.config import Settings, get_settings
+from app.services.rate_limit import KeyedRateLimiter, get_route_limiter
+from app.utils.metrics import HTTP_REQUESTS_REJECTED
+
+# Paths that must keep answering while the server sheds load.
+UNSHED_PREFIXES = ("/health", "/metrics", "/static/")
+
+
+@dataclass(frozen=True, slots=True)
+class RouteClass:
+    name: str
+    method: str
+    pattern: re.Pattern
+
+
+ROUTE_CLASSES = (
+    RouteClass("favicon", "POST", re.compile(r"^/api/v1/favicon/fetch/?$")),
+    RouteClass("import", "POST", re.compile(r"^/api/v1/links/import/?$")),
+    # Article detail may render Markdown; the list and search endpoints do not.
+    # Only reads that miss the rendered sidecar are charged, see ``admit_render``.
+    RouteClass("render", "GET", re.compile(r"^/api/v1/articles/(?!search/?$).+")),
+)
+RENDER = "render"
+
+_render_client: ContextVar[str | None] = ContextVar("render_client", default=None)
+
+
+class RenderRateLimitedError(Exception):
+    """Raised when a client has used up its budget of uncached Markdown renders."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("请求过于频繁，请稍后再试")
+        self.retry_after = retry_after
+
+
+def classify_request(method: str, path: str) -> str | None:
+    """Return the route class of an expensive endpoint, or None for everything else."""
+    for route_class in ROUTE_CLASSES:
+        if method == route_class.method and route_class.pattern.match(path):
+            return route_class.name
+    return None
+
+
+def route_class_limiter(name: str, settings: Settings) -> KeyedRateLimiter | None:
+    """Return the per-client token bucket for a route class, or None if it is unlimited."""
+    rate = getattr(settings, f"{name}_rate_limit_per_minute")
+    if rate <= 0:
+        return None
+    return get_route_limiter(f"route:{name}", rate, 60, getattr(settings, f"{name}_rate_limit_burst"))
+
+
+@contextmanager
+def charge_renders_to(client_ip: str) -> Iterator[None]:
+    """Charge Markdown renders started while serving this request to ``client_ip``."""
+    token = _render_client.set(client_ip)
+    try:
+        yield
+    finally:
+        _render_client.reset(token)
+
+
+def admit_render() -> None:
+    """Take one render from the current client's bucket before an uncached render.
+
+    Article reads served from the rendered sidecar never get here, so the
+    budget only bounds real Markdown work. Renders outside a charged request
+    (article writes, background jobs) are not limited.
+    """
+    client_ip = _render_client.get()
+    if client_ip is None:
+        return
+    limiter = route_class_limiter(RENDER, get_settings())
+    if limiter is None:
+        return
+    allowed, retry_after = limiter.hit(client_ip)
+    if not allowed:
+        HTTP_REQUESTS_REJECTED.inc(reason="rate_limited", route_class=RENDER)
+        raise RenderRateLimitedError(retry_after)
+
+
+class InFlightLimiter:
+    """Counts requests being served and refuses new ones beyond a fixed cap.
+
+    Only touched from the event loop thread, so a plain counter is enough.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+
+    def try_acquire(self, limit: int) -> bool:
+        if limit > 0 and self.in_flight >= limit:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+_in_flight_limiter = InFlightLimiter()
+
+
+def get_in_flight_limiter() -> InFlightLimiter:
+    """Return the process-wide in-flight request counter."""
+    return _in_flight_limiter
+
+
+def is_sheddable(path: str) -> bool:
+    return not path.startswith(UNSHED_PREFIXES)
+
+
+async def admit_request(request, call_next):
+    """HTTP middleware applying route-class rate limits and the in-flight cap.
+
+    Clients are keyed by ``request.client.host``; behind a reverse proxy that
+    is only the real client address when uvicorn trusts its forwarded headers.
+    """
+    settings = request.app.state.settings
+    path = request.url.path
+    route_class = classify_request(request.method, path)
+    client_ip = request.client.host if request.client else "unknown"
+    if route_class is not None and route_class != RENDER:
+        limiter = route_class_limiter(route_class, settings)
+        allowed, retry_after = limiter.hit(client_ip) if limiter is not None else (True, 0.0)
+        if not allowed:
+            HTTP_REQUESTS_REJECTED.inc(reason="rate_limited", route_class=route_class)
+            return JSONResponse(
+                {"detail": "请求过于频繁，请稍后再试"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+    if not is_sheddable(path):
+        return await call_next(request)
+    in_flight = get_in_flight_limiter()
+    if not in_flight.try_acquire(settings.max_in_flight_requests):
+        # Refuse before any routing, auth or DB work so overload cannot snowball.
+        HTTP_REQUESTS_REJECTED.inc(reason="overloaded", route_class=route_class or "other")
+        return JSONResponse({"detail": "服务繁忙，请稍后再试"}, status_code=503, headers={"Retry-After": "1"})
+    try:
+        if route_class == RENDER:
+            with charge_renders_to(client_ip):
+                return await call_next(request)
+        return await call_next(request)
+    finally:
+        in_flight.release()
@@ -0,0 +1,107 @@
+"""Pre-rendered article sidecars: sanitized HTML plus TOC and metadata JSON."""
+
+import json
+import os
+import secrets
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+
+from app.core import safe_path_under_root
+from app.services.markdown_render import render_document
+
+RENDER_DIR_NAME = ".rendered"
+# Bump when the rendering pipeline changes output so old sidecars are redone.
+RENDERER_VERSION = 3
+HTML_SUFFIX = ".html"
+META_SUFFIX = ".json"
+
+
+@dataclass(slots=True)
+class RenderedArticle:
+    html_path: Path
+    meta: dict
+
+    def read_html(self) -> str:
+        return self.html_path.read_text(encoding="utf-8")
+
+
+class ArticleRenderStore:
+    """Sidecars under ``<articles_dir>/.rendered`` mirroring the article tree.
+
+    ``notes/a.md`` renders to ``.rendered/notes/a.md.html`` and
+    ``.rendered/notes/a.md.json``. The JSON records the source's mtime and
+    size at render time and is written after the HTML, so a sidecar is only
+    trusted when its metadata matches the current source file.
+    """
+
+    def __init__(self, articles_dir: Path):
+        self.root = articles_dir / RENDER_DIR_NAME
+
+    def lookup(self, path: str, source_stat: os.stat_result) -> RenderedArticle | None:
+        """Return the sidecar for ``path`` if it was rendered from this version of the source."""
+        html_path, meta_path = self._paths(path)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if (
+            meta.get("renderer") != RENDERER_VERSION
+            or meta.get("source_mtime_ns") != source_stat.st_mtime_ns
+            or meta.get("source_size") != source_stat.st_size
+            or not html_path.is_file()
+        ):
+            return None
+        return RenderedArticle(html_path, meta)
+
+    def render(self, path: str, source: Path) -> RenderedArticle:
+        """Render ``source`` and store its sidecar."""
+        source_stat = source.stat()
+        html, toc = render_document(source.read_text(encoding="utf-8"))
+        return self.save(path, source_stat, html, toc)
+
+    def save(self, path: str, source_stat: os.stat_result, html: str, toc: list[dict]) -> RenderedArticle:
+        """Store rendered output; ``source_stat`` must be taken before the source was read."""
+        html_path, meta_path = self._paths(path)
+        html_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "path": path,
+            "title": next((entry["name"] for entry in toc if entry["level"] == 1), Path(path).stem),
+            "toc": toc,
+            "source_mtime_ns": source_stat.st_mtime_ns,
+            "source_size": source_stat.st_size,
+            "renderer": RENDERER_VERSION,
+        }
+        self._write(html_path, html)
+        self._write(meta_path, json.dumps(meta, ensure_ascii=False))
+        return RenderedArticle(html_path, meta)
+
+    def remove(self, path: str) -> None:
+        for target in self._paths(path):
+            target.unlink(missing_ok=True)
+
+    def move_tree(self, folder: str, new_folder: str) -> None:
+        """Follow a folder rename; renamed sources keep their mtimes, so sidecars stay valid."""
+        source = safe_path_under_root(self.root, folder)
+        if not source.is_dir():
+            return
+        target = safe_path_under_root(self.root, new_folder)
+        shutil.rmtree(target, ignore_errors=True)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        source.rename(target)
+
+    def remove_tree(self, folder: str) -> None:
+        shutil.rmtree(safe_path_under_root(self.root, folder), ignore_errors=True)
+
+    def _paths(self, path: str) -> tuple[Path, Path]:
+        base = safe_path_under_root(self.root, path)
+        return base.with_name(base.name + HTML_SUFFIX), base.with_name(base.name + META_SUFFIX)
+
+    @staticmethod
+    def _write(target: Path, content: str) -> None:
+        temp = target.with_name(f".{target.name}.{secrets.token_hex(4)}.tmp")
+        try:
+            temp.write_text(content, encoding="utf-8")
+            os.replace(temp, target)
+        finally:
+            temp.unlink(missing_ok=True)
@@ -0,0 +1,306 @@
+"""Article index service: full-text search and paged listings."""
+
+import html
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Iterable
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, literal, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.core import decode_cursor, encode_cursor, is_path_protected, normalize_article_path, safe_path_under_root
+from app.models import ArticleIndexEntry
+
+MIN_TRIGRAM_TERM_LENGTH = 3
+SNIPPET_TOKENS = 16
+SNIPPET_CONTEXT_CHARS = 60
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+DELETE_BATCH_SIZE = 500
+INDEX_BATCH_SIZE = 50
+
+BatchHook = Callable[[], Awaitable[None]]
+
+_index_ready = False
+
+
+def _highlight(raw_snippet: str) -> str:
+    """Escape a snippet and turn the sentinel markers into <mark> tags."""
+    return html.escape(raw_snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+
+
+def _build_snippet(body: str, term: str) -> str:
+    """Build a highlighted snippet around the first occurrence of term."""
+    index = body.lower().find(term.lower())
+    if index < 0:
+        excerpt = body[: SNIPPET_CONTEXT_CHARS * 2]
+        return html.escape(excerpt) + ("…" if len(body) > len(excerpt) else "")
+
+    start = max(0, index - SNIPPET_CONTEXT_CHARS)
+    end = min(len(body), index + len(term) + SNIPPET_CONTEXT_CHARS)
+    raw = (
+        ("…" if start > 0 else "")
+        + body[start:index]
+        + SNIPPET_START
+        + body[index : index + len(term)]
+        + SNIPPET_END
+        + body[index + len(term) : end]
+        + ("…" if end < len(body) else "")
+    )
+    return _highlight(raw)
+
+
+def _fts_phrase(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _protected_conditions(protected_paths: list[str], params: dict[str, object]) -> list[str]:
+    """Build SQL conditions that exclude protected paths and everything under them."""
+    conditions = []
+    for index, protected_path in enumerate(protected_paths):
+        params[f"protected_{index}"] = protected_path
+        params[f"protected_prefix_{index}"] = f"{protected_path}/"
+        conditions.append(
+            f"NOT (a.path = :protected_{index} OR "
+            f"substr(a.path, 1, length(:protected_prefix_{index})) = :protected_prefix_{index})"
+        )
+    return conditions
+
+
+def _summary(row, protected_paths: list[str]) -> dict:
+    parent = row["path"].rpartition("/")[0]
+    return {
+        "path": row["path"],
+        "title": row["title"],
+        "category": parent or None,
+        "protected": is_path_protected(row["path"], protected_paths),
+        "created_time": row["mtime"],
+    }
+
+
+class ArticleSearchService:
+    """Keep the article index in sync with the vault and serve queries from it.
+
+    On SQLite, ``article_index`` is mirrored into an FTS5 trigram table by
+    triggers. Terms shorter than a trigram, and other databases, fall back to
+    substring matching over ``article_index``.
+    """
+
+    def __init__(self, db: AsyncSession, articles_dir: Path | None = None):
+        self.db = db
+        self.articles_dir = articles_dir or get_settings().articles_dir
+
+    async def index_article(self, path: str) -> None:
+        """Index or re-index a single article from disk."""
+        normalized_path = normalize_article_path(path)
+        document = await run_in_threadpool(self._read_document, normalized_path)
+        if document is None:
+            await self.remove_article(normalized_path)
+            return
+
+        result = await self.db.execute(select(ArticleIndexEntry).where(ArticleIndexEntry.path == normalized_path))
+        entry = result.scalar_one_or_none()
+        if entry is None:
+            self.db.add(ArticleIndexEntry(path=normalized_path, **document))
+        else:
+            entry.title = document["title"]
+            entry.body = document["body"]
+            entry.mtime = document["mtime"]
+            entry.size = document["size"]
+        await self.db.flush()
+
+    async def remove_article(self, path: str) -> None:
+        """Drop a single article from the index."""
+        await self.db.execute(
+            delete(ArticleIndexEntry).where(ArticleIndexEntry.path == normalize_article_path(path))
+        )
+
+    async def rename_folder(self, name: str, new_name: str) -> None:
+        """Rewrite indexed paths after a folder rename."""
+        old_prefix = f"{normalize_article_path(name)}/"
+        new_prefix = f"{normalize_article_path(new_name)}/"
+        table = ArticleIndexEntry.__table__
+        await self.db.execute(
+            table.update()
+            .where(func.substr(table.c.path, 1, len(old_prefix)) == old_prefix)
+            .values(path=literal(new_prefix).concat(func.substr(table.c.path, len(old_prefix) + 1)))
+        )
+
+    async def remove_folder(self, name: str) -> None:
+        """Drop every indexed article under a folder."""
+        prefix = f"{normalize_article_path(name)}/"
+        await self.db.execute(
+            delete(ArticleIndexEntry).where(func.substr(ArticleIndexEntry.path, 1, len(prefix)) == prefix)
+        )
+
+    async def reconcile(
+        self,
+        batch_size: int = INDEX_BATCH_SIZE,
+        between_batches: BatchHook | None = None,
+    ) -> dict[str, int]:
+        """Bring the index in line with the vault, re-reading only changed files.
+
+        ``between_batches`` runs after every ``batch_size`` indexed files and
+        after each delete batch, so the caller can commit and let API writes
+        in while the rest of the vault is read.
+        """
+        files = await run_in_threadpool(self._scan_files)
+        result = await self.db.execute(select(ArticleIndexEntry.path, ArticleIndexEntry.mtime, ArticleIndexEntry.size))
+        indexed = {row.path: (row.mtime, row.size) for row in result}
+
+        stale_paths = [path for path, stat in files.items() if indexed.get(path) != stat]
+        removed_paths = [path for path in indexed if path not in files]
+        for count, path in enumerate(stale_paths, start=1):
+            await self.index_article(path)
+            if between_batches is not None and count % batch_size == 0:
+                await between_batches()
+        for start in range(0, len(removed_paths), DELETE_BATCH_SIZE):
+            batch = removed_paths[start : start + DELETE_BATCH_SIZE]
+            await self.db.execute(delete(ArticleIndexEntry).where(ArticleIndexEntry.path.in_(batch)))
+            if between_batches is not None:
+                await between_batches()
+        return {"indexed": len(stale_paths), "removed": len(removed_paths), "total": len(files)}
+
+    async def search(
+        self,
+        query: str,
+        protected_paths: Iterable[str],
+        include_protected: bool,
+        limit: int = 20,
+    ) -> list[dict]:
+        """Search title, path, and body; protected paths are filtered in SQL."""
+        terms = list(dict.fromkeys(term for term in query.split() if term))
+        if not terms:
+            return []
+
+        protected_paths = [path for path in (normalize_article_path(item) for item in protected_paths) if path]
+        params: dict[str, object] = {"limit": limit}
+        conditions = [] if include_protected else _protected_conditions(protected_paths, params)
+
+        use_fts = self.db.bind.dialect.name == "sqlite"
+        fts_terms = [term for term in terms if use_fts and len(term) >= MIN_TRIGRAM_TERM_LENGTH]
+        for index, term in enumerate(term for term in terms if term not in fts_terms):
+            params[f"term_{index}"] = term.lower()
+            conditions.append(
+                f"(instr(lower(a.title), :term_{index}) > 0 OR instr(lower(a.path), :term_{index}) > 0 "
+                f"OR instr(lower(a.body), :term_{index}) > 0)"
+            )
+
+        if fts_terms:
+            params.update(
+                match=" ".join(_fts_phrase(term) for term in fts_terms),
+                snippet_start=SNIPPET_START,
+                snippet_end=SNIPPET_END,
+            )
+            where = " AND ".join(["article_search MATCH :match", *conditions])
+            statement = text(
+                "SELECT a.path, a.title, a.mtime, "
+                f"snippet(article_search, 2, :snippet_start, :snippet_end, '…', {SNIPPET_TOKENS}) AS snippet "
+                "FROM article_search JOIN article_index a ON a.id = article_search.rowid "
+                f"WHERE {where} ORDER BY bm25(article_search, 5.0, 2.0, 1.0) LIMIT :limit"
+            )
+        else:
+            where = " AND ".join(conditions) or "1 = 1"
+            statement = text(
+                "SELECT a.path, a.title, a.mtime, a.body FROM article_index a "
+                f"WHERE {where} ORDER BY a.mtime DESC, a.path ASC LIMIT :limit"
+            )
+
+        rows = (await self.db.execute(statement, params)).mappings().all()
+        return [
+            {
+                **_summary(row, protected_paths),
+                "snippet": _highlight(row["snippet"]) if fts_terms else _build_snippet(row["body"], terms[0]),
+            }
+            for row in rows
+        ]
+
+    async def list_page(
+        self,
+        protected_paths: Iterable[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict:
+        """Return one page of articles ordered by (mtime DESC, path ASC).
+
+        The keyset predicate walks ``idx_article_index_mtime_path`` so the cost
+        of a page does not depend on how deep into the vault it starts.
+        """
+        protected_paths = [path for path in (normalize_article_path(item) for item in protected_paths) if path]
+        params: dict[str, object] = {"limit": limit + 1}
+        conditions = [] if include_protected else _protected_conditions(protected_paths, params)
+
+        if cursor:
+            cursor_mtime, cursor_path = decode_cursor(cursor, 2)
+            if not isinstance(cursor_mtime, (int, float)) or not isinstance(cursor_path, str):
+                raise ValueError("分页游标无效")
+            params.update(cursor_mtime=cursor_mtime, cursor_path=cursor_path)
+            conditions.append("(a.mtime < :cursor_mtime OR (a.mtime = :cursor_mtime AND a.path > :cursor_path))")
+
+        folder_prefix = normalize_article_path(folder or "")
+        if folder_prefix:
+            params["folder_prefix"] = f"{folder_prefix}/"
+            conditions.append("substr(a.path, 1, length(:folder_prefix)) = :folder_prefix")
+
+        where = " AND ".join(conditions) or "1 = 1"
+        statement = text(
+            "SELECT a.path, a.title, a.mtime FROM article_index a "
+            f"WHERE {where} ORDER BY a.mtime DESC, a.path ASC LIMIT :limit"
+        )
+        rows = (await self.db.execute(statement, params)).mappings().all()
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1]["mtime"], page[-1]["path"]) if len(rows) > limit else None
+        return {"articles": [_summary(row, protected_paths) for row in page], "next_cursor": next_cursor}
+
+    def _read_document(self, path: str) -> dict | None:
+        article_path = safe_path_under_root(self.articles_dir, path)
+        if not article_path.is_file() or article_path.suffix.lower() != ".md":
+            return None
+        stat = article_path.stat()
+        return {
+            "title": article_path.stem,
+            "body": article_path.read_text(encoding="utf-8", errors="replace"),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+
+    def _scan_files(self) -> dict[str, tuple[float, int]]:
+        files: dict[str, tuple[float, int]] = {}
+        if not self.articles_dir.exists():
+            return files
+        for path in self.articles_dir.rglob("*.md"):
+            stat = path.stat()
+            files[path.relative_to(self.articles_dir).as_posix()] = (stat.st_mtime, stat.st_size)
+        return files
+
+
+def is_article_index_ready() -> bool:
+    """Whether paged listings may be served from the index in this process.
+
+    The index only tracks the vault once the indexer is enabled and its first
+    reconcile since startup has finished.
+    """
+    return _index_ready and get_settings().enable_article_indexer
+
+
+def set_article_index_ready(ready: bool) -> None:
+    """Record whether the index has been reconciled with the vault."""
+    global _index_ready
+    _index_ready = ready
+
+
+async def run_article_index_job(session_factory, articles_dir: Path | None = None) -> dict[str, int]:
+    """Reconcile the article search index using the provided async session factory.
+
+    Indexed files are committed in batches so the SQLite write lock is not
+    held while the rest of the vault is read.
+    """
+    async with session_factory() as db:
+        summary = await ArticleSearchService(db, articles_dir).reconcile(between_batches=db.commit)
+        await db.commit()
+    set_article_index_ready(True)
+    return summary
@@ -1,61 +1,21 @@
 """Article service."""
 
+import logging
+import os
 from pathlib import Path
 from typing import Iterable
 
-import bleach
-import markdown
 import yaml
 from fastapi.concurrency import run_in_threadpool
 
 from app.config import get_settings
-from app.core import is_path_protected, normalize_article_path, safe_path_under_root
-
-MARKDOWN_EXTENSIONS = [
-    "fenced_code",
-    "tables",
-    "toc",
-    "codehilite",
-    "nl2br",
-    "sane_lists",
-]
-ALLOWED_TAGS = [
-    "p",
-    "a",
-    "strong",
-    "em",
-    "ul",
-    "ol",
-    "li",
-    "code",
-    "pre",
-    "h1",
-    "h2",
-    "h3",
-    "h4",
-    "h5",
-    "h6",
-    "blockquote",
-    "hr",
-    "br",
-    "img",
-    "table",
-    "thead",
-    "tbody",
-    "tr",
-    "th",
-    "td",
-    "div",
-    "span",
-]
-ALLOWED_ATTRIBUTES = {
-    "a": ["href", "title"],
-    "img": ["src", "alt"],
-    "code": ["class"],
-    "pre": ["class"],
-    "div": ["class"],
-    "span": ["class"],
-}
+from app.core import decode_cursor, encode_cursor, is_path_protected, normalize_article_path, safe_path_under_root
+from app.services.admission import admit_render
+from app.services.article_renders import ArticleRenderStore
+from app.services.markdown_pool import get_markdown_pool
+from app.services.markdown_render import render_document, render_markdown
+
+logger = logging.getLogger(__name__)
 
 
 class ArticleAuthenticationRequiredError(PermissionError):
@@ -67,14 +27,21 @@ class ArticleService:
 
     def __init__(self, articles_dir: Path | None = None):
         self.articles_dir = articles_dir or get_settings().articles_dir
+        self.renders = ArticleRenderStore(self.articles_dir)
 
-    def list_articles(self, protected_paths: Iterable[str], include_protected: bool) -> list[dict]:
-        """List articles visible to the current caller."""
+    def list_articles(
+        self,
+        protected_paths: Iterable[str],
+        include_protected: bool,
+        folder: str | None = None,
+    ) -> list[dict]:
+        """List articles visible to the current caller, optionally under one folder."""
         articles: list[dict] = []
-        if not self.articles_dir.exists():
+        search_root = safe_path_under_root(self.articles_dir, folder) if folder else self.articles_dir
+        if not search_root.exists():
             return articles
 
-        for path in self.articles_dir.rglob("*.md"):
+        for path in search_root.rglob("*.md"):
             rel_path = path.relative_to(self.articles_dir)
             rel_path_str = rel_path.as_posix()
             protected = is_path_protected(rel_path_str, protected_paths)
@@ -96,12 +63,60 @@ class ArticleService:
         articles.sort(key=lambda item: item["created_time"], reverse=True)
         return articles
 
-    async def list_articles_async(self, protected_paths: Iterable[str], include_protected: bool) -> list[dict]:
+    async def list_articles_async(
+        self,
+        protected_paths: Iterable[str],
+        include_protected: bool,
+        folder: str | None = None,
+    ) -> list[dict]:
         """Run blocking article listing off the event loop."""
-        return await run_in_threadpool(self.list_articles, protected_paths, include_protected)
+        return await run_in_threadpool(self.list_articles, protected_paths, include_protected, folder)
+
+    def list_page(
+        self,
+        protected_paths: Iterable[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict:
+        """Page the on-disk listing in the article index's (mtime DESC, path ASC) order.
+
+        Used when the index is disabled or not yet reconciled; cursors are
+        interchangeable with the index's so a client can page across the switch.
+        """
+        articles = self.list_articles(protected_paths, include_protected, folder)
+        articles.sort(key=lambda item: (-item["created_time"], item["path"]))
+        if cursor:
+            cursor_mtime, cursor_path = decode_cursor(cursor, 2)
+            if not isinstance(cursor_mtime, (int, float)) or not isinstance(cursor_path, str):
+                raise ValueError("分页游标无效")
+            articles = [
+                item
+                for item in articles
+                if item["created_time"] < cursor_mtime
+                or (item["created_time"] == cursor_mtime and item["path"] > cursor_path)
+            ]
+        page = articles[:limit]
+        next_cursor = encode_cursor(page[-1]["created_time"], page[-1]["path"]) if len(articles) > limit else None
+        return {"articles": page, "next_cursor": next_cursor}
+
+    async def list_page_async(
+        self,
+        protected_paths: Iterable[str],
+        include_protected: bool,
+        limit: int,
+        cursor: str | None = None,
+        folder: str | None = None,
+    ) -> dict:
+        """Run blocking paged listing off the event loop."""
+        return await run_in_threadpool(self.list_page, protected_paths, include_protected, limit, cursor, folder)
 
     def get_article(self, path: str, protected_paths: Iterable[str], allow_protected: bool) -> dict:
         """Read article content and rendered HTML."""
+        return self._load_article(path, protected_paths, allow_protected, render_below=None)[0]
+
+    def _resolve_article(self, path: str, protected_paths: Iterable[str], allow_protected: bool) -> tuple[str, Path]:
         normalized_path = normalize_article_path(path)
         if is_path_protected(normalized_path, protected_paths) and not allow_protected:
             raise ArticleAuthenticationRequiredError("需要登录才能查看此文章")
@@ -109,13 +124,32 @@ class ArticleService:
         article_path = safe_path_under_root(self.articles_dir, normalized_path)
         if not article_path.exists() or not article_path.is_file() or article_path.suffix.lower() != ".md":
             raise FileNotFoundError("文章不存在")
+        return normalized_path, article_path
+
+    def _load_article(
+        self,
+        path: str,
+        protected_paths: Iterable[str],
+        allow_protected: bool,
+        render_below: int | None,
+    ) -> tuple[dict, os.stat_result]:
+        """Read an article and its HTML, rendering only when the sidecar is stale.
 
+        Stale articles of at least ``render_below`` characters come back with
+        ``html`` set to None so the caller can render them elsewhere.
+        """
+        normalized_path, article_path = self._resolve_article(path, protected_paths, allow_protected)
+        source_stat = article_path.stat()
         content = article_path.read_text(encoding="utf-8")
-        return {
-            "path": normalized_path,
-            "content": content,
-            "html": self.render_markdown(content),
-        }
+        article = {"path": normalized_path, "content": content, "html": None, "toc": []}
+        rendered = self.renders.lookup(normalized_path, source_stat)
+        if rendered is not None:
+            article["html"], article["toc"] = rendered.read_html(), rendered.meta["toc"]
+        elif render_below is None or len(content) < render_below:
+            admit_render()
+            article["html"], article["toc"] = render_document(content)
+            self._store_render(normalized_path, source_stat, article["html"], article["toc"])
+        return article, source_stat
 
     async def get_article_async(
         self,
@@ -123,8 +157,45 @@ class ArticleService:
         protected_paths: Iterable[str],
         allow_protected: bool,
     ) -> dict:
-        """Run blocking article reads and markdown rendering off the event loop."""
-        return await run_in_threadpool(self.get_article, path, protected_paths, allow_protected)
+        """Run blocking article reads and markdown rendering off the event loop.
+
+        With a render pool configured, large documents are rendered in a
+        worker process instead of on the threadpool.
+        """
+        pool = get_markdown_pool()
+        if pool is None:
+            return await run_in_threadpool(self.get_article, path, protected_paths, allow_protected)
+        article, source_stat = await run_in_threadpool(
+            self._load_article, path, protected_paths, allow_protected, pool.min_chars
+        )
+        if article["html"] is None:
+            admit_render()
+            article["html"], article["toc"] = await pool.render(article["content"])
+            await run_in_threadpool(self._store_render, article["path"], source_stat, article["html"], article["toc"])
+        return article
+
+    def get_article_html_path(self, path: str, protected_paths: Iterable[str], allow_protected: bool) -> Path:
+        """Return the rendered HTML sidecar for an article, re-rendering it if stale."""
+        normalized_path, article_path = self._resolve_article(path, protected_paths, allow_protected)
+        return self._html_path(normalized_path, article_path)
+
+    async def get_article_html_path_async(
+        self,
+        path: str,
+        protected_paths: Iterable[str],
+        allow_protected: bool,
+    ) -> Path:
+        """Run blocking sidecar lookups and rendering off the event loop.
+
+        With a render pool configured, stale large documents are rendered
+        through it (and its timeout) exactly as ``get_article_async`` does.
+        """
+        if get_markdown_pool() is None:
+            return await run_in_threadpool(self.get_article_html_path, path, protected_paths, allow_protected)
+        article = await self.get_article_async(path, protected_paths, allow_protected)
+        article_path = safe_path_under_root(self.articles_dir, article["path"])
+        # The sidecar was just stored; this only renders again if that failed or the source changed since.
+        return await run_in_threadpool(self._html_path, article["path"], article_path)
 
     def sync_article(self, path: str, content: str, title: str | None = None, frontmatter: dict | None = None) -> dict:
         """Write article content, optionally prepending frontmatter."""
@@ -143,6 +214,7 @@ class ArticleService:
             final_content = f"---\n{frontmatter_str}---\n\n{content}"
 
         article_path.write_text(final_content, encoding="utf-8")
+        self._prerender(normalized_path, article_path)
         return {
             "message": "文章同步成功",
             "path": normalized_path,
@@ -173,6 +245,7 @@ class ArticleService:
             raise FileNotFoundError("文章不存在")
 
         article_path.write_text(content, encoding="utf-8")
+        self._prerender(normalized_path, article_path)
         return {"path": normalized_path, "title": article_path.stem}
 
     async def update_article_async(self, path: str, content: str) -> dict:
@@ -188,19 +261,34 @@ class ArticleService:
 
         title = article_path.stem
         article_path.unlink()
+        self.renders.remove(normalized_path)
         return {"path": normalized_path, "title": title}
 
     async def delete_article_async(self, path: str) -> dict:
         """Run blocking article deletion off the event loop."""
         return await run_in_threadpool(self.delete_article, path)
 
+    def _html_path(self, path: str, article_path: Path) -> Path:
+        rendered = self.renders.lookup(path, article_path.stat())
+        if rendered is None:
+            admit_render()
+            rendered = self.renders.render(path, article_path)
+        return rendered.html_path
+
+    def _prerender(self, path: str, article_path: Path) -> None:
+        # Articles are read far more often than written, so render once here.
+        try:
+            self.renders.render(path, article_path)
+        except OSError:
+            logger.warning("Failed to pre-render article", extra={"path": path}, exc_info=True)
+
+    def _store_render(self, path: str, source_stat: os.stat_result, html: str, toc: list[dict]) -> None:
+        try:
+            self.renders.save(path, source_stat, html, toc)
+        except OSError:
+            logger.warning("Failed to store rendered article", extra={"path": path}, exc_info=True)
+
     @staticmethod
     def render_markdown(content: str) -> str:
         """Render markdown and sanitize HTML output."""
-        html_content = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS)
-        return bleach.clean(
-            html_content,
-            tags=ALLOWED_TAGS,
-            attributes=ALLOWED_ATTRIBUTES,
-            strip=True,
-        )
+        return render_markdown(content)
@@ -4,6 +4,7 @@ from dataclasses import dataclass
 from datetime import datetime, timedelta
 from functools import lru_cache
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -80,6 +81,14 @@ class CredentialService:
         )
         return {"access_token": access_token, "token_type": "bearer"}
 
+    async def authenticate_async(self, username: str, password: str, client_ip: str) -> dict:
+        """Run password hashing and rate-limiter I/O off the event loop.
+
+        Every limiter backend locks its own state, so concurrent threadpool
+        logins cannot lose recorded failures.
+        """
+        return await run_in_threadpool(self.authenticate, username, password, client_ip)
+
     def validate_config(self) -> list[str]:
         """Validate security configuration for the login boundary."""
         errors: list[str] = []
@@ -176,6 +185,9 @@ class AuthService:
     def authenticate(self, username: str, password: str, client_ip: str) -> dict:
         return self.credential_service.authenticate(username, password, client_ip)
 
+    async def authenticate_async(self, username: str, password: str, client_ip: str) -> dict:
+        return await self.credential_service.authenticate_async(username, password, client_ip)
+
     async def verify_token(self, token: str, db: AsyncSession) -> str | None:
         return await self.token_service.verify_token(token, db)
 
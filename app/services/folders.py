@@ -7,6 +7,7 @@ from fastapi.concurrency import run_in_threadpool
 
 from app.config import get_settings
 from app.core import normalize_article_path, safe_path_under_root
+from app.services.article_renders import ArticleRenderStore
 
 
 def _normalize_folder_name(name: str, message: str = "目录名称无效") -> str:
@@ -35,6 +36,9 @@ class FolderService:
             relative_path = item.relative_to(self.articles_dir).as_posix()
             if not relative_path or relative_path == ".":
                 continue
+            # Hidden directories hold tool state such as rendered sidecars, not articles.
+            if any(part.startswith(".") for part in item.relative_to(self.articles_dir).parts):
+                continue
             folders.append(
                 {
                     "name": relative_path,
@@ -77,6 +81,7 @@ class FolderService:
             raise FileExistsError("目标目录已存在")
 
         folder_path.rename(new_path)
+        ArticleRenderStore(self.articles_dir).move_tree(normalized_name, normalized_new_name)
         return {"old_name": normalized_name, "new_name": normalized_new_name}
 
     async def rename_folder_async(self, name: str, new_name: str) -> dict:
@@ -92,6 +97,7 @@ class FolderService:
 
         article_count = len(list(folder_path.rglob("*.md")))
         shutil.rmtree(folder_path)
+        ArticleRenderStore(self.articles_dir).remove_tree(normalized_name)
         return {"name": normalized_name, "article_count": article_count}
 
     async def delete_folder_async(self, name: str) -> dict:
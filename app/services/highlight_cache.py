@@ -0,0 +1,300 @@
+"""Content-addressed cache of syntax-highlighted code blocks.
+
+Pygments lexing dominates rendering of technical notes, and the same snippets
+recur across articles and across edits of one article. Highlighted HTML is
+cached under a hash of everything that affects it: language, source, the
+highlighter options (style, CSS class, line numbers, ...) and the Markdown and
+Pygments versions. A bounded in-process LRU sits in front of an optional SQLite
+file, so entries survive restarts and are shared with render-pool workers.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+import markdown
+import pygments
+
+from app.config import get_settings
+from app.utils.metrics import CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_ENTRIES = 2048
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+TRIM_EVERY_WRITES = 64
+TOUCH_BATCH_SIZE = 64
+BUSY_TIMEOUT = 0.5
+
+
+def highlight_key(*parts: object) -> str:
+    """Hash the inputs of one highlight call into a cache key."""
+    material = repr((markdown.__version__, pygments.__version__, parts))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class HighlightCache:
+    """Highlighted HTML keyed by ``highlight_key``.
+
+    The memory layer holds at most ``memory_entries`` blocks. With a ``path``
+    the SQLite layer keeps about ``max_bytes`` of HTML: every
+    ``TRIM_EVERY_WRITES`` writes (and on open) the least recently used rows
+    beyond the budget are deleted. Hits served from the file only note the
+    key; ``last_used`` is written for ``TOUCH_BATCH_SIZE`` keys at a time,
+    so reads do not open a write transaction each.
+
+    Renders run on many threads at once, so each thread reads and writes the
+    file (WAL mode) through its own connection, and the lock only guards the
+    in-memory LRU, counters and pending ``last_used`` batch; no SQLite call
+    runs under it.
+
+    The file is only an optimisation: a write that finds it locked past
+    ``BUSY_TIMEOUT`` is skipped, and any other ``sqlite3.Error`` (disk full,
+    corrupt file) is logged and the cache carries on in memory only.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        path: Path | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.memory_entries = max(1, memory_entries)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._touched: dict[str, float] = {}
+        self._path = Path(path) if path is not None else None
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        if self._path is not None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._open()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            html = self._memory.get(key)
+            if html is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+        if html is None:
+            html = self._load(key)
+            with self._lock:
+                if html is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self._remember(key, html)
+        CACHE_REQUESTS.inc(prefix="highlight", result="miss" if html is None else "hit")
+        return html
+
+    def set(self, key: str, html: str) -> None:
+        with self._lock:
+            self._remember(key, html)
+            self._touched.pop(key, None)
+            self._writes += 1
+            trim = self._writes % TRIM_EVERY_WRITES == 0
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO highlights (key, html, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, html, len(html.encode("utf-8")), time.time()),
+            )
+            if trim:
+                self._trim(conn)
+        except sqlite3.Error as exc:
+            self._handle_error(exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+        conn = self._connection()
+        if conn is not None:
+            try:
+                conn.execute("DELETE FROM highlights")
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+
+    def stored_bytes(self) -> int:
+        conn = self._connection()
+        if conn is None:
+            return 0
+        try:
+            self._flush_touched(conn)
+            return conn.execute("SELECT coalesce(sum(size), 0) FROM highlights").fetchone()[0]
+        except sqlite3.Error as exc:
+            self._handle_error(exc)
+            return 0
+
+    def close(self) -> None:
+        conn = self._connection()
+        if conn is not None:
+            try:
+                self._flush_touched(conn)
+            except sqlite3.Error:
+                logger.warning("Failed to record highlight cache usage on close", exc_info=True)
+        self._close_connections()
+
+    def _open(self) -> None:
+        conn = self._connection()
+        if conn is None:
+            return
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS highlights ("
+                "key TEXT PRIMARY KEY, html TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._trim(conn)
+        except sqlite3.Error as exc:
+            self._handle_error(exc)
+
+    def _connection(self) -> sqlite3.Connection | None:
+        """Return the calling thread's connection, opening it on first use."""
+        if self._path is None:
+            return None
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            try:
+                conn = sqlite3.connect(
+                    str(self._path), check_same_thread=False, isolation_level=None, timeout=BUSY_TIMEOUT
+                )
+                conn.execute("PRAGMA synchronous=NORMAL")
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+                return None
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def _load(self, key: str) -> str | None:
+        conn = self._connection()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute("SELECT html FROM highlights WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as exc:
+            self._handle_error(exc)
+            return None
+        if row is None:
+            return None
+        with self._lock:
+            self._touched[key] = time.time()
+            flush = len(self._touched) >= TOUCH_BATCH_SIZE
+        if flush:
+            try:
+                self._flush_touched(conn)
+            except sqlite3.Error as exc:
+                self._handle_error(exc)
+        return row[0]
+
+    def _remember(self, key: str, html: str) -> None:
+        self._memory[key] = html
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if not touched:
+            return
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "UPDATE highlights SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in touched.items()],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _handle_error(self, exc: sqlite3.Error) -> None:
+        if isinstance(exc, sqlite3.OperationalError) and "locked" in str(exc):
+            # Another thread or render worker holds the write lock; skip this write.
+            logger.debug("Highlight cache file busy; skipping write")
+            return
+        logger.warning("Highlight cache file failed; continuing in memory only", exc_info=True)
+        with self._lock:
+            self._touched.clear()
+        self._close_connections()
+
+    def _close_connections(self) -> None:
+        with self._lock:
+            self._path = None
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def _trim(self, conn: sqlite3.Connection) -> None:
+        # Keep the most recently used rows whose running size fits the budget.
+        self._flush_touched(conn)
+        conn.execute(
+            "DELETE FROM highlights WHERE key IN ("
+            "SELECT key FROM (SELECT key, sum(size) OVER (ORDER BY last_used DESC, rowid DESC) AS running "
+            "FROM highlights) WHERE running > ?)",
+            (self.max_bytes,),
+        )
+
+
+_highlight_cache: HighlightCache | None = None
+_highlight_cache_built = False
+_highlight_cache_lock = threading.Lock()
+
+
+def build_highlight_cache() -> HighlightCache | None:
+    """Build the cache from settings; None when it is disabled."""
+    settings = get_settings()
+    if settings.highlight_cache_entries <= 0:
+        return None
+    return HighlightCache(
+        memory_entries=settings.highlight_cache_entries,
+        path=settings.highlight_cache_path if settings.highlight_cache_persist else None,
+        max_bytes=settings.highlight_cache_max_bytes,
+    )
+
+
+def get_highlight_cache() -> HighlightCache | None:
+    """Return the process-wide highlight cache, building it on first use."""
+    global _highlight_cache, _highlight_cache_built
+    if not _highlight_cache_built:
+        with _highlight_cache_lock:
+            if not _highlight_cache_built:
+                _highlight_cache = build_highlight_cache()
+                _highlight_cache_built = True
+    return _highlight_cache
+
+
+def set_highlight_cache(cache: HighlightCache | None) -> None:
+    """Replace the active highlight cache; None disables caching."""
+    global _highlight_cache, _highlight_cache_built
+    with _highlight_cache_lock:
+        previous, _highlight_cache = _highlight_cache, cache
+        _highlight_cache_built = True
+    if previous is not None and previous is not cache:
+        previous.close()
+
+
+def reset_highlight_cache() -> None:
+    """Drop the active cache so the next render rebuilds it from settings."""
+    global _highlight_cache, _highlight_cache_built
+    with _highlight_cache_lock:
+        previous, _highlight_cache = _highlight_cache, None
+        _highlight_cache_built = False
+    if previous is not None:
+        previous.close()
@@ -1,45 +1,102 @@
 """Log service."""
 
-from sqlalchemy import delete, select
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, delete, func, or_, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
-from app.models import UpdateLog, VisitLog
+from app.core import decode_cursor, encode_cursor
+from app.models import LogCounter, UpdateLog, UserAgent, VisitLog
+from app.services.log_archive import LogArchive
+from app.services.user_agents import UserAgentService
+from app.services.visit_stats import VisitStatsService, run_visit_rollup_job
+
+logger = logging.getLogger(__name__)
+
+BatchHook = Callable[[], Awaitable[None]]
+ProgressCallback = Callable[[str, int, int], None]
+VACUUM_FREE_RATIO = 0.25
+SQLITE_AUTO_VACUUM_INCREMENTAL = 2
+
+
+def _format_time(value: datetime | None) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+
+def _row_statement(model):
+    """Select a log table's columns, resolving visit user-agent ids back to strings."""
+    if model is VisitLog:
+        columns = [column for column in VisitLog.__table__.c if column.name != "user_agent_id"]
+        return select(*columns, UserAgent.value.label("user_agent")).outerjoin(
+            UserAgent, VisitLog.user_agent_id == UserAgent.id
+        )
+    return select(*model.__table__.c)
+
+
+def _time_range_conditions(model, since: datetime | None, until: datetime | None) -> list:
+    conditions = []
+    if since is not None:
+        conditions.append(model.created_at >= since)
+    if until is not None:
+        conditions.append(model.created_at < until)
+    return conditions
 
 
 class LogService:
     """Service for managing logs."""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, archive: LogArchive | None = None):
         self.db = db
+        self.archive = archive
 
     async def record_visit(self, ip: str, path: str, user_agent: str = "") -> None:
-        """Record a visit."""
-        self.db.add(VisitLog(ip=ip, path=path, user_agent=user_agent))
+        """Record a visit; the user agent is stored as an id into ``user_agents``."""
+        user_agent_id = await UserAgentService(self.db).resolve_id(user_agent)
+        self.db.add(VisitLog(ip=ip, path=path, user_agent_id=user_agent_id))
 
-    async def get_visits(self, limit: int = 100) -> dict:
-        """Get visit logs."""
-        result = await self.db.execute(
-            select(VisitLog).order_by(VisitLog.created_at.desc()).limit(limit)
-        )
-        visits = result.scalars().all()
-        total = await self._count_visits()
+    async def get_visits(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        path: str | None = None,
+        ip: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        """Get one page of visit logs, newest first.
+
+        ``path`` matches as a prefix and ``ip`` exactly; ``total`` is the size of
+        the whole table, read from the maintained counter.
+        """
+        conditions = _time_range_conditions(VisitLog, since, until)
+        if path:
+            conditions.append(VisitLog.path.startswith(path, autoescape=True))
+        if ip:
+            conditions.append(VisitLog.ip == ip)
+        visits, next_cursor = await self._page(VisitLog, conditions, limit, cursor)
         return {
             "visits": [
                 {
                     "ip": visit.ip,
                     "path": visit.path,
-                    "user_agent": visit.user_agent,
-                    "time": visit.created_at.strftime("%Y-%m-%d %H:%M:%S") if visit.created_at else "",
+                    "user_agent": visit.user_agent or "",
+                    "time": _format_time(visit.created_at),
                 }
                 for visit in visits
             ],
-            "total": total,
+            "total": await self._count_visits(),
+            "next_cursor": next_cursor,
         }
 
     async def clear_visits(self) -> None:
-        """Clear all visit logs."""
+        """Clear all visit logs; existing rollups are kept."""
         await self.db.execute(delete(VisitLog))
+        await VisitStatsService(self.db).reset_watermark()
 
     async def record_update(
         self,
@@ -60,13 +117,19 @@ class LogService:
             )
         )
 
-    async def get_updates(self, limit: int = 100) -> dict:
-        """Get update logs."""
-        result = await self.db.execute(
-            select(UpdateLog).order_by(UpdateLog.created_at.desc()).limit(limit)
-        )
-        updates = result.scalars().all()
-        total = await self._count_updates()
+    async def get_updates(
+        self,
+        limit: int = 100,
+        cursor: str | None = None,
+        target_type: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        """Get one page of update logs, newest first."""
+        conditions = _time_range_conditions(UpdateLog, since, until)
+        if target_type:
+            conditions.append(UpdateLog.target_type == target_type)
+        updates, next_cursor = await self._page(UpdateLog, conditions, limit, cursor)
         return {
             "updates": [
                 {
@@ -75,71 +138,197 @@ class LogService:
                     "target_name": update.target_name,
                     "details": update.details,
                     "username": update.username,
-                    "time": update.created_at.strftime("%Y-%m-%d %H:%M:%S") if update.created_at else "",
+                    "time": _format_time(update.created_at),
                 }
                 for update in updates
             ],
-            "total": total,
+            "total": await self._count_updates(),
+            "next_cursor": next_cursor,
         }
 
     async def clear_updates(self) -> None:
         """Clear all update logs."""
         await self.db.execute(delete(UpdateLog))
 
-    async def cleanup_old_visits(self, max_records: int | None = None) -> int:
-        """Keep only the newest visit logs."""
-        keep_count = max_records if max_records is not None else get_settings().max_visit_records
-        count = await self._count_visits()
-        if count <= keep_count:
-            return 0
+    async def cleanup_old_visits(
+        self,
+        max_records: int | None = None,
+        max_age_days: int | None = None,
+        batch_size: int | None = None,
+        between_batches: BatchHook | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> int:
+        """Drop visit logs beyond the count and age limits, oldest first, in id-range batches."""
+        settings = get_settings()
+        return await self._apply_retention(
+            VisitLog,
+            keep_count=max_records if max_records is not None else settings.max_visit_records,
+            max_age_days=max_age_days if max_age_days is not None else settings.max_visit_age_days,
+            batch_size=batch_size or settings.log_cleanup_batch_size,
+            between_batches=between_batches,
+            progress=progress,
+        )
 
-        delete_count = count - keep_count
-        subquery = (
-            select(VisitLog.id)
-            .order_by(VisitLog.created_at.asc(), VisitLog.id.asc())
-            .limit(delete_count)
+    async def cleanup_old_updates(
+        self,
+        max_records: int | None = None,
+        max_age_days: int | None = None,
+        batch_size: int | None = None,
+        between_batches: BatchHook | None = None,
+        progress: ProgressCallback | None = None,
+    ) -> int:
+        """Drop update logs beyond the count and age limits, oldest first, in id-range batches."""
+        settings = get_settings()
+        return await self._apply_retention(
+            UpdateLog,
+            keep_count=max_records if max_records is not None else settings.max_update_records,
+            max_age_days=max_age_days if max_age_days is not None else settings.max_update_age_days,
+            batch_size=batch_size or settings.log_cleanup_batch_size,
+            between_batches=between_batches,
+            progress=progress,
         )
-        result = await self.db.execute(delete(VisitLog).where(VisitLog.id.in_(subquery)))
-        return result.rowcount or 0
-
-    async def cleanup_old_updates(self, max_records: int | None = None) -> int:
-        """Keep only the newest update logs."""
-        keep_count = max_records if max_records is not None else get_settings().max_update_records
-        count = await self._count_updates()
-        if count <= keep_count:
+
+    async def _apply_retention(
+        self,
+        model,
+        keep_count: int,
+        max_age_days: int,
+        batch_size: int,
+        between_batches: BatchHook | None,
+        progress: ProgressCallback | None,
+    ) -> int:
+        """Delete every row with an id at or below the retention cutoff.
+
+        Log ids grow with insertion time, so the oldest rows form an id prefix.
+        Each batch is a primary-key range delete of at most ``batch_size``
+        rows, copied to the archive first when one is configured;
+        ``between_batches`` runs after each one so the caller can commit and
+        let other writers in.
+        """
+        cutoff_id = await self._retention_cutoff(model, keep_count, max_age_days)
+        if cutoff_id is None:
             return 0
 
-        delete_count = count - keep_count
-        subquery = (
-            select(UpdateLog.id)
-            .order_by(UpdateLog.created_at.asc(), UpdateLog.id.asc())
-            .limit(delete_count)
+        total = (await self.db.execute(select(func.count(model.id)).where(model.id <= cutoff_id))).scalar() or 0
+        deleted = 0
+        while deleted < total:
+            # The id of the batch_size-th oldest remaining row bounds this batch.
+            batch_end = (
+                await self.db.execute(
+                    select(model.id).order_by(model.id.asc()).offset(batch_size - 1).limit(1)
+                )
+            ).scalar()
+            if batch_end is None or batch_end > cutoff_id:
+                batch_end = cutoff_id
+            if self.archive is not None:
+                rows = (await self.db.execute(_row_statement(model).where(model.id <= batch_end))).mappings().all()
+                await run_in_threadpool(self.archive.append, model.__tablename__, [dict(row) for row in rows])
+            result = await self.db.execute(delete(model).where(model.id <= batch_end))
+            deleted += result.rowcount or 0
+            if progress is not None:
+                progress(model.__tablename__, deleted, total)
+            if batch_end >= cutoff_id:
+                break
+            if between_batches is not None:
+                await between_batches()
+            await asyncio.sleep(0)
+        return deleted
+
+    async def _retention_cutoff(self, model, keep_count: int, max_age_days: int) -> int | None:
+        """Return the newest id that falls outside the count or age limit, if any."""
+        cutoffs = []
+        if keep_count >= 0:
+            cutoffs.append(
+                (
+                    await self.db.execute(
+                        select(model.id).order_by(model.id.desc()).offset(keep_count).limit(1)
+                    )
+                ).scalar()
+            )
+        if max_age_days > 0:
+            expires_before = datetime.utcnow() - timedelta(days=max_age_days)
+            cutoffs.append(
+                (
+                    await self.db.execute(
+                        select(model.id)
+                        .where(model.created_at < expires_before)
+                        .order_by(model.created_at.desc(), model.id.desc())
+                        .limit(1)
+                    )
+                ).scalar()
+            )
+        cutoffs = [cutoff for cutoff in cutoffs if cutoff is not None]
+        return max(cutoffs) if cutoffs else None
+
+    async def _page(self, model, conditions: list, limit: int, cursor: str | None) -> tuple[list, str | None]:
+        """Fetch one keyset page ordered by (created_at DESC, id DESC)."""
+        if cursor:
+            cursor_time, cursor_id = decode_cursor(cursor, 2)
+            try:
+                cursor_created_at = datetime.fromisoformat(cursor_time)
+            except (TypeError, ValueError) as exc:
+                raise ValueError("分页游标无效") from exc
+            if not isinstance(cursor_id, int):
+                raise ValueError("分页游标无效")
+            conditions = [
+                *conditions,
+                or_(
+                    model.created_at < cursor_created_at,
+                    and_(model.created_at == cursor_created_at, model.id < cursor_id),
+                ),
+            ]
+
+        result = await self.db.execute(
+            _row_statement(model)
+            .where(*conditions)
+            .order_by(model.created_at.desc(), model.id.desc())
+            .limit(limit + 1)
         )
-        result = await self.db.execute(delete(UpdateLog).where(UpdateLog.id.in_(subquery)))
-        return result.rowcount or 0
+        rows = result.all()
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit and page:
+            next_cursor = encode_cursor(page[-1].created_at.isoformat(), page[-1].id)
+        return page, next_cursor
 
     async def _count_visits(self) -> int:
         """Count total visits."""
-        from sqlalchemy import func
-
-        result = await self.db.execute(select(func.count(VisitLog.id)))
-        return result.scalar() or 0
+        return await self._count(VisitLog)
 
     async def _count_updates(self) -> int:
         """Count total updates."""
-        from sqlalchemy import func
+        return await self._count(UpdateLog)
+
+    async def _count(self, model) -> int:
+        """Read a table's row count from log_counters, counting rows only when it is missing.
 
-        result = await self.db.execute(select(func.count(UpdateLog.id)))
+        On SQLite the counters are kept current by insert/delete triggers, so
+        reads never scan the log tables.
+        """
+        result = await self.db.execute(select(LogCounter.value).where(LogCounter.name == model.__tablename__))
+        value = result.scalar_one_or_none()
+        if value is not None:
+            return value
+        result = await self.db.execute(select(func.count(model.id)))
         return result.scalar() or 0
 
     async def cleanup_logs(
         self,
         max_visits: int | None = None,
         max_updates: int | None = None,
+        max_visit_age_days: int | None = None,
+        max_update_age_days: int | None = None,
+        batch_size: int | None = None,
+        between_batches: BatchHook | None = None,
+        progress: ProgressCallback | None = None,
     ) -> dict[str, int]:
         """Run both retention policies and report deleted and remaining counts."""
-        deleted_visits = await self.cleanup_old_visits(max_visits)
-        deleted_updates = await self.cleanup_old_updates(max_updates)
+        deleted_visits = await self.cleanup_old_visits(
+            max_visits, max_visit_age_days, batch_size, between_batches, progress
+        )
+        deleted_updates = await self.cleanup_old_updates(
+            max_updates, max_update_age_days, batch_size, between_batches, progress
+        )
         remaining_visits = await self._count_visits()
         remaining_updates = await self._count_updates()
         return {
@@ -149,10 +338,59 @@ class LogService:
             "remaining_updates": remaining_updates,
         }
 
+    async def compact(self, min_free_ratio: float = VACUUM_FREE_RATIO) -> bool:
+        """Return free pages to the filesystem once enough of the SQLite file is unused.
+
+        Databases created with ``auto_vacuum=INCREMENTAL`` release the free
+        pages in place; others run a full ``VACUUM``, which must happen outside
+        a transaction, so call this after committing the deletes.
+        """
+        if self.db.bind.dialect.name != "sqlite":
+            return False
+        page_count = (await self.db.execute(text("PRAGMA page_count"))).scalar() or 0
+        freelist_count = (await self.db.execute(text("PRAGMA freelist_count"))).scalar() or 0
+        if not page_count or freelist_count / page_count < min_free_ratio:
+            return False
 
-async def run_log_cleanup_job(session_factory, max_visits: int | None = None, max_updates: int | None = None) -> dict[str, int]:
-    """Run a full log cleanup cycle using the provided async session factory."""
+        auto_vacuum = (await self.db.execute(text("PRAGMA auto_vacuum"))).scalar()
+        if auto_vacuum == SQLITE_AUTO_VACUUM_INCREMENTAL:
+            await self.db.execute(text("PRAGMA incremental_vacuum"))
+        else:
+            await self.db.execute(text("VACUUM"))
+        return True
+
+
+async def run_log_cleanup_job(
+    session_factory,
+    max_visits: int | None = None,
+    max_updates: int | None = None,
+    max_visit_age_days: int | None = None,
+    max_update_age_days: int | None = None,
+    progress: ProgressCallback | None = None,
+) -> dict[str, int]:
+    """Run a full log cleanup cycle using the provided async session factory.
+
+    Every delete batch is committed on its own so the SQLite write lock is
+    only held for one batch at a time.
+    """
+    settings = get_settings()
+    if settings.enable_visit_rollups:
+        # Fold visits into the rollups before retention drops them.
+        await run_visit_rollup_job(session_factory)
+    archive = LogArchive(settings.log_archive_dir) if settings.enable_log_archive else None
     async with session_factory() as db:
-        summary = await LogService(db).cleanup_logs(max_visits=max_visits, max_updates=max_updates)
+        summary = await LogService(db, archive).cleanup_logs(
+            max_visits=max_visits,
+            max_updates=max_updates,
+            max_visit_age_days=max_visit_age_days,
+            max_update_age_days=max_update_age_days,
+            between_batches=db.commit,
+            progress=progress,
+        )
         await db.commit()
-        return summary
+
+    if summary["deleted_visits"] or summary["deleted_updates"]:
+        async with session_factory() as db:
+            if await LogService(db).compact():
+                logger.info("Log database compacted after cleanup")
+    return summary
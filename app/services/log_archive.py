@@ -0,0 +1,98 @@
+"""Append-only compressed archive for log rows dropped by retention."""
+
+import gzip
+import json
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+from pathlib import Path
+
+from app.config import get_settings
+
+SEGMENT_SUFFIX = ".ndjson.gz"
+
+
+def _serialize(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _segment_day(path: Path) -> date | None:
+    try:
+        return date.fromisoformat(path.name[: -len(SEGMENT_SUFFIX)])
+    except ValueError:
+        return None
+
+
+class LogArchive:
+    """Daily gzip NDJSON segments under ``<root>/<table>/<YYYY-MM-DD>.ndjson.gz``.
+
+    Rows are filed by their ``created_at`` day. Each append writes a new gzip
+    member to the end of the segment, so existing data is never rewritten and
+    plain ``gzip`` readers see one continuous stream. Archival happens before
+    the delete commits, so a failed cleanup can archive the same rows twice.
+    """
+
+    def __init__(self, root: Path | None = None):
+        self.root = root or get_settings().log_archive_dir
+
+    def append(self, table: str, rows: Iterable[dict]) -> int:
+        """Append rows to their daily segments and return how many were written."""
+        by_day: dict[str, list[str]] = {}
+        for row in rows:
+            created_at = row.get("created_at")
+            day = created_at.date().isoformat() if isinstance(created_at, datetime) else "undated"
+            record = {key: _serialize(value) for key, value in row.items()}
+            by_day.setdefault(day, []).append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+
+        if not by_day:
+            return 0
+        directory = self.root / table
+        directory.mkdir(parents=True, exist_ok=True)
+        written = 0
+        for day, lines in by_day.items():
+            with gzip.open(directory / f"{day}{SEGMENT_SUFFIX}", "at", encoding="utf-8") as segment:
+                segment.write("\n".join(lines) + "\n")
+            written += len(lines)
+        return written
+
+    def list_segments(self, table: str) -> list[Path]:
+        """Return the dated segment files for a table, oldest first."""
+        directory = self.root / table
+        if not directory.is_dir():
+            return []
+        segments = [path for path in directory.glob(f"*{SEGMENT_SUFFIX}") if _segment_day(path) is not None]
+        return sorted(segments, key=lambda path: path.name)
+
+    def iter_records(
+        self,
+        table: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[dict]:
+        """Lazily yield archived rows in ``[since, until)``, oldest segment first.
+
+        Only segments whose day overlaps the range are opened, and each is
+        decompressed line by line.
+        """
+        for segment in self.list_segments(table):
+            day = _segment_day(segment)
+            if since is not None and day < since.date():
+                continue
+            if until is not None and day > until.date():
+                break
+            with gzip.open(segment, "rt", encoding="utf-8") as lines:
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    created_at = record.get("created_at")
+                    if since is not None or until is not None:
+                        created = datetime.fromisoformat(created_at) if created_at else None
+                        if created is None:
+                            continue
+                        if since is not None and created < since:
+                            continue
+                        if until is not None and created >= until:
+                            continue
+                    yield record
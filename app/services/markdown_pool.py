@@ -0,0 +1,137 @@
+"""Optional process pool for rendering large Markdown documents.
+
+Python-Markdown, Pygments and bleach are pure Python and hold the GIL, so a
+large article rendered on a worker thread still stalls every other request in
+the process. When ``MARKDOWN_PROCESS_WORKERS`` is set, documents of at least
+``MARKDOWN_PROCESS_MIN_CHARS`` characters are rendered in child processes;
+smaller ones stay on the threadpool, where the pickling round trip would cost
+more than it saves.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import get_settings
+from app.utils.metrics import MARKDOWN_RENDERS
+
+logger = logging.getLogger(__name__)
+
+
+class MarkdownRenderTimeoutError(TimeoutError):
+    """Raised when a document takes longer than the render timeout."""
+
+
+def _render(content: str) -> tuple[str, list[dict]]:
+    from app.services.markdown_render import render_document
+
+    return render_document(content)
+
+
+class MarkdownRenderPool:
+    """Bounded process pool in front of ``render_document``.
+
+    At most ``max_pending`` documents are queued or rendering at once; further
+    large documents render on the threadpool instead of piling up behind the
+    pool. A render not finished within ``timeout`` seconds, queue wait
+    included, raises ``MarkdownRenderTimeoutError``; the worker still finishes
+    it in the background and is then reused. Its slot is only released when
+    the executor is done with it, so timeouts under overload do not let more
+    work pile up in the executor than ``max_pending``.
+    """
+
+    def __init__(self, workers: int, min_chars: int, max_pending: int, timeout: float):
+        self.workers = max(1, workers)
+        self.min_chars = min_chars
+        self.max_pending = max(1, max_pending)
+        self.timeout = timeout
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def render(self, content: str) -> tuple[str, list[dict]]:
+        """Return sanitized HTML and the table of contents for ``content``."""
+        if self.pending >= self.max_pending:
+            MARKDOWN_RENDERS.inc(mode="overflow")
+            return await run_in_threadpool(_render, content)
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        executor = self._get_executor()
+        try:
+            future = executor.submit(_render, content)
+        except BrokenProcessPool:
+            self.pending -= 1
+            return await self._recover(content, executor)
+        future.add_done_callback(lambda _: self._release(loop))
+        try:
+            rendered = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout if self.timeout > 0 else None)
+        except asyncio.TimeoutError as exc:
+            MARKDOWN_RENDERS.inc(mode="timeout")
+            raise MarkdownRenderTimeoutError("文章渲染超时") from exc
+        except BrokenProcessPool:
+            return await self._recover(content, executor)
+        MARKDOWN_RENDERS.inc(mode="process")
+        return rendered
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Runs on the executor's management thread; hand the decrement back to the loop.
+        try:
+            loop.call_soon_threadsafe(self._decrement)
+        except RuntimeError:
+            # The loop is already closed, e.g. during shutdown.
+            self._decrement()
+
+    def _decrement(self) -> None:
+        self.pending -= 1
+
+    async def _recover(self, content: str, broken: ProcessPoolExecutor) -> tuple[str, list[dict]]:
+        # Only retire the executor that broke: another request may already have replaced it.
+        if self._executor is broken:
+            logger.exception("Markdown render pool broke; recreating it")
+            self._executor = None
+            broken.shutdown(wait=False, cancel_futures=True)
+        MARKDOWN_RENDERS.inc(mode="overflow")
+        return await run_in_threadpool(_render, content)
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers do not inherit the server's threads, sockets or event loop.
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+
+_render_pool: MarkdownRenderPool | None = None
+
+
+def get_markdown_pool() -> MarkdownRenderPool | None:
+    """Return the render pool, or None when process rendering is disabled."""
+    global _render_pool
+    settings = get_settings()
+    if settings.markdown_process_workers <= 0:
+        return None
+    if _render_pool is None:
+        _render_pool = MarkdownRenderPool(
+            workers=settings.markdown_process_workers,
+            min_chars=settings.markdown_process_min_chars,
+            max_pending=settings.markdown_process_max_pending,
+            timeout=settings.markdown_render_timeout_seconds,
+        )
+    return _render_pool
+
+
+def shutdown_markdown_pool() -> None:
+    """Stop the worker processes; the pool is rebuilt on next use."""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
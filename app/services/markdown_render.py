@@ -0,0 +1,239 @@
+"""Markdown to sanitized HTML with reusable, per-thread parser and sanitizer."""
+
+import re
+import threading
+import xml.etree.ElementTree as etree
+
+from bleach.sanitizer import Cleaner
+from markdown import Markdown
+from markdown.extensions import Extension, codehilite, fenced_code
+from markdown.extensions.attr_list import get_attrs
+from markdown.extensions.toc import slugify
+
+from app.services.highlight_cache import get_highlight_cache, highlight_key
+
+MARKDOWN_EXTENSIONS = [
+    "fenced_code",
+    "tables",
+    "toc",
+    "codehilite",
+    "nl2br",
+    "sane_lists",
+]
+# Heading ids share the page's id namespace, so every one carries this prefix.
+HEADING_ID_PREFIX = "toc-"
+HEADING_ID_PATTERN = re.compile(rf"{re.escape(HEADING_ID_PREFIX)}[\w-]*")
+
+
+def heading_slug(value: str, separator: str) -> str:
+    """``toc`` slugify that namespaces the anchor ids it generates."""
+    return HEADING_ID_PREFIX + slugify(value, separator)
+
+
+def _allow_heading_attribute(tag: str, name: str, value: str) -> bool:
+    # Author-written ``<hN id="...">`` outside the prefix could shadow ids the page relies on.
+    return name == "id" and HEADING_ID_PATTERN.fullmatch(value) is not None
+
+
+MARKDOWN_EXTENSION_CONFIGS = {"toc": {"slugify": heading_slug}}
+ALLOWED_TAGS = frozenset(
+    [
+        "p",
+        "a",
+        "strong",
+        "em",
+        "ul",
+        "ol",
+        "li",
+        "code",
+        "pre",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "blockquote",
+        "hr",
+        "br",
+        "img",
+        "table",
+        "thead",
+        "tbody",
+        "tr",
+        "th",
+        "td",
+        "div",
+        "span",
+    ]
+)
+ALLOWED_ATTRIBUTES = {
+    # Heading ids are the anchors the ``toc`` extension's entries point at.
+    **{f"h{level}": _allow_heading_attribute for level in range(1, 7)},
+    "a": ["href", "title"],
+    "img": ["src", "alt"],
+    "code": ["class"],
+    "pre": ["class"],
+    "div": ["class"],
+    "span": ["class"],
+}
+
+
+class CachedCodeHilite(codehilite.CodeHilite):
+    """``CodeHilite`` that looks highlighted blocks up in the highlight cache first."""
+
+    def hilite(self, shebang: bool = True) -> str:
+        cache = get_highlight_cache()
+        if cache is None:
+            return super().hilite(shebang)
+        formatter = self.pygments_formatter
+        key = highlight_key(
+            self.lang,
+            self.src,
+            shebang,
+            self.guess_lang,
+            self.use_pygments,
+            self.lang_prefix,
+            formatter if isinstance(formatter, str) else f"{formatter.__module__}.{formatter.__qualname__}",
+            sorted(self.options.items()),
+        )
+        html = cache.get(key)
+        if html is None:
+            html = super().hilite(shebang)
+            cache.set(key, html)
+        return html
+
+
+class CachedHiliteTreeprocessor(codehilite.HiliteTreeprocessor):
+    """``codehilite`` tree processor that highlights indented blocks with ``CachedCodeHilite``."""
+
+    def run(self, root: etree.Element) -> None:
+        for block in root.iter("pre"):
+            if len(block) != 1 or block[0].tag != "code":
+                continue
+            config = self.config.copy()
+            style = config.pop("pygments_style", "default")
+            code = CachedCodeHilite(
+                self.code_unescape(block[0].text), tab_length=self.md.tab_length, style=style, **config
+            )
+            placeholder = self.md.htmlStash.store(code.hilite())
+            # The placeholder paragraph is swapped for the stashed HTML on output.
+            block.clear()
+            block.tag = "p"
+            block.text = placeholder
+
+
+class CachedFencedBlockPreprocessor(fenced_code.FencedBlockPreprocessor):
+    """``fenced_code`` preprocessor that highlights Pygments blocks with ``CachedCodeHilite``.
+
+    Blocks that ``codehilite`` would highlight are stashed here; the rest
+    (``use_pygments=false``) are left for the stock ``run``, which then only
+    sees plain blocks. The render parity tests compare the output with the
+    stock pipeline.
+    """
+
+    def run(self, lines: list[str]) -> list[str]:
+        self._find_codehilite_config()
+        text = "\n".join(lines)
+        position = 0
+        while match := self.FENCED_BLOCK_RE.search(text, position):
+            html = self._highlight(match)
+            if html is None:
+                position = match.end()
+                continue
+            placeholder = self.md.htmlStash.store(html)
+            text = f"{text[:match.start()]}\n{placeholder}\n{text[match.end():]}"
+            position = match.start() + len(placeholder) + 2
+        return super().run(text.split("\n"))
+
+    def _find_codehilite_config(self) -> None:
+        if self.codehilite_conf:
+            return
+        for extension in self.md.registeredExtensions:
+            if isinstance(extension, codehilite.CodeHiliteExtension):
+                self.codehilite_conf = extension.getConfigs()
+
+    def _highlight(self, match: re.Match) -> str | None:
+        lang, classes, config = None, [], {}
+        if match.group("attrs"):
+            _, classes, config = self.handle_attrs(get_attrs(match.group("attrs")))
+            if classes:
+                lang = classes.pop(0)
+        else:
+            lang = match.group("lang") or None
+            if match.group("hl_lines"):
+                config["hl_lines"] = codehilite.parse_hl_lines(match.group("hl_lines"))
+        conf = self.codehilite_conf
+        if not (conf and conf["use_pygments"] and config.get("use_pygments", True)):
+            return None
+        local_config = {**conf, **config}
+        if classes:
+            # Pygments may append a suffix to the last class, so ``css_class`` stays last.
+            local_config["css_class"] = f"{' '.join(classes)} {local_config['css_class']}"
+        style = local_config.pop("pygments_style", "default")
+        return CachedCodeHilite(match.group("code"), lang=lang, style=style, **local_config).hilite(shebang=False)
+
+
+class HighlightCacheExtension(Extension):
+    """Route this instance's ``codehilite`` and ``fenced_code`` blocks through the highlight cache.
+
+    Must be listed after both extensions; it replaces their registered
+    processors on this ``Markdown`` instance only.
+    """
+
+    def extendMarkdown(self, md: Markdown) -> None:
+        fenced = md.preprocessors["fenced_code_block"]
+        md.preprocessors.register(CachedFencedBlockPreprocessor(md, fenced.config), "fenced_code_block", 25)
+        hiliter = CachedHiliteTreeprocessor(md)
+        hiliter.config = md.treeprocessors["hilite"].config
+        md.treeprocessors.register(hiliter, "hilite", 30)
+
+
+class MarkdownRenderer:
+    """A configured ``Markdown`` instance and bleach ``Cleaner`` built once.
+
+    ``markdown.markdown()`` resolves and instantiates every extension on each
+    call; here that happens once and ``reset()`` clears per-document state
+    (TOC ids, stashed HTML) between renders. Neither object is thread-safe,
+    so ``render_markdown`` keeps one renderer per thread.
+    """
+
+    def __init__(self):
+        self.markdown = Markdown(
+            extensions=[*MARKDOWN_EXTENSIONS, HighlightCacheExtension()],
+            extension_configs=MARKDOWN_EXTENSION_CONFIGS,
+        )
+        self.cleaner = Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+
+    def render(self, content: str) -> str:
+        return self.render_document(content)[0]
+
+    def render_document(self, content: str) -> tuple[str, list[dict]]:
+        """Return sanitized HTML and the heading tree from the ``toc`` extension."""
+        try:
+            html = self.markdown.convert(content)
+            toc = self.markdown.toc_tokens
+        finally:
+            self.markdown.reset()
+        return self.cleaner.clean(html), toc
+
+
+_local = threading.local()
+
+
+def get_renderer() -> MarkdownRenderer:
+    """Return the calling thread's renderer, building it on first use."""
+    renderer = getattr(_local, "renderer", None)
+    if renderer is None:
+        renderer = _local.renderer = MarkdownRenderer()
+    return renderer
+
+
+def render_markdown(content: str) -> str:
+    """Render markdown and sanitize the HTML output."""
+    return get_renderer().render(content)
+
+
+def render_document(content: str) -> tuple[str, list[dict]]:
+    """Render markdown to sanitized HTML plus its table of contents."""
+    return get_renderer().render_document(content)
@@ -1,7 +1,11 @@
 ﻿"""Rate limit service abstractions."""
 
+import math
+import sqlite3
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict
+from pathlib import Path
 from typing import Protocol
 
 from app.config import get_settings
@@ -20,46 +24,269 @@ class RateLimiter(Protocol):
         """Clear state for a caller after success."""
 
 
+DEFAULT_MAX_KEYS = 100_000
+
+
+class _LoginState:
+    __slots__ = ("stamps", "next_index", "lockout_until")
+
+    def __init__(self, max_attempts: int):
+        self.stamps = [0.0] * max_attempts
+        self.next_index = 0
+        self.lockout_until = 0.0
+
+    @property
+    def last_failure(self) -> float:
+        return self.stamps[self.next_index - 1]
+
+
 class InMemoryRateLimiter:
-    """Simple in-memory rate limiter for login attempts."""
+    """In-process login rate limiter with bounded memory.
+
+    Each key keeps a fixed ring of its last ``max_attempts`` failure times, so
+    a key costs the same no matter how often it fails. The caller is locked
+    out once the oldest of those failures is still inside the window. At most
+    ``max_keys`` keys are tracked; beyond that the least recently failing key
+    is evicted, and ``sweep()`` drops keys that are idle and not locked out.
+    ``check()`` never creates state for unknown keys. Every method takes a
+    lock, since login checks run in the threadpool while sweeps may run
+    elsewhere.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int,
+        window_seconds: int,
+        lockout_seconds: int,
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.window_seconds = window_seconds
+        self.lockout_seconds = lockout_seconds
+        self.max_keys = max(1, max_keys)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._states: OrderedDict[str, _LoginState] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def check(self, key: str) -> tuple[bool, int]:
+        now = time.time()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                return True, 0
+            if state.lockout_until > now:
+                return False, int(state.lockout_until - now)
+            state.lockout_until = 0.0
+            return True, 0
+
+    def record_failure(self, key: str) -> None:
+        now = time.time()
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _LoginState(self.max_attempts)
+                while len(self._states) > self.max_keys:
+                    self._states.popitem(last=False)
+                    self.evictions += 1
+            else:
+                self._states.move_to_end(key)
+            state.stamps[state.next_index] = now
+            state.next_index = (state.next_index + 1) % self.max_attempts
+            # After the write, ``next_index`` points at the oldest of the last N failures.
+            oldest = state.stamps[state.next_index]
+            if oldest and now - oldest < self.window_seconds:
+                state.lockout_until = now + self.lockout_seconds
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+    def clear_all(self) -> None:
+        """Helper for tests."""
+        with self._lock:
+            self._states.clear()
+
+    def sweep(self) -> int:
+        """Drop keys whose failures all left the window and that are not locked out."""
+        now = time.time()
+        with self._lock:
+            idle = [
+                key
+                for key, state in self._states.items()
+                if state.lockout_until <= now and now - state.last_failure >= self.window_seconds
+            ]
+            for key in idle:
+                del self._states[key]
+        return len(idle)
+
+
+class _Cell:
+    __slots__ = ("tat",)
+
+    def __init__(self, tat: float):
+        self.tat = tat
+
+
+class KeyedRateLimiter:
+    """Generic per-key limiter using GCRA (the generic cell rate algorithm).
+
+    Allows ``rate`` requests per ``period`` seconds with bursts of up to
+    ``burst`` requests. Each key stores a single "theoretical arrival time",
+    so state is one float per key; keys are capped at ``max_keys`` with LRU
+    eviction, and ``sweep()`` drops keys whose budget has fully recovered.
+    """
+
+    def __init__(self, rate: int, period: float, burst: int, max_keys: int = DEFAULT_MAX_KEYS):
+        self.limits = (rate, period, burst)
+        self.interval = period / max(1, rate)
+        self.tolerance = self.interval * (max(1, burst) - 1)
+        self.max_keys = max(1, max_keys)
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._cells: OrderedDict[str, _Cell] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._cells)
+
+    def hit(self, key: str) -> tuple[bool, float]:
+        """Consume one request for ``key``; return whether it is allowed and seconds until it would be."""
+        now = time.time()
+        with self._lock:
+            cell = self._cells.get(key)
+            tat = max(cell.tat, now) if cell is not None else now
+            wait = tat - self.tolerance - now
+            if wait > 0:
+                self._cells.move_to_end(key)
+                return False, wait
+            if cell is None:
+                self._cells[key] = _Cell(tat + self.interval)
+                while len(self._cells) > self.max_keys:
+                    self._cells.popitem(last=False)
+                    self.evictions += 1
+            else:
+                cell.tat = tat + self.interval
+                self._cells.move_to_end(key)
+        return True, 0.0
+
+    def clear_all(self) -> None:
+        """Helper for tests."""
+        with self._lock:
+            self._cells.clear()
+
+    def sweep(self) -> int:
+        """Drop keys that have no outstanding debt and return how many were removed."""
+        now = time.time()
+        with self._lock:
+            idle = [key for key, cell in self._cells.items() if cell.tat <= now]
+            for key in idle:
+                del self._cells[key]
+        return len(idle)
 
-    def __init__(self, max_attempts: int, window_seconds: int, lockout_seconds: int):
+
+class SqliteRateLimiter:
+    """Login rate limiter persisted in a SQLite file shared by all worker processes.
+
+    Each key keeps one row with a sliding-window counter: failures in the
+    current fixed window plus the previous window's total, weighted by how
+    much of it still overlaps the sliding window. That is O(1) state per key,
+    and lockouts survive restarts. Rows idle for two windows with no active
+    lockout are swept periodically.
+    """
+
+    SWEEP_EVERY_WRITES = 256
+
+    def __init__(self, path: Path, max_attempts: int, window_seconds: int, lockout_seconds: int):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
         self.max_attempts = max_attempts
-        self.window_seconds = window_seconds
+        self.window_seconds = max(1, window_seconds)
         self.lockout_seconds = lockout_seconds
-        self._attempts: dict[str, list[float]] = defaultdict(list)
-        self._lockouts: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS login_rate_limits ("
+            "key TEXT PRIMARY KEY, window_start REAL NOT NULL, current_count INTEGER NOT NULL, "
+            "previous_count INTEGER NOT NULL, lockout_until REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
 
     def check(self, key: str) -> tuple[bool, int]:
         now = time.time()
-        self._prune_attempts(key, now)
-        lockout_until = self._lockouts.get(key, 0)
-        if lockout_until > now:
-            return False, int(lockout_until - now)
-        if key in self._lockouts:
-            self._lockouts.pop(key, None)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lockout_until FROM login_rate_limits WHERE key = ?", (key,)
+            ).fetchone()
+        if row is not None and row[0] > now:
+            return False, int(row[0] - now)
         return True, 0
 
     def record_failure(self, key: str) -> None:
         now = time.time()
-        self._prune_attempts(key, now)
-        self._attempts[key].append(now)
-        if len(self._attempts[key]) >= self.max_attempts:
-            self._lockouts[key] = now + self.lockout_seconds
+        window_start = math.floor(now / self.window_seconds) * self.window_seconds
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT window_start, current_count, previous_count, lockout_until "
+                    "FROM login_rate_limits WHERE key = ?",
+                    (key,),
+                ).fetchone()
+                current, previous, lockout_until = 1, 0, 0.0
+                if row is not None:
+                    lockout_until = row[3]
+                    if row[0] == window_start:
+                        current, previous = row[1] + 1, row[2]
+                    elif row[0] == window_start - self.window_seconds:
+                        previous = row[1]
+                if self.estimate(previous, current, now - window_start) >= self.max_attempts:
+                    lockout_until = now + self.lockout_seconds
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO login_rate_limits "
+                    "(key, window_start, current_count, previous_count, lockout_until, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, window_start, current, previous, lockout_until, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY_WRITES == 0:
+                self._sweep(now)
+
+    def estimate(self, previous: int, current: int, elapsed_in_window: float) -> float:
+        """Approximate failures in the trailing window from two fixed-window counters."""
+        overlap = max(0.0, 1.0 - elapsed_in_window / self.window_seconds)
+        return previous * overlap + current
 
     def clear(self, key: str) -> None:
-        self._attempts.pop(key, None)
-        self._lockouts.pop(key, None)
+        with self._lock:
+            self._conn.execute("DELETE FROM login_rate_limits WHERE key = ?", (key,))
 
     def clear_all(self) -> None:
         """Helper for tests."""
-        self._attempts.clear()
-        self._lockouts.clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM login_rate_limits")
 
-    def _prune_attempts(self, key: str, now: float) -> None:
-        self._attempts[key] = [stamp for stamp in self._attempts[key] if now - stamp < self.window_seconds]
-        if not self._attempts[key]:
-            self._attempts.pop(key, None)
+    def sweep(self) -> int:
+        """Delete idle keys without an active lockout and return how many were removed."""
+        with self._lock:
+            return self._sweep(time.time())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _sweep(self, now: float) -> int:
+        return self._conn.execute(
+            "DELETE FROM login_rate_limits WHERE updated_at < ? AND lockout_until <= ?",
+            (now - 2 * self.window_seconds, now),
+        ).rowcount
 
 
 class RateLimiterProxy:
@@ -87,9 +314,23 @@ def build_in_memory_rate_limiter() -> InMemoryRateLimiter:
         max_attempts=settings.max_login_attempts,
         window_seconds=settings.login_window_seconds,
         lockout_seconds=settings.lockout_seconds,
+        max_keys=settings.rate_limit_max_keys,
     )
 
 
+def build_rate_limiter() -> RateLimiter:
+    """Build the configured login rate limiter backend."""
+    settings = get_settings()
+    if settings.rate_limit_backend == "sqlite":
+        return SqliteRateLimiter(
+            settings.rate_limit_path,
+            max_attempts=settings.max_login_attempts,
+            window_seconds=settings.login_window_seconds,
+            lockout_seconds=settings.lockout_seconds,
+        )
+    return build_in_memory_rate_limiter()
+
+
 _rate_limiter_backend: RateLimiter | None = None
 _rate_limiter_proxy = RateLimiterProxy()
 
@@ -98,21 +339,48 @@ def get_rate_limiter_backend() -> RateLimiter:
     """Return the active rate-limit backend."""
     global _rate_limiter_backend
     if _rate_limiter_backend is None:
-        _rate_limiter_backend = build_in_memory_rate_limiter()
+        _rate_limiter_backend = build_rate_limiter()
     return _rate_limiter_backend
 
 
 def set_rate_limiter(rate_limiter: RateLimiter) -> None:
     """Replace the active rate-limit backend."""
     global _rate_limiter_backend
-    _rate_limiter_backend = rate_limiter
+    previous, _rate_limiter_backend = _rate_limiter_backend, rate_limiter
+    if previous is not None and previous is not rate_limiter and hasattr(previous, "close"):
+        previous.close()
 
 
 def reset_rate_limiter() -> None:
-    """Restore the default in-memory rate limiter."""
-    set_rate_limiter(build_in_memory_rate_limiter())
+    """Restore the configured rate limiter backend and drop every route limiter."""
+    set_rate_limiter(build_rate_limiter())
+    _route_limiters.clear()
 
 
 def get_rate_limiter() -> RateLimiter:
     """Return the default login rate limiter proxy."""
     return _rate_limiter_proxy
+
+
+_route_limiters: dict[str, KeyedRateLimiter] = {}
+
+
+def get_route_limiter(scope: str, rate: int, period: float, burst: int) -> KeyedRateLimiter:
+    """Return the shared limiter for ``scope``, rebuilding it if its limits changed."""
+    limiter = _route_limiters.get(scope)
+    if limiter is None or limiter.limits != (rate, period, burst):
+        limiter = _route_limiters[scope] = KeyedRateLimiter(
+            rate, period, burst, max_keys=get_settings().rate_limit_max_keys
+        )
+    return limiter
+
+
+def sweep_rate_limiters() -> int:
+    """Sweep idle keys from the login backend and every route limiter."""
+    removed = 0
+    backend = get_rate_limiter_backend()
+    if hasattr(backend, "sweep"):
+        removed += backend.sweep()
+    for limiter in list(_route_limiters.values()):
+        removed += limiter.sweep()
+    return removed
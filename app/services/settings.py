@@ -9,7 +9,7 @@ from app.config import GITHUB_URL, VERSION
 from app.core import normalize_article_path
 from app.models import SiteSettings
 from app.schemas.site_settings import SiteSettingsUpdateRequest
-from app.utils.cache import get_cached_settings, invalidate_settings_cache, set_cached_settings
+from app.utils.cache import invalidate_settings_cache, load_cached_settings
 
 DEFAULT_SETTINGS = {
     "icp": "",
@@ -43,20 +43,8 @@ class SettingsService:
     async def get_settings(self, use_cache: bool = True) -> dict:
         """Return the hydrated site settings payload."""
         if use_cache:
-            cached = get_cached_settings()
-            if cached is not None:
-                return self._with_version(dict(cached))
-
-        row = await self._get_typed_row()
-        if row is not None:
-            payload = self._row_to_dict(row)
-        else:
-            payload = dict(DEFAULT_SETTINGS)
-
-        hydrated = self._hydrate_defaults(payload)
-        if use_cache:
-            set_cached_settings(hydrated)
-        return self._with_version(dict(hydrated))
+            return self._with_version(await load_cached_settings(self._load_settings))
+        return self._with_version(await self._load_settings())
 
     async def get_public_settings(self, use_cache: bool = True) -> dict:
         """Return public site settings."""
@@ -87,6 +75,11 @@ class SettingsService:
         invalidate_settings_cache()
         return self._with_version(dict(normalized))
 
+    async def _load_settings(self) -> dict:
+        row = await self._get_typed_row()
+        payload = self._row_to_dict(row) if row is not None else dict(DEFAULT_SETTINGS)
+        return self._hydrate_defaults(payload)
+
     async def _get_typed_row(self) -> SiteSettings | None:
         result = await self.db.execute(select(SiteSettings).where(SiteSettings.id == 1))
         return result.scalar_one_or_none()
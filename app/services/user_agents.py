@@ -0,0 +1,97 @@
+"""User-agent dimension lookups with an in-process LRU."""
+
+import hashlib
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import UserAgent
+
+USER_AGENT_CACHE_SIZE = 2048
+
+
+def user_agent_hash(value: str) -> str:
+    """Return the fixed-width lookup key for a user-agent string."""
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class UserAgentCache:
+    """Bounded LRU of user-agent string -> ``user_agents.id``."""
+
+    def __init__(self, max_entries: int = USER_AGENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, int] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, value: str) -> int | None:
+        user_agent_id = self._entries.get(value)
+        if user_agent_id is not None:
+            self._entries.move_to_end(value)
+        return user_agent_id
+
+    def set(self, value: str, user_agent_id: int) -> None:
+        self._entries[value] = user_agent_id
+        self._entries.move_to_end(value)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+_user_agent_cache = UserAgentCache()
+
+
+def get_user_agent_cache() -> UserAgentCache:
+    """Return the process-wide user-agent id cache."""
+    return _user_agent_cache
+
+
+def reset_user_agent_cache() -> None:
+    """Drop the process-wide user-agent id cache."""
+    global _user_agent_cache
+    _user_agent_cache = UserAgentCache()
+
+
+class UserAgentService:
+    """Map user-agent strings to ids in the ``user_agents`` dimension table."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def resolve_id(self, value: str | None) -> int | None:
+        """Return the id for a user-agent string, inserting it on first sight.
+
+        Only ids read back from existing rows are cached. An id created in the
+        current transaction could still be rolled back, so it is picked up by
+        the next lookup instead.
+        """
+        if not value:
+            return None
+        cache = get_user_agent_cache()
+        user_agent_id = cache.get(value)
+        if user_agent_id is not None:
+            return user_agent_id
+
+        ua_hash = user_agent_hash(value)
+        result = await self.db.execute(select(UserAgent.id).where(UserAgent.ua_hash == ua_hash))
+        user_agent_id = result.scalar_one_or_none()
+        if user_agent_id is not None:
+            cache.set(value, user_agent_id)
+            return user_agent_id
+
+        if self.db.bind.dialect.name == "sqlite":
+            await self.db.execute(
+                sqlite_insert(UserAgent).values(ua_hash=ua_hash, value=value).on_conflict_do_nothing()
+            )
+            result = await self.db.execute(select(UserAgent.id).where(UserAgent.ua_hash == ua_hash))
+            return result.scalar_one()
+
+        user_agent = UserAgent(ua_hash=ua_hash, value=value)
+        self.db.add(user_agent)
+        await self.db.flush()
+        return user_agent.id
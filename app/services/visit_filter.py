@@ -0,0 +1,178 @@
+"""Ingest filter that keeps bot and probe traffic out of the visit log."""
+
+import ipaddress
+import random
+import re
+from collections import Counter
+
+from app.config import get_settings
+from app.utils.metrics import get_registry
+
+HUMAN = "human"
+BOT = "bot"
+MONITOR = "monitor"
+DENIED = "denied"
+ALLOWED = "allowed"
+
+# Named tools only: generic words such as "monitor" or "preview" also turn up
+# in real browser user agents (device models, app webviews).
+MONITOR_PATTERNS = (
+    r"kube-probe",
+    r"health-?check",
+    r"elb-healthchecker",
+    r"googlehc",
+    r"uptimerobot/",
+    r"uptime-kuma/",
+    r"better uptime bot",
+    r"pingdom",
+    r"statuscake",
+    r"site24x7",
+    r"blackbox-exporter",
+    r"datadog agent",
+    r"newrelicpinger",
+    r"zabbix",
+    r"nagios",
+)
+BOT_PATTERNS = (
+    r"bot\b",
+    r"bot/",
+    r"crawl",
+    r"spider",
+    r"slurp",
+    r"headless",
+    r"facebookexternalhit",
+    r"bingpreview/",
+    r"skypeuripreview",
+    r"slack-imgproxy",
+    r"whatsapp/",
+    r"embedly",
+    r"^curl/",
+    r"^wget/",
+    r"^python-",
+    r"^httpx/",
+    r"^go-http-client/",
+    r"^java/",
+    r"^okhttp/",
+)
+
+
+def _compile(patterns) -> re.Pattern:
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+
+
+def _parse_networks(value: str) -> tuple:
+    return tuple(ipaddress.ip_network(item.strip(), strict=False) for item in value.split(",") if item.strip())
+
+
+class VisitFilter:
+    """Classify visits as human, bot, or monitor traffic and sample each class.
+
+    Deny-listed networks are always dropped and allow-listed networks are
+    always recorded. Every decision is tallied in memory so dropped traffic
+    stays visible without costing a database write.
+    """
+
+    def __init__(
+        self,
+        bot_sample_rate: float = 0.0,
+        monitor_sample_rate: float = 0.0,
+        human_sample_rate: float = 1.0,
+        allow_networks: tuple = (),
+        deny_networks: tuple = (),
+        extra_bot_patterns: tuple[str, ...] = (),
+        rng: random.Random | None = None,
+    ):
+        self.sample_rates = {HUMAN: human_sample_rate, BOT: bot_sample_rate, MONITOR: monitor_sample_rate}
+        self.allow_networks = allow_networks
+        self.deny_networks = deny_networks
+        self._monitor_pattern = _compile(MONITOR_PATTERNS)
+        self._bot_pattern = _compile((*BOT_PATTERNS, *extra_bot_patterns))
+        self._random = (rng or random.Random()).random
+        self.counters: Counter[tuple[str, str]] = Counter()
+
+    @classmethod
+    def from_settings(cls) -> "VisitFilter":
+        settings = get_settings()
+        return cls(
+            bot_sample_rate=settings.visit_bot_sample_rate,
+            monitor_sample_rate=settings.visit_monitor_sample_rate,
+            human_sample_rate=settings.visit_human_sample_rate,
+            allow_networks=_parse_networks(settings.visit_allow_cidrs),
+            deny_networks=_parse_networks(settings.visit_deny_cidrs),
+            extra_bot_patterns=tuple(
+                pattern.strip() for pattern in settings.visit_bot_patterns.split(",") if pattern.strip()
+            ),
+        )
+
+    def classify(self, ip: str, user_agent: str) -> str:
+        """Return the traffic class for a request."""
+        if self.allow_networks or self.deny_networks:
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                address = None
+            if address is not None:
+                if any(address in network for network in self.deny_networks):
+                    return DENIED
+                if any(address in network for network in self.allow_networks):
+                    return ALLOWED
+        if not user_agent:
+            return BOT
+        if self._monitor_pattern.search(user_agent):
+            return MONITOR
+        if self._bot_pattern.search(user_agent):
+            return BOT
+        return HUMAN
+
+    def should_record(self, ip: str, user_agent: str) -> bool:
+        """Decide whether a visit is written to the log, and count the decision."""
+        traffic_class = self.classify(ip, user_agent)
+        if traffic_class == DENIED:
+            recorded = False
+        elif traffic_class == ALLOWED:
+            recorded = True
+        else:
+            rate = self.sample_rates[traffic_class]
+            recorded = rate >= 1.0 or (rate > 0.0 and self._random() < rate)
+        self.counters[(traffic_class, "recorded" if recorded else "dropped")] += 1
+        return recorded
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Return recorded/dropped counts per traffic class."""
+        summary: dict[str, dict[str, int]] = {}
+        for (traffic_class, decision), count in self.counters.items():
+            summary.setdefault(traffic_class, {"recorded": 0, "dropped": 0})[decision] = count
+        return summary
+
+
+_visit_filter: VisitFilter | None = None
+
+
+def get_visit_filter() -> VisitFilter:
+    """Return the process-wide visit filter, built from settings on first use."""
+    global _visit_filter
+    if _visit_filter is None:
+        _visit_filter = VisitFilter.from_settings()
+    return _visit_filter
+
+
+def reset_visit_filter() -> None:
+    """Drop the process-wide visit filter so it is rebuilt from settings."""
+    global _visit_filter
+    _visit_filter = None
+
+
+def _decision_stats() -> dict[tuple[str, ...], float]:
+    return {
+        (traffic_class, decision): count
+        for traffic_class, decisions in get_visit_filter().snapshot().items()
+        for decision, count in decisions.items()
+    }
+
+
+get_registry().counter(
+    "visit_filter_decisions_total",
+    "Page visits seen by the ingest filter by traffic class and decision.",
+    ("traffic_class", "decision"),
+    callback=_decision_stats,
+)
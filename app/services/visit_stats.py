@@ -0,0 +1,240 @@
+"""Visit rollup service: hourly and daily counters with unique-IP sketches."""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import HyperLogLog
+from app.models import VisitLog, VisitRollup, VisitRollupState
+from app.models.visit_rollup import ALL_PATHS
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_STATE_NAME = "visits"
+ROLLUP_BATCH_SIZE = 5000
+GRANULARITIES = {"hour": timedelta(hours=1), "day": timedelta(days=1)}
+DEFAULT_RANGES = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+MAX_STATS_BUCKETS = 1000
+
+_rollup_lock = asyncio.Lock()
+
+
+def bucket_start(value: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its hour or day bucket."""
+    if granularity == "day":
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+class _PendingBucket:
+    __slots__ = ("visits", "sketch")
+
+    def __init__(self):
+        self.visits = 0
+        self.sketch = HyperLogLog()
+
+
+class VisitStatsService:
+    """Fold raw visit logs into ``visit_rollups`` and answer trend queries.
+
+    Rollups are incremental: the id of the last folded visit is kept in
+    ``visit_rollup_state`` so each run only reads visits written since the
+    last one. Every uvicorn worker runs the job, so each batch is claimed
+    with a conditional update of that watermark in the same transaction as
+    its merge; a worker whose claim finds the watermark moved stops, because
+    another worker already folded those visits.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def rollup(self, batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+        """Fold visits newer than the watermark into the rollups; return how many were folded."""
+        watermark = await self._get_watermark()
+        max_id = (await self.db.execute(select(func.max(VisitLog.id)))).scalar()
+        if max_id is None or max_id < watermark:
+            # The visit table was emptied and row ids may be reused.
+            if not await self._claim(watermark, max_id or 0):
+                return 0
+            watermark = max_id or 0
+
+        folded = 0
+        while True:
+            result = await self.db.execute(
+                select(VisitLog.id, VisitLog.ip, VisitLog.path, VisitLog.created_at)
+                .where(VisitLog.id > watermark)
+                .order_by(VisitLog.id.asc())
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            if not await self._claim(watermark, rows[-1].id):
+                break
+            await self._merge(self._fold(rows))
+            watermark = rows[-1].id
+            folded += len(rows)
+            if len(rows) < batch_size:
+                break
+        return folded
+
+    async def reset_watermark(self) -> None:
+        """Restart rollups from the first visit, e.g. after the visit table is cleared."""
+        await self._set_watermark(0)
+
+    async def get_trend(
+        self,
+        granularity: str = "day",
+        path: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> dict:
+        """Return per-bucket visits and unique-IP estimates for a path or the whole site."""
+        step = GRANULARITIES.get(granularity)
+        if step is None:
+            raise ValueError("统计粒度无效")
+
+        until = bucket_start(until or datetime.utcnow(), granularity) + step
+        since = bucket_start(since or until - DEFAULT_RANGES[granularity], granularity)
+        if since >= until:
+            raise ValueError("统计时间范围无效")
+        if (until - since) / step > MAX_STATS_BUCKETS:
+            raise ValueError("统计时间范围过大")
+
+        result = await self.db.execute(
+            select(VisitRollup.bucket_start, VisitRollup.visits, VisitRollup.ip_sketch).where(
+                VisitRollup.granularity == granularity,
+                VisitRollup.path == (path or ALL_PATHS),
+                VisitRollup.bucket_start >= since,
+                VisitRollup.bucket_start < until,
+            )
+        )
+        rows = {row.bucket_start: row for row in result}
+
+        buckets = []
+        total_sketch = HyperLogLog()
+        total_visits = 0
+        current = since
+        while current < until:
+            row = rows.get(current)
+            visits, unique_ips = 0, 0
+            if row is not None:
+                sketch = HyperLogLog.from_bytes(row.ip_sketch)
+                total_sketch.merge(sketch)
+                visits, unique_ips = row.visits, sketch.count()
+            total_visits += visits
+            buckets.append({"start": current.isoformat(), "visits": visits, "unique_ips": unique_ips})
+            current += step
+
+        return {
+            "granularity": granularity,
+            "path": path or None,
+            "since": since.isoformat(),
+            "until": until.isoformat(),
+            "total_visits": total_visits,
+            "unique_ips": total_sketch.count(),
+            "buckets": buckets,
+        }
+
+    def _fold(self, rows) -> dict[tuple[str, datetime, str], _PendingBucket]:
+        pending: dict[tuple[str, datetime, str], _PendingBucket] = {}
+        for row in rows:
+            if row.created_at is None:
+                continue
+            for granularity in GRANULARITIES:
+                start = bucket_start(row.created_at, granularity)
+                for path in {ALL_PATHS, row.path or "/"}:
+                    bucket = pending.get((granularity, start, path))
+                    if bucket is None:
+                        bucket = pending[(granularity, start, path)] = _PendingBucket()
+                    bucket.visits += 1
+                    if row.ip:
+                        bucket.sketch.add(row.ip)
+        return pending
+
+    async def _merge(self, pending: dict[tuple[str, datetime, str], _PendingBucket]) -> None:
+        if not pending:
+            return
+        starts = [key[1] for key in pending]
+        result = await self.db.execute(
+            select(VisitRollup).where(
+                VisitRollup.bucket_start >= min(starts),
+                VisitRollup.bucket_start <= max(starts),
+                VisitRollup.path.in_({key[2] for key in pending}),
+            )
+        )
+        existing = {(row.granularity, row.bucket_start, row.path): row for row in result.scalars()}
+
+        for key, bucket in pending.items():
+            row = existing.get(key)
+            if row is None:
+                granularity, start, path = key
+                self.db.add(
+                    VisitRollup(
+                        granularity=granularity,
+                        bucket_start=start,
+                        path=path,
+                        visits=bucket.visits,
+                        ip_sketch=bucket.sketch.to_bytes(),
+                    )
+                )
+                continue
+            sketch = HyperLogLog.from_bytes(row.ip_sketch)
+            sketch.merge(bucket.sketch)
+            row.visits += bucket.visits
+            row.ip_sketch = sketch.to_bytes()
+        await self.db.flush()
+
+    async def _get_watermark(self) -> int:
+        query = select(VisitRollupState.watermark).where(VisitRollupState.name == ROLLUP_STATE_NAME)
+        watermark = (await self.db.execute(query)).scalar_one_or_none()
+        if watermark is None:
+            # Seed the row the claims update; a concurrent seeder's insert is ignored.
+            await self.db.execute(
+                sqlite_insert(VisitRollupState).values(name=ROLLUP_STATE_NAME, watermark=0).on_conflict_do_nothing()
+            )
+            watermark = (await self.db.execute(query)).scalar_one()
+        return watermark
+
+    async def _claim(self, expected: int, watermark: int) -> bool:
+        """Advance the watermark only if it still reads ``expected``; False when another worker moved it."""
+        result = await self.db.execute(
+            update(VisitRollupState)
+            .where(VisitRollupState.name == ROLLUP_STATE_NAME, VisitRollupState.watermark == expected)
+            .values(watermark=watermark)
+        )
+        return result.rowcount == 1
+
+    async def _set_watermark(self, value: int) -> None:
+        await self.db.execute(
+            sqlite_insert(VisitRollupState)
+            .values(name=ROLLUP_STATE_NAME, watermark=value)
+            .on_conflict_do_update(index_elements=[VisitRollupState.name], set_={"watermark": value})
+        )
+
+
+async def run_visit_rollup_job(session_factory) -> int:
+    """Fold new visit logs into the rollups using the provided async session factory.
+
+    Runs are serialized in-process; across workers the watermark claim in
+    ``VisitStatsService.rollup`` keeps two jobs from folding the same visits.
+    A run that cannot get the database write lock is skipped until the next
+    interval.
+    """
+    async with _rollup_lock:
+        async with session_factory() as db:
+            try:
+                folded = await VisitStatsService(db).rollup()
+                await db.commit()
+            except OperationalError as exc:
+                if "locked" not in str(exc):
+                    raise
+                await db.rollback()
+                logger.info("Visit rollup skipped: another worker holds the database write lock")
+                return 0
+            return folded
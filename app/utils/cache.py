@@ -1,8 +1,20 @@
 ﻿"""Cache backend abstractions and helpers."""
 
+import asyncio
+import bisect
+import heapq
+import math
+import sys
+import threading
 import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from itertools import islice
 from typing import Any, Optional, Protocol
 
+from app.config import get_settings
+from app.utils.metrics import CACHE_REQUESTS, get_registry
+
 
 class CacheBackend(Protocol):
     """Boundary for cache storage backends."""
@@ -16,6 +28,15 @@ class CacheBackend(Protocol):
     def delete(self, key: str) -> None:
         """Delete a cached key."""
 
+    def incr(self, key: str, initial: int, ttl: int = 60) -> Optional[int]:
+        """Atomically add one to an integer (``initial`` when missing) and return the result.
+
+        A shared backend returns None when it had to queue the increment.
+        """
+
+    def set_if(self, key: str, value: Any, ttl: int, condition: Callable[[Optional[Any]], bool]) -> bool:
+        """Atomically store ``value`` only if ``condition`` accepts the current value."""
+
     def clear(self) -> None:
         """Clear the full backend."""
 
@@ -23,65 +44,410 @@ class CacheBackend(Protocol):
         """Invalidate keys by prefix."""
 
 
-class InMemoryCacheBackend:
-    """Thread-safe in-memory cache with TTL."""
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+MAX_SIZE_NODES = 100_000
+SIZE_SAMPLE = 32
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the retained size of a value by walking its containers and attributes.
+
+    Containers with more than ``SIZE_SAMPLE`` items are sized from evenly
+    spaced items scaled up to their length, so a large list of similar rows
+    costs a few dozen visits rather than a walk over every row. Shared objects
+    are counted once and the walk stops after ``MAX_SIZE_NODES`` objects, so
+    the result is an estimate for budgeting rather than an exact measurement.
+    """
+    seen: set[int] = set()
+    stack: list[tuple[Any, float]] = [(value, 1.0)]
+    total = 0.0
+    while stack and len(seen) < MAX_SIZE_NODES:
+        item, weight = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item) * weight
+        if isinstance(item, (str, bytes, bytearray, int, float, bool)) or item is None:
+            continue
+        if isinstance(item, (dict, list, tuple, set, frozenset)):
+            if not item:
+                continue
+            step = max(1, len(item) // SIZE_SAMPLE)
+            sampled = list(islice(item.items() if isinstance(item, dict) else item, 0, None, step))
+            scale = weight * len(item) / len(sampled)
+            if isinstance(item, dict):
+                stack.extend((part, scale) for pair in sampled for part in pair)
+            else:
+                stack.extend((child, scale) for child in sampled)
+        elif hasattr(item, "__dict__"):
+            stack.append((vars(item), weight))
+        else:
+            for cls in type(item).__mro__:
+                for slot in getattr(cls, "__slots__", ()):
+                    if hasattr(item, slot):
+                        stack.append((getattr(item, slot), weight))
+    return int(total)
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: float, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
 
-    def __init__(self):
-        self._cache: dict[str, tuple[Any, float]] = {}
+
+class InMemoryCacheBackend:
+    """Thread-safe in-memory LRU cache with TTL and entry/byte budgets.
+
+    Entries live in an ``OrderedDict`` kept in recency order. Expiry times sit
+    in a min-heap, so expired entries are dropped as soon as any hit or write
+    notices the heap head is due instead of waiting for the same key to be
+    read again. A sorted key list makes ``invalidate_pattern`` cost
+    O(log n + matched keys).
+
+    Reads take the lock only when something has expired: the earliest expiry
+    is mirrored in ``_next_expiry``, a miss is a single dict lookup and a hit
+    adds a clock read and an atomic ``move_to_end``. Misses leave the sweep to
+    the ``set()`` that usually follows them. The hit/miss counters are bumped
+    without the lock and may undercount slightly under concurrent threads.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._sorted_keys: list[str] = []
+        self._lock = threading.RLock()
+        self._next_expiry = math.inf
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
 
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired."""
-        if key in self._cache:
-            value, expire_time = self._cache[key]
-            if time.time() < expire_time:
-                return value
-            del self._cache[key]
-        return None
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        now = time.monotonic()
+        if self._next_expiry <= now:
+            with self._lock:
+                self._expire(now)
+        if entry.expires_at <= now:
+            # Its heap item was due too, so _expire above has already dropped it.
+            self.misses += 1
+            return None
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            # Removed by another thread since the lookup; the value read is still consistent.
+            pass
+        self.hits += 1
+        return entry.value
 
     def set(self, key: str, value: Any, ttl: int = 60) -> None:
-        """Set value with TTL in seconds."""
-        self._cache[key] = (value, time.time() + ttl)
+        """Set value with TTL in seconds, evicting least recently used entries over budget."""
+        now = time.monotonic()
+        size = estimate_size(value) + sys.getsizeof(key)
+        with self._lock:
+            self._expire(now)
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            entry = _Entry(value, now + ttl, size)
+            self._entries[key] = entry
+            bisect.insort(self._sorted_keys, key)
+            heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+            self._next_expiry = self._expiry_heap[0][0]
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+            if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+                self._rebuild_heap()
 
     def delete(self, key: str) -> None:
         """Delete a key from cache."""
-        self._cache.pop(key, None)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def incr(self, key: str, initial: int, ttl: int = 60) -> int:
+        """Add one to an integer value, starting from ``initial`` when it is missing."""
+        with self._lock:
+            current = self.get(key)
+            value = (initial if current is None else current) + 1
+            self.set(key, value, ttl=ttl)
+            return value
+
+    def set_if(self, key: str, value: Any, ttl: int, condition: Callable[[Optional[Any]], bool]) -> bool:
+        """Store ``value`` only if ``condition`` accepts the current value."""
+        with self._lock:
+            if not condition(self.get(key)):
+                return False
+            self.set(key, value, ttl=ttl)
+            return True
 
     def clear(self) -> None:
         """Clear all cache."""
-        self._cache.clear()
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._sorted_keys.clear()
+            self._next_expiry = math.inf
+            self.bytes = 0
 
     def invalidate_pattern(self, pattern: str) -> None:
         """Invalidate all keys matching a prefix pattern."""
-        keys_to_delete = [key for key in self._cache if key.startswith(pattern)]
-        for key in keys_to_delete:
-            del self._cache[key]
+        with self._lock:
+            start = bisect.bisect_left(self._sorted_keys, pattern)
+            end = start
+            while end < len(self._sorted_keys) and self._sorted_keys[end].startswith(pattern):
+                end += 1
+            for key in self._sorted_keys[start:end]:
+                entry = self._entries.pop(key)
+                self.bytes -= entry.size
+            del self._sorted_keys[start:end]
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now and return how many were removed."""
+        with self._lock:
+            before = self.expirations
+            self._expire(time.monotonic())
+            return self.expirations - before
+
+    def stats(self) -> dict[str, int]:
+        """Return hit/miss/eviction counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float) -> None:
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Heap items are never updated in place; skip ones superseded by a later set().
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove(key)
+                self.expirations += 1
+        self._next_expiry = heap[0][0] if heap else math.inf
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        index = bisect.bisect_left(self._sorted_keys, key)
+        del self._sorted_keys[index]
+
+    def _rebuild_heap(self) -> None:
+        self._expiry_heap = [(entry.expires_at, key) for key, entry in self._entries.items()]
+        heapq.heapify(self._expiry_heap)
+        self._next_expiry = self._expiry_heap[0][0] if self._expiry_heap else math.inf
+
+
+class _StaleCopy:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
 
 
 class CacheProxy:
-    """Proxy that always resolves the current cache backend."""
+    """Proxy that always resolves the current cache backend.
+
+    ``get_or_load`` adds single-flight loading and stale-while-revalidate on
+    top of any backend. Only one coroutine per key runs the loader; concurrent
+    callers get the last value (for up to ``CACHE_STALE_GRACE_SECONDS`` past
+    its TTL) or await the running load. Explicit ``delete``,
+    ``invalidate_pattern`` and ``clear`` drop the stale copy too, so writes are
+    never papered over by a pre-write value.
+
+    Stale copies are kept only for keys loaded through ``get_or_load`` and are
+    dropped once their grace window ends or the backend evicts the key before
+    its TTL. Write generations are tracked only while a load is in flight.
+    """
+
+    def __init__(self):
+        self._flights: dict[str, asyncio.Future] = {}
+        self._stale: dict[str, _StaleCopy] = {}
+        self._generations: dict[str, int] = {}
 
     def get(self, key: str) -> Optional[Any]:
-        return get_cache_backend().get(key)
+        value = get_cache_backend().get(key)
+        CACHE_REQUESTS.inc(prefix=_prefix(key), result="miss" if value is None else "hit")
+        return value
 
     def set(self, key: str, value: Any, ttl: int = 60) -> None:
+        self._bump(key)
         get_cache_backend().set(key, value, ttl=ttl)
+        if key in self._stale:
+            self._keep_stale(key, value, ttl)
 
     def delete(self, key: str) -> None:
+        self._bump(key)
+        self._stale.pop(key, None)
         get_cache_backend().delete(key)
 
+    def incr(self, key: str, initial: int, ttl: int = 60) -> Optional[int]:
+        self._bump(key)
+        self._stale.pop(key, None)
+        return get_cache_backend().incr(key, initial, ttl=ttl)
+
+    def set_if(self, key: str, value: Any, ttl: int, condition: Callable[[Optional[Any]], bool]) -> bool:
+        if not get_cache_backend().set_if(key, value, ttl, condition):
+            return False
+        self._bump(key)
+        if key in self._stale:
+            self._keep_stale(key, value, ttl)
+        return True
+
     def clear(self) -> None:
+        for key in self._generations:
+            self._bump(key)
+        self._stale.clear()
         get_cache_backend().clear()
 
     def invalidate_pattern(self, pattern: str) -> None:
+        for key in [key for key in self._generations if key.startswith(pattern)]:
+            self._bump(key)
+        for key in [key for key in self._stale if key.startswith(pattern)]:
+            del self._stale[key]
         get_cache_backend().invalidate_pattern(pattern)
 
+    def forget(self) -> None:
+        """Drop stale copies and load bookkeeping, e.g. after swapping the backend."""
+        self._flights.clear()
+        self._stale.clear()
+        self._generations.clear()
+
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 60,
+        validate: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """Return the cached value for ``key``, loading it at most once concurrently.
+
+        ``validate`` rejects cached or stale values that are no longer usable
+        (for example a snapshot stamped with an old version).
+        """
+        value = self.get(key)
+        if value is not None and (validate is None or validate(value)):
+            return value
+        if value is None:
+            self._drop_evicted_stale(key)
+
+        while True:
+            flight = self._flights.get(key)
+            if flight is not None and flight.get_loop() is not asyncio.get_running_loop():
+                flight = None
+            if flight is None:
+                return await self._lead(key, loader, ttl)
+
+            stale = self._stale_value(key, validate)
+            if stale is not None:
+                CACHE_REQUESTS.inc(prefix=_prefix(key), result="stale")
+                return stale
+            CACHE_REQUESTS.inc(prefix=_prefix(key), result="coalesced")
+            try:
+                return await asyncio.shield(flight)
+            except asyncio.CancelledError:
+                # The leader was cancelled, not us: take over the load.
+                if not flight.cancelled():
+                    raise
+
+    async def _lead(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: int) -> Any:
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self._generations[key] = generation = self._generations.get(key, 0)
+        try:
+            value = await loader()
+        except BaseException as exc:
+            if isinstance(exc, asyncio.CancelledError):
+                flight.cancel()
+            else:
+                flight.set_exception(exc)
+                # Followers re-raise it; the leader's own raise is the one that is reported.
+                flight.exception()
+            raise
+        finally:
+            # A write or invalidation that landed during the load wins over this result.
+            current = self._generations.get(key, 0)
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+                self._generations.pop(key, None)
+        if value is not None and current == generation:
+            get_cache_backend().set(key, value, ttl=ttl)
+            self._keep_stale(key, value, ttl)
+        flight.set_result(value)
+        return value
+
+    def _keep_stale(self, key: str, value: Any, ttl: int) -> None:
+        grace = get_settings().cache_stale_grace_seconds
+        if grace <= 0:
+            self._stale.pop(key, None)
+            return
+        now = time.monotonic()
+        self._prune_stale(now)
+        self._stale[key] = _StaleCopy(value, now + ttl, now + ttl + grace)
+
+    def _prune_stale(self, now: float) -> None:
+        for key in [key for key, copy in self._stale.items() if copy.stale_until <= now]:
+            del self._stale[key]
+
+    def _drop_evicted_stale(self, key: str) -> None:
+        # A miss before the TTL ran out means the backend evicted the key for its budget.
+        copy = self._stale.get(key)
+        if copy is not None and time.monotonic() < copy.fresh_until:
+            del self._stale[key]
+
+    def _stale_value(self, key: str, validate: Callable[[Any], bool] | None) -> Optional[Any]:
+        copy = self._stale.get(key)
+        if copy is None:
+            return None
+        if time.monotonic() >= copy.stale_until:
+            del self._stale[key]
+            return None
+        if validate is not None and not validate(copy.value):
+            return None
+        return copy.value
+
+    def _bump(self, key: str) -> None:
+        if key in self._generations:
+            self._generations[key] += 1
+
+
+def _prefix(key: str) -> str:
+    return key.split(":", 1)[0]
+
 
 _cache_backend: CacheBackend = InMemoryCacheBackend()
 cache = CacheProxy()
 
 CACHE_LINKS_ALL = "links:all"
-CACHE_LINKS_PUBLIC = "links:public"
+CACHE_LINKS_VERSION = "links:version"
 CACHE_SETTINGS = "settings"
+LINKS_VERSION_TTL = 24 * 60 * 60
 
 
 def get_cache_backend() -> CacheBackend:
@@ -92,17 +458,83 @@ def get_cache_backend() -> CacheBackend:
 def set_cache_backend(backend: CacheBackend) -> None:
     """Replace the active cache backend."""
     global _cache_backend
-    _cache_backend = backend
+    previous, _cache_backend = _cache_backend, backend
+    if previous is not backend and hasattr(previous, "close"):
+        previous.close()
+    cache.forget()
 
 
 def reset_cache_backend() -> None:
-    """Restore the default in-memory cache backend."""
-    set_cache_backend(InMemoryCacheBackend())
-
-
-def invalidate_links_cache() -> None:
-    """Invalidate all links-related cache."""
-    cache.invalidate_pattern("links:")
+    """Restore the configured cache backend, sized from settings."""
+    settings = get_settings()
+    if settings.cache_backend == "shared":
+        from app.utils.shared_cache import SharedCacheBackend
+
+        backend = SharedCacheBackend(
+            settings.cache_shared_path,
+            settings.cache_max_entries,
+            settings.cache_max_bytes,
+            busy_timeout=settings.cache_shared_busy_timeout_ms / 1000,
+        )
+    else:
+        backend = InMemoryCacheBackend(settings.cache_max_entries, settings.cache_max_bytes)
+    set_cache_backend(backend)
+
+
+def _backend_stats(*names: str) -> dict[tuple[str, ...], float]:
+    stats = getattr(get_cache_backend(), "stats", None)
+    if stats is None:
+        return {}
+    values = stats()
+    return {(name,): values[name] for name in names if name in values}
+
+
+get_registry().gauge(
+    "cache_backend_size",
+    "Entries and estimated bytes held by the cache backend.",
+    ("unit",),
+    callback=lambda: _backend_stats("entries", "bytes"),
+)
+get_registry().counter(
+    "cache_backend_removals_total",
+    "Entries dropped by the cache backend for LRU budget (evictions) or TTL (expirations).",
+    ("reason",),
+    callback=lambda: _backend_stats("evictions", "expirations"),
+)
+
+
+def get_links_version() -> int:
+    """Return the current navigation snapshot version, seeding it when missing.
+
+    A fresh seed is derived from the wall clock so it always sorts after any
+    version a snapshot could have been stamped with before the key was dropped.
+    Only the first of several concurrent seeders wins. If the seed cannot be
+    stored (the shared cache is busy), the unstored seed is returned, so
+    snapshots stamped with it never validate and reads rebuild instead.
+    """
+    version = cache.get(CACHE_LINKS_VERSION)
+    if version is None:
+        seed = time.time_ns()
+        cache.set_if(CACHE_LINKS_VERSION, seed, LINKS_VERSION_TTL, lambda current: current is None)
+        version = cache.get(CACHE_LINKS_VERSION)
+        if version is None:
+            return seed
+    return version
+
+
+def bump_links_version() -> Optional[int]:
+    """Atomically advance the navigation snapshot version and return the new value.
+
+    Concurrent writers, in this process or another worker sharing the cache,
+    each get a distinct version, so the previous version is always the
+    result minus one. Returns None when the shared cache queued the bump.
+    """
+    return cache.incr(CACHE_LINKS_VERSION, time.time_ns(), ttl=LINKS_VERSION_TTL)
+
+
+async def load_cached_settings(loader: Callable[[], Awaitable[dict]], ttl: int = 60) -> dict:
+    """Return site settings from cache, loading them once across concurrent callers."""
+    return dict(await cache.get_or_load(CACHE_SETTINGS, loader, ttl=ttl))
 
 
 def get_cached_settings() -> Optional[dict]:
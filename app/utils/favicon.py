@@ -8,6 +8,7 @@ from urllib.parse import quote, urljoin, urlparse
 import httpx
 
 from app.config import get_settings
+from app.utils.metrics import FAVICON_FETCHES
 from app.utils.security import is_safe_url
 
 logger = logging.getLogger(__name__)
@@ -193,6 +194,7 @@ async def fetch_favicon(url: str) -> dict:
         is_safe, error_msg = is_safe_url(url)
         if not is_safe:
             logger.warning(f"Unsafe URL rejected: {url} - {error_msg}")
+            FAVICON_FETCHES.inc(outcome="rejected")
             return {"icon": None, "message": error_msg, "error": True}
 
         base_url = f"{parsed.scheme}://{parsed.netloc}"
@@ -234,6 +236,7 @@ async def fetch_favicon(url: str) -> dict:
                         f.write(response.content)
 
                     logger.info(f"Successfully fetched icon from {icon_url} -> {filename}")
+                    FAVICON_FETCHES.inc(outcome="site")
                     return {"icon": filename, "message": "图标获取成功"}
                 else:
                     last_error = validation_error
@@ -265,6 +268,7 @@ async def fetch_favicon(url: str) -> dict:
                         f.write(response.content)
 
                     logger.info(f"Successfully fetched icon from fallback service -> {filename}")
+                    FAVICON_FETCHES.inc(outcome="fallback")
                     return {"icon": filename, "message": "图标获取成功 (使用备用服务)"}
                 last_error = validation_error
             except Exception as e:
@@ -275,8 +279,10 @@ async def fetch_favicon(url: str) -> dict:
         if last_error:
             error_msg += f" ({last_error})"
         logger.info(f"Failed to fetch favicon for {url}: {error_msg}")
+        FAVICON_FETCHES.inc(outcome="failed")
         return {"icon": None, "message": error_msg}
 
     except Exception as e:
         logger.error(f"Unexpected error in fetch_favicon for {url}: {e}", exc_info=True)
+        FAVICON_FETCHES.inc(outcome="error")
         return {"icon": None, "message": f"获取图标时发生错误: {str(e)}"}
@@ -0,0 +1,205 @@
+"""Stack-sampling request profiler with speedscope and collapsed-stack output."""
+
+import json
+import re
+import secrets
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEFAULT_INTERVAL_SECONDS = 0.005
+SPEEDSCOPE_SUFFIX = ".speedscope.json"
+COLLAPSED_SUFFIX = ".collapsed.txt"
+PROFILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+# Leaf frames that mean "this thread is parked", e.g. the event loop waiting
+# in select() or a pool worker blocked on its queue.
+IDLE_FUNCTIONS = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+_active_lock = threading.Lock()
+
+
+def _frame_label(frame, root: str) -> tuple[str, str, int]:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(root):
+        filename = filename[len(root) :].lstrip("/\\")
+    return code.co_name, filename, code.co_firstlineno
+
+
+class StackSampler:
+    """Periodically snapshot every other thread's Python stack.
+
+    The sampler runs in a daemon thread and reads ``sys._current_frames()``,
+    so it sees the event loop thread as well as threadpool workers (markdown
+    rendering, sync DB drivers). Stacks whose leaf is an idle wait are
+    dropped. Only one sampler runs per process at a time; concurrent requests
+    still show up in a profile because threads are shared.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL_SECONDS, root: str | None = None):
+        self.interval = interval
+        self.root = root if root is not None else str(Path(__file__).resolve().parent.parent.parent)
+        self.frames: list[tuple[str, str, int]] = []
+        self._frame_index: dict[tuple[str, str, int], int] = {}
+        self.samples: list[tuple[int, ...]] = []
+        self.started_at = 0.0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> bool:
+        """Start sampling; return False if another profile is already running."""
+        if not _active_lock.acquire(blocking=False):
+            return False
+        self.started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.duration = time.perf_counter() - self.started_at
+        _active_lock.release()
+
+    def _intern(self, label: tuple[str, str, int]) -> int:
+        index = self._frame_index.get(label)
+        if index is None:
+            index = self._frame_index[label] = len(self.frames)
+            self.frames.append(label)
+        return index
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                self.sample_frame(frame, names.get(ident, str(ident)))
+
+    def sample_frame(self, frame, thread_name: str) -> None:
+        """Record one stack, root first, prefixed with a pseudo-frame for the thread."""
+        leaf = frame.f_code
+        if (Path(leaf.co_filename).name, leaf.co_name) in IDLE_FUNCTIONS:
+            return
+        stack = []
+        while frame is not None:
+            stack.append(self._intern(_frame_label(frame, self.root)))
+            frame = frame.f_back
+        stack.append(self._intern((f"thread:{thread_name}", "", 0)))
+        stack.reverse()
+        self.samples.append(tuple(stack))
+
+    def collapsed(self) -> str:
+        """Return Brendan Gregg collapsed stacks (``a;b;c count`` per line)."""
+        counts: dict[tuple[int, ...], int] = {}
+        for stack in self.samples:
+            counts[stack] = counts.get(stack, 0) + 1
+        lines = []
+        for stack, count in sorted(counts.items(), key=lambda item: -item[1]):
+            names = []
+            for index in stack:
+                name, filename, line = self.frames[index]
+                label = f"{name} ({filename}:{line})" if filename else name
+                names.append(label.replace(";", ":"))
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+    def speedscope(self, name: str) -> dict:
+        """Return a speedscope ``sampled`` profile document."""
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "nav_system",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": frame_name, "file": filename, "line": line} if filename else {"name": frame_name}
+                    for frame_name, filename, line in self.frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.duration,
+                    "samples": [list(stack) for stack in self.samples],
+                    "weights": [self.interval] * len(self.samples),
+                }
+            ],
+        }
+
+
+class ProfileStore:
+    """Profiles on disk as ``<id>.speedscope.json`` plus ``<id>.collapsed.txt``."""
+
+    def __init__(self, root: Path, max_profiles: int = 100):
+        self.root = root
+        self.max_profiles = max_profiles
+
+    def save(self, sampler: StackSampler, method: str, path: str) -> str:
+        """Write both formats for a finished sampler, prune old profiles, and return the id."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:60] or "root"
+        profile_id = f"{stamp}-{method.lower()}-{slug}-{secrets.token_hex(3)}"
+        title = f"{method} {path} ({sampler.duration * 1000:.1f} ms)"
+        self._write(self.root / f"{profile_id}{SPEEDSCOPE_SUFFIX}", json.dumps(sampler.speedscope(title)))
+        self._write(self.root / f"{profile_id}{COLLAPSED_SUFFIX}", sampler.collapsed())
+        self.prune()
+        return profile_id
+
+    @staticmethod
+    def _write(target: Path, content: str) -> None:
+        temp = target.with_name(f".{target.name}.tmp")
+        temp.write_text(content, encoding="utf-8")
+        temp.replace(target)
+
+    def list_profiles(self) -> list[dict]:
+        """Return stored profiles, newest first."""
+        if not self.root.is_dir():
+            return []
+        profiles: dict[str, dict] = {}
+        for file in self.root.iterdir():
+            for suffix in (SPEEDSCOPE_SUFFIX, COLLAPSED_SUFFIX):
+                if file.name.endswith(suffix) and not file.name.startswith("."):
+                    profile_id = file.name[: -len(suffix)]
+                    stat = file.stat()
+                    entry = profiles.setdefault(profile_id, {"id": profile_id, "files": [], "size": 0, "created_at": 0})
+                    entry["files"].append(file.name)
+                    entry["size"] += stat.st_size
+                    entry["created_at"] = max(entry["created_at"], stat.st_mtime)
+        ordered = sorted(profiles.values(), key=lambda entry: (entry["created_at"], entry["id"]), reverse=True)
+        for entry in ordered:
+            entry["files"].sort()
+            entry["created_at"] = datetime.fromtimestamp(entry["created_at"], tz=timezone.utc).isoformat()
+        return ordered
+
+    def resolve(self, filename: str) -> Path | None:
+        """Return the stored file for a download name, or None if it is unknown or unsafe."""
+        if not PROFILE_NAME_PATTERN.match(filename) or filename.startswith("."):
+            return None
+        if not filename.endswith((SPEEDSCOPE_SUFFIX, COLLAPSED_SUFFIX)):
+            return None
+        target = self.root / filename
+        return target if target.is_file() else None
+
+    def prune(self) -> None:
+        for entry in self.list_profiles()[self.max_profiles :]:
+            for filename in entry["files"]:
+                (self.root / filename).unlink(missing_ok=True)
@@ -0,0 +1,117 @@
+"""Per-request SQL statement accounting and repeated-statement (N+1) detection."""
+
+import logging
+import re
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from app.config import get_settings
+from app.utils.metrics import DB_REPEATED_STATEMENTS, DB_STATEMENTS_PER_REQUEST, DB_TIME_PER_REQUEST
+
+logger = logging.getLogger(__name__)
+
+MAX_LOGGED_PARAMETERS = 500
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so executions differing only in bound values compare equal.
+
+    Expanded ``IN (?, ?, ...)`` lists and multi-row ``VALUES`` clauses collapse
+    to ``(?...)`` so the placeholder count does not split one shape into many.
+    """
+    return _PLACEHOLDER_LIST.sub("(?...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """Statements, DB time, and statement shapes seen in one unit of work."""
+
+    def __init__(self):
+        self.statements = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Return shapes executed at least ``threshold`` times, most frequent first."""
+        if threshold <= 0:
+            return []
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect statement stats for everything executed inside the block.
+
+    The stats object lives in a context variable, so it follows the request
+    into child tasks and SQLAlchemy's async greenlets.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def current_query_stats() -> QueryStats | None:
+    """Return the stats collector for the running request, if any."""
+    return _current_stats.get()
+
+
+def record_statement(statement: str, parameters, duration: float) -> None:
+    """Account one executed statement and log it with its parameters when slow."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    slow_query_ms = get_settings().slow_query_ms
+    if slow_query_ms > 0 and duration * 1000 >= slow_query_ms:
+        logger.warning(
+            "Slow query",
+            extra={
+                "duration_ms": round(duration * 1000, 2),
+                "statement": statement,
+                "parameters": repr(parameters)[:MAX_LOGGED_PARAMETERS],
+            },
+        )
+
+
+async def record_query_stats(request, call_next):
+    """HTTP middleware feeding per-request statement stats to metrics, N+1 warnings and debug headers.
+
+    Statement accounting only runs when ``ENABLE_METRICS`` or
+    ``QUERY_DEBUG_HEADERS`` is on; otherwise requests pass straight through.
+    """
+    settings = request.app.state.settings
+    if not (settings.enable_metrics or settings.query_debug_headers):
+        return await call_next(request)
+    with track_queries() as stats:
+        response = await call_next(request)
+    route = getattr(request.scope.get("route"), "path", None) or "other"
+    repeated = stats.repeated(settings.query_repeat_threshold)
+    if repeated:
+        shape, count = repeated[0]
+        logger.warning(
+            "Repeated SQL statement shape in one request",
+            extra={"route": route, "statement": shape, "count": count, "statements": stats.statements},
+        )
+    if settings.enable_metrics and stats.statements:
+        DB_STATEMENTS_PER_REQUEST.observe(stats.statements, route=route)
+        DB_TIME_PER_REQUEST.observe(stats.duration, route=route)
+        if repeated:
+            DB_REPEATED_STATEMENTS.inc(route=route)
+    if settings.query_debug_headers:
+        response.headers["X-DB-Statements"] = str(stats.statements)
+        response.headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.2f}"
+        response.headers["X-DB-Repeated"] = str(len(repeated))
+    return response
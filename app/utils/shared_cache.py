@@ -0,0 +1,335 @@
+"""Cross-process cache backend on a SQLite file with broadcast invalidation."""
+
+import logging
+import mmap
+import pickle
+import queue
+import sqlite3
+import struct
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Optional
+
+from app.utils.cache import DEFAULT_MAX_BYTES, DEFAULT_MAX_ENTRIES, InMemoryCacheBackend
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_LOG_SIZE = 10_000
+DEFAULT_BUSY_TIMEOUT = 0.05
+DEFERRED_WRITE_TIMEOUT = 30.0
+MAINTENANCE_EVERY_WRITES = 512
+_GENERATION = struct.Struct("<Q")
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cache_entries ("
+    "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS cache_invalidations ("
+    "seq INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, key TEXT NOT NULL)",
+)
+
+# Runs inside a write transaction and returns ``(result, changed)``.
+Apply = Callable[[sqlite3.Connection], tuple[Any, bool]]
+
+
+class SharedCacheBackend:
+    """Cache shared by every worker process that opens the same file.
+
+    Values live in a SQLite table (WAL mode) and each process keeps a local
+    LRU in front of it, so hits are served from memory. Every write, delete,
+    prefix invalidation and clear appends to ``cache_invalidations`` and then
+    stores that row's sequence number in a memory-mapped 8-byte generation
+    file. Before every read a process compares the mapped generation with the
+    last one it saw (one ``struct.unpack`` on shared memory) and replays new
+    invalidations against its local LRU only when the generation changed.
+
+    Callers run on the event loop, so the file is opened with a short
+    ``busy_timeout``. A write that cannot take the SQLite write lock in time
+    is queued for a background thread, which applies queued writes in order;
+    until the queue drains the affected local copies are dropped and reads
+    skip the shared file, so they degrade to misses. ``incr`` then returns
+    None and ``set_if`` reports failure instead of waiting.
+
+    Values are stored with ``pickle``, and unpickling runs arbitrary code:
+    the cache file is a trust boundary and must only be writable by the
+    user the app runs as. Never point it at a shared or world-writable path.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        busy_timeout: float = DEFAULT_BUSY_TIMEOUT,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = InMemoryCacheBackend(max_entries, max_bytes)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None, timeout=busy_timeout
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+        generation_path = self.path.with_name(self.path.name + ".gen")
+        with open(generation_path, "ab") as handle:
+            if handle.tell() < _GENERATION.size:
+                handle.write(b"\0" * (_GENERATION.size - handle.tell()))
+        self._generation_file = open(generation_path, "r+b")
+        self._generation = mmap.mmap(self._generation_file.fileno(), _GENERATION.size)
+        self._seen_generation = self._read_generation()
+        self._last_seq = self._conn.execute("SELECT coalesce(max(seq), 0) FROM cache_invalidations").fetchone()[0]
+        self._writes = 0
+        self._deferred: queue.SimpleQueue = queue.SimpleQueue()
+        self._pending = 0
+        self._writer: threading.Thread | None = None
+        self.shared_reads = 0
+        self.deferred_writes = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a value from the local LRU, falling back to the shared file."""
+        self._sync()
+        value = self._local.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            if self._pending:
+                # The shared file may still hold values the queued writes replace.
+                return None
+            try:
+                value, remaining = _read_shared(self._conn, key)
+            except sqlite3.OperationalError:
+                return None
+        if value is None:
+            return None
+        self.shared_reads += 1
+        self._local.set(key, value, ttl=remaining)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int = 60) -> None:
+        """Store a value for every worker and invalidate their local copies."""
+
+        def apply(conn: sqlite3.Connection) -> tuple[None, bool]:
+            _store_shared(conn, key, value, ttl)
+            return None, True
+
+        with self._lock:
+            if self._transact(apply, kind="key", key=key)[1]:
+                self._local.set(key, value, ttl=ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._write("DELETE FROM cache_entries WHERE key = ?", (key,), kind="key", key=key)
+
+    def incr(self, key: str, initial: int, ttl: int = 60) -> Optional[int]:
+        """Add one to a shared integer inside one write transaction, so no increment is lost.
+
+        Returns None when the write lock is busy and the increment was queued.
+        """
+
+        def apply(conn: sqlite3.Connection) -> tuple[int, bool]:
+            current = _read_shared(conn, key)[0]
+            value = (initial if current is None else current) + 1
+            _store_shared(conn, key, value, ttl)
+            return value, True
+
+        with self._lock:
+            value, committed = self._transact(apply, kind="key", key=key)
+            if committed:
+                self._local.set(key, value, ttl=ttl)
+        return value
+
+    def set_if(self, key: str, value: Any, ttl: int, condition: Callable[[Optional[Any]], bool]) -> bool:
+        """Compare-and-set: read, check and write the shared value inside one write transaction.
+
+        A busy write lock counts as a failed comparison; the write is not queued.
+        """
+
+        def apply(conn: sqlite3.Connection) -> tuple[bool, bool]:
+            if not condition(_read_shared(conn, key)[0]):
+                return False, False
+            _store_shared(conn, key, value, ttl)
+            return True, True
+
+        with self._lock:
+            stored = bool(self._transact(apply, kind="key", key=key, defer=False)[0])
+            if stored:
+                self._local.set(key, value, ttl=ttl)
+        return stored
+
+    def clear(self) -> None:
+        with self._lock:
+            self._write("DELETE FROM cache_entries", (), kind="clear", key="")
+
+    def invalidate_pattern(self, pattern: str) -> None:
+        with self._lock:
+            self._write(
+                "DELETE FROM cache_entries WHERE substr(key, 1, ?) = ?",
+                (len(pattern), pattern),
+                kind="prefix",
+                key=pattern,
+            )
+
+    def stats(self) -> dict[str, int]:
+        return {**self._local.stats(), "shared_reads": self.shared_reads, "deferred_writes": self.deferred_writes}
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._deferred.put(None)
+            self._writer.join(DEFERRED_WRITE_TIMEOUT)
+        with self._lock:
+            self._generation.close()
+            self._generation_file.close()
+            self._conn.close()
+
+    def _write(self, sql: str, params: tuple, kind: str, key: str) -> None:
+        self._transact(lambda conn: (conn.execute(sql, params), True), kind=kind, key=key)
+
+    def _transact(self, apply: Apply, kind: str, key: str, defer: bool = True) -> tuple[Any, bool]:
+        """Commit ``apply`` now, or queue it when the write lock is busy.
+
+        Returns ``(result, True)`` when the write committed on the caller's
+        thread and ``(None, False)`` when it was queued or, with
+        ``defer=False``, skipped. Once a write is queued, later writes queue
+        behind it so the background thread applies them in order.
+        """
+        if not self._pending:
+            try:
+                seq, result = self._commit(self._conn, apply, kind, key)
+            except sqlite3.OperationalError as exc:
+                if not _is_busy(exc):
+                    raise
+            else:
+                self._broadcast(seq)
+                return result, True
+        if defer:
+            self._defer(apply, kind, key)
+        return None, False
+
+    def _commit(self, conn: sqlite3.Connection, apply: Apply, kind: str, key: str) -> tuple[Optional[int], Any]:
+        """Run ``apply`` in a ``BEGIN IMMEDIATE`` transaction, logging an invalidation if it changed anything.
+
+        ``apply`` returns ``(result, changed)``; the write lock is held from
+        its first read, so no other worker can interleave a write.
+        """
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result, changed = apply(conn)
+            seq = None
+            if changed:
+                seq = conn.execute("INSERT INTO cache_invalidations (kind, key) VALUES (?, ?)", (kind, key)).lastrowid
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return seq, result
+
+    def _broadcast(self, seq: Optional[int]) -> None:
+        if seq is None:
+            return
+        _GENERATION.pack_into(self._generation, 0, seq)
+        # Replays our own invalidation too, so the local LRU never keeps a pre-write value.
+        self._sync(force=True)
+        self._writes += 1
+        if self._writes % MAINTENANCE_EVERY_WRITES == 0:
+            self._maintain()
+
+    def _defer(self, apply: Apply, kind: str, key: str) -> None:
+        self._pending += 1
+        self.deferred_writes += 1
+        self._forget_locally(kind, key)
+        self._deferred.put((apply, kind, key))
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._drain, name="shared-cache-writer", daemon=True)
+            self._writer.start()
+
+    def _drain(self) -> None:
+        """Apply queued writes in order on a dedicated connection that may wait for the lock."""
+        conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=DEFERRED_WRITE_TIMEOUT)
+        try:
+            while (item := self._deferred.get()) is not None:
+                apply, kind, key = item
+                try:
+                    seq = self._commit(conn, apply, kind, key)[0]
+                except sqlite3.Error:
+                    logger.exception("Queued shared cache write failed", extra={"kind": kind, "key": key})
+                    seq = None
+                with self._lock:
+                    self._pending -= 1
+                    self._forget_locally(kind, key)
+                    if seq is not None:
+                        self._broadcast(seq)
+        finally:
+            conn.close()
+
+    def _forget_locally(self, kind: str, key: str) -> None:
+        if kind == "key":
+            self._local.delete(key)
+        elif kind == "prefix":
+            self._local.invalidate_pattern(key)
+        else:
+            self._local.clear()
+
+    def _read_generation(self) -> int:
+        return _GENERATION.unpack_from(self._generation, 0)[0]
+
+    def _sync(self, force: bool = False) -> None:
+        generation = self._read_generation()
+        if generation == self._seen_generation and not force:
+            return
+        with self._lock:
+            try:
+                oldest = self._conn.execute("SELECT min(seq) FROM cache_invalidations").fetchone()[0]
+                rows = self._conn.execute(
+                    "SELECT seq, kind, key FROM cache_invalidations WHERE seq > ? ORDER BY seq", (self._last_seq,)
+                ).fetchall()
+            except sqlite3.OperationalError:
+                # Cannot tell what changed; drop local copies and retry on the next read.
+                self._local.clear()
+                return
+            if oldest is not None and oldest > self._last_seq + 1:
+                # The log was trimmed past our position; we cannot tell what changed.
+                self._local.clear()
+            for seq, kind, key in rows:
+                self._forget_locally(kind, key)
+                self._last_seq = seq
+            self._seen_generation = generation
+
+    def _maintain(self) -> None:
+        try:
+            self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            self._conn.execute(
+                "DELETE FROM cache_invalidations WHERE seq <= (SELECT max(seq) FROM cache_invalidations) - ?",
+                (INVALIDATION_LOG_SIZE,),
+            )
+        except sqlite3.OperationalError as exc:
+            if not _is_busy(exc):
+                raise
+            # Another worker holds the write lock; the next maintenance pass catches up.
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    message = str(exc)
+    return "locked" in message or "busy" in message
+
+
+def _read_shared(conn: sqlite3.Connection, key: str) -> tuple[Optional[Any], float]:
+    """Return the unexpired shared value and its remaining TTL, or ``(None, 0)``."""
+    row = conn.execute("SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        return None, 0
+    remaining = row[1] - time.time()
+    if remaining <= 0:
+        return None, 0
+    return pickle.loads(row[0]), remaining
+
+
+def _store_shared(conn: sqlite3.Connection, key: str, value: Any, ttl: int) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+        (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time() + ttl),
+    )
@@ -1,12 +1,15 @@
 """Template-backed page routes."""
 
+import secrets
 from urllib.parse import quote
 
-from fastapi import APIRouter, BackgroundTasks, FastAPI, Request
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
 
 from app.application.unit_of_work import SqlAlchemyUnitOfWork
 from app.application.use_cases.logs import record_page_visit
+from app.services.visit_filter import get_visit_filter
+from app.utils.metrics import CONTENT_TYPE, get_registry
 
 router = APIRouter()
 
@@ -17,6 +20,20 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Prometheus text exposition of the in-process metrics."""
+    settings = request.app.state.settings
+    if not settings.enable_metrics:
+        raise HTTPException(status_code=404)
+    if settings.metrics_token:
+        supplied = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        # Headers are decoded as latin-1, so compare bytes: str compare_digest rejects non-ASCII.
+        if not secrets.compare_digest(supplied.encode(), settings.metrics_token.encode()):
+            raise HTTPException(status_code=401, detail="未授权")
+    return Response(get_registry().render(), media_type=CONTENT_TYPE)
+
+
 @router.get("/", response_class=HTMLResponse)
 async def index(request: Request, background_tasks: BackgroundTasks):
     """Navigation homepage."""
@@ -46,12 +63,16 @@ def register_page_router(app: FastAPI) -> None:
 
 
 def _queue_visit(background_tasks: BackgroundTasks, request: Request, path: str) -> None:
+    client_ip = _client_ip(request)
+    user_agent = request.headers.get("user-agent", "")
+    if request.app.state.settings.enable_visit_filter and not get_visit_filter().should_record(client_ip, user_agent):
+        return
     background_tasks.add_task(
         record_page_visit,
         request.app.state.session_factory,
-        _client_ip(request),
+        client_ip,
         path,
-        request.headers.get("user-agent", ""),
+        user_agent,
     )
 
 
@@ -0,0 +1,68 @@
+"""Compare two benchmark result files and fail on regressions.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json current.json --metric p95_ms --threshold 0.15
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+HIGHER_IS_BETTER = {"throughput_rps", "ops_per_second"}
+
+
+def compare_results(baseline: dict, current: dict, metric: str, threshold: float) -> list[dict]:
+    """Return one row per benchmark present in both files, flagging regressions beyond ``threshold``."""
+    rows = []
+    for name, base in sorted(baseline.get("results", {}).items()):
+        new = current.get("results", {}).get(name)
+        if new is None or metric not in base or metric not in new:
+            continue
+        before, after = float(base[metric]), float(new[metric])
+        if before <= 0:
+            change = 0.0
+        elif metric in HIGHER_IS_BETTER:
+            change = (before - after) / before
+        else:
+            change = (after - before) / before
+        rows.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regressed": change > threshold,
+            }
+        )
+    return rows
+
+
+def report(rows: list[dict], threshold: float) -> int:
+    """Print a comparison table and return the process exit code."""
+    for row in rows:
+        flag = "REGRESSED" if row["regressed"] else "ok"
+        print(f"{row['name']:<32} {row['baseline']:>12.3f} {row['current']:>12.3f} {row['change']:>+8.1%}  {flag}")
+    regressed = [row["name"] for row in rows if row["regressed"]]
+    if regressed:
+        print(f"{len(regressed)} 项退化超过 {threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Nav System 基准结果对比")
+    parser.add_argument("baseline", type=Path, help="基线结果 JSON")
+    parser.add_argument("current", type=Path, help="当前结果 JSON")
+    parser.add_argument("--metric", default="p95_ms", help="对比的指标，默认 p95_ms")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允许的退化比例，默认 0.15")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    current = json.loads(args.current.read_text(encoding="utf-8"))
+    return report(compare_results(baseline, current, args.metric, args.threshold), args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Deterministic synthetic dataset for benchmarks."""
+
+import random
+from pathlib import Path
+
+from app.models import Category, Link
+
+WORDS = (
+    "alpha beta gamma delta async cache index query render vault note link folder "
+    "导航 文章 缓存 索引 性能 测试 部署 配置"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def build_article(rng: random.Random, index: int, sections: int = 6) -> str:
+    """Return a markdown article with headings, lists, tables and fenced code."""
+    lines = [f"# Article {index}", "", _sentence(rng, 40), ""]
+    for section in range(sections):
+        lines += [f"## Section {section}", "", _sentence(rng, 60), ""]
+        lines += [f"- {_sentence(rng, 6)}" for _ in range(4)] + [""]
+        lines += ["| key | value | note |", "| --- | --- | --- |"]
+        lines += [f"| k{row} | {rng.randint(0, 9999)} | {_sentence(rng, 3)} |" for row in range(5)] + [""]
+        lines += ["```python", f"def handler_{section}(request):"]
+        lines += [f"    value_{line} = request.get('{rng.choice(WORDS)}', {line})" for line in range(8)]
+        lines += ["    return value_0", "```", ""]
+    return "\n".join(lines)
+
+
+def write_vault(articles_dir: Path, count: int, folders: int = 8, seed: int = 0) -> list[str]:
+    """Write ``count`` markdown articles spread over ``folders`` folders; return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        relative = f"folder-{index % max(1, folders)}/article-{index:05d}.md"
+        target = articles_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(build_article(rng, index), encoding="utf-8")
+        paths.append(relative)
+    return paths
+
+
+def write_large_articles(articles_dir: Path, count: int, sections: int = 150, seed: int = 0) -> list[str]:
+    """Write ``count`` long, code-heavy articles under ``large/``; return their paths."""
+    rng = random.Random(seed)
+    paths = []
+    for index in range(count):
+        relative = f"large/article-{index:03d}.md"
+        target = articles_dir / relative
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(build_article(rng, index, sections=sections), encoding="utf-8")
+        paths.append(relative)
+    return paths
+
+
+async def seed_links(session_factory, categories: int, links_per_category: int) -> None:
+    """Insert ``categories`` categories with ``links_per_category`` links each."""
+    async with session_factory() as db:
+        for category_index in range(categories):
+            category = Category(name=f"Category {category_index:03d}", sort_order=category_index)
+            category.links = [
+                Link(
+                    title=f"Link {category_index}-{link_index}",
+                    url=f"https://example-{category_index}.test/{link_index}",
+                    sort_order=link_index,
+                )
+                for link_index in range(links_per_category)
+            ]
+            db.add(category)
+        await db.commit()
@@ -0,0 +1,219 @@
+"""Load benchmark for the hot endpoints against an in-process ASGI app.
+
+The app runs in-process over ``httpx.ASGITransport`` (as in ``tests/conftest.py``)
+against a throwaway SQLite database and a synthetic article vault, so results
+depend only on the code under test and the dataset parameters. Usage::
+
+    python -m benchmarks.endpoints --output endpoints.json
+    python -m benchmarks.compare baseline.json endpoints.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from benchmarks.stats import run_metadata, summarize
+
+ADMIN_USERNAME = "bench"
+ADMIN_PASSWORD = "bench-password"
+BROWSER_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+
+
+@dataclass(slots=True)
+class Scenario:
+    name: str
+    method: str
+    build: Callable[[int], dict]
+
+
+def configure_environment(workdir: Path, markdown_workers: int = 0) -> None:
+    """Point the app at a scratch database and disable background jobs before it is imported."""
+    os.environ.update(
+        {
+            "DATABASE_URL": f"sqlite+aiosqlite:///{workdir / 'bench.db'}",
+            "SECRET_KEY": "benchmark-secret-key-32-chars-minimum-000",
+            "ADMIN_USERNAME": ADMIN_USERNAME,
+            "ADMIN_PASSWORD": ADMIN_PASSWORD,
+            "ENABLE_LOG_CLEANUP": "false",
+            "ENABLE_ARTICLE_INDEXER": "false",
+            "ENABLE_VISIT_ROLLUPS": "false",
+            "ENABLE_LOG_ARCHIVE": "false",
+            "ENABLE_PROFILING": "false",
+            "WRITE_RATE_LIMIT_PER_MINUTE": "0",
+            "RENDER_RATE_LIMIT_PER_MINUTE": "0",
+            "MARKDOWN_PROCESS_WORKERS": str(markdown_workers),
+        }
+    )
+    os.environ.pop("ADMIN_PASSWORD_HASH", None)
+
+
+def build_scenarios(article_paths: list[str], large_paths: list[str], token: str, seed: int) -> list[Scenario]:
+    rng = random.Random(seed)
+    auth = {"Authorization": f"Bearer {token}"}
+    return [
+        Scenario("home", "GET", lambda i: {"url": "/"}),
+        Scenario("links", "GET", lambda i: {"url": "/api/v1/links"}),
+        Scenario("articles", "GET", lambda i: {"url": "/api/v1/articles"}),
+        Scenario(
+            "article_detail",
+            "GET",
+            lambda i: {"url": f"/api/v1/articles/{rng.choice(article_paths)}"},
+        ),
+        Scenario(
+            "article_large",
+            "GET",
+            lambda i: {"url": f"/api/v1/articles/{large_paths[i % len(large_paths)]}"},
+        ),
+        # One large render per three cheap reads: shows how much big documents stall the rest.
+        Scenario(
+            "mixed",
+            "GET",
+            lambda i: {
+                "url": f"/api/v1/articles/{large_paths[i % len(large_paths)]}" if i % 4 == 0 else "/api/v1/links"
+            },
+        ),
+        Scenario(
+            "login",
+            "POST",
+            lambda i: {
+                "url": "/api/v1/auth/login",
+                "json": {"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD},
+            },
+        ),
+        Scenario(
+            "link_write",
+            "POST",
+            lambda i: {
+                "url": "/api/v1/links?category_name=Bench%20Writes",
+                "json": {"title": f"Write {i}", "url": f"https://writes.test/{i}"},
+                "headers": auth,
+            },
+        ),
+    ]
+
+
+async def run_scenario(client, scenario: Scenario, requests: int, concurrency: int, warmup: int) -> dict:
+    """Issue ``requests`` calls with at most ``concurrency`` in flight and summarize them."""
+    for index in range(warmup):
+        await client.request(scenario.method, **scenario.build(-index - 1))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    errors = 0
+
+    async def one(index: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(scenario.method, **scenario.build(index))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    result = summarize(latencies, time.perf_counter() - started, errors)
+    result["concurrency"] = concurrency
+    return result
+
+
+async def run_benchmarks(args: argparse.Namespace, workdir: Path) -> dict:
+    configure_environment(workdir, args.markdown_workers)
+    from httpx import ASGITransport, AsyncClient
+
+    from app.config import get_settings
+    from app.database import Base, get_async_session_factory, get_engine
+    from app.factory import create_app
+    from app.services.markdown_pool import shutdown_markdown_pool
+    from app.services.article_search import run_article_index_job
+    from benchmarks.dataset import seed_links, write_large_articles, write_vault
+
+    settings = get_settings()
+    settings.articles_dir = workdir / "articles"
+    settings.articles_dir.mkdir()
+    article_paths = write_vault(settings.articles_dir, args.articles, seed=args.seed)
+    large_paths = write_large_articles(settings.articles_dir, args.large_articles, seed=args.seed)
+
+    async with get_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = get_async_session_factory()
+    await seed_links(session_factory, args.categories, args.links)
+    await run_article_index_job(session_factory, settings.articles_dir)
+
+    app = create_app()
+    results: dict[str, dict] = {}
+    transport = ASGITransport(app=app)
+    async with AsyncClient(
+        transport=transport, base_url="http://bench", headers={"User-Agent": BROWSER_USER_AGENT}
+    ) as client:
+        login = await client.post(
+            "/api/v1/auth/login", json={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD}
+        )
+        login.raise_for_status()
+        for scenario in build_scenarios(article_paths, large_paths, login.json()["access_token"], args.seed):
+            if args.only and scenario.name not in args.only:
+                continue
+            requests = args.login_requests if scenario.name == "login" else args.requests
+            summary = await run_scenario(client, scenario, requests, args.concurrency, args.warmup)
+            results[scenario.name] = summary
+            print(
+                f"{scenario.name:<16} p50={summary['p50_ms']}ms p95={summary['p95_ms']}ms "
+                f"rps={summary['throughput_rps']} errors={summary['errors']}",
+                file=sys.stderr,
+            )
+    await get_engine().dispose()
+    shutdown_markdown_pool()
+
+    return {
+        "suite": "endpoints",
+        "meta": {
+            **run_metadata(),
+            "dataset": {
+                "categories": args.categories,
+                "links_per_category": args.links,
+                "articles": args.articles,
+                "large_articles": args.large_articles,
+                "markdown_workers": args.markdown_workers,
+                "seed": args.seed,
+            },
+        },
+        "results": results,
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Nav System 接口基准测试")
+    parser.add_argument("--categories", type=int, default=20, help="生成的分类数量")
+    parser.add_argument("--links", type=int, default=25, help="每个分类的链接数量")
+    parser.add_argument("--articles", type=int, default=200, help="生成的 Markdown 文章数量")
+    parser.add_argument("--large-articles", type=int, default=4, help="生成的大型文章数量（每篇约 150 节）")
+    parser.add_argument("--markdown-workers", type=int, default=0, help="Markdown 渲染进程数，0 表示在线程池渲染")
+    parser.add_argument("--requests", type=int, default=300, help="每个场景的请求数")
+    parser.add_argument("--login-requests", type=int, default=30, help="登录场景的请求数（bcrypt 较慢）")
+    parser.add_argument("--concurrency", type=int, default=8, help="同时进行的请求数")
+    parser.add_argument("--warmup", type=int, default=10, help="每个场景的预热请求数")
+    parser.add_argument("--seed", type=int, default=0, help="数据集随机种子")
+    parser.add_argument("--only", nargs="*", help="只运行指定场景")
+    parser.add_argument("--output", type=Path, help="结果 JSON 路径，默认输出到标准输出")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="nav-bench-") as workdir:
+        result = asyncio.run(run_benchmarks(args, Path(workdir)))
+
+    payload = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n", encoding="utf-8")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
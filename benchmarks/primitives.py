@@ -0,0 +1,139 @@
+"""Microbenchmarks for pathing, rendering, serialization and cache primitives.
+
+Each case is timed with ``timeit`` autoranging (enough loops for ~0.2s per
+round) and reported as per-call times over several rounds.
+Baselines are machine-specific; record one on the machine that compares::
+
+    python -m benchmarks.primitives --save-baseline
+    python -m benchmarks.primitives --compare benchmarks/baselines/primitives.json --threshold 0.25
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+
+from benchmarks.compare import compare_results, report
+from benchmarks.dataset import build_article, write_vault
+from benchmarks.stats import run_metadata
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "primitives.json"
+# The fastest round is the least disturbed by scheduler noise, so it is what gets compared.
+COMPARE_METRIC = "min_us"
+
+
+@dataclass(slots=True)
+class Case:
+    name: str
+    func: Callable[[], object]
+
+
+def measure(func: Callable[[], object], rounds: int = 5, min_time: float = 0.2) -> dict:
+    """Time ``func`` and return per-call statistics in microseconds."""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    per_call = [elapsed / loops * 1e6 for elapsed in timer.repeat(repeat=rounds, number=loops)]
+    median = statistics.median(per_call)
+    return {
+        "median_us": round(median, 3),
+        "min_us": round(min(per_call), 3),
+        "max_us": round(max(per_call), 3),
+        "ops_per_second": round(1e6 / median, 1) if median > 0 else 0.0,
+        "loops": loops,
+        "rounds": rounds,
+    }
+
+
+def build_cases(workdir: Path) -> list[Case]:
+    """Build representative inputs once; every case closes over them."""
+    from app.core import is_path_protected, normalize_article_path, safe_path_under_root
+    from app.domain.navigation import NavigationDomainService
+    from app.services.articles import ArticleService
+    from app.utils.cache import InMemoryCacheBackend, cache
+
+    rng = random.Random(0)
+    articles_dir = workdir / "articles"
+    article_paths = write_vault(articles_dir, 16, folders=4)
+    nested_path = "/notes/./2024//projects/deep/folder/readme.md"
+    protected = [f"private/area-{index}" for index in range(10)] + ["notes/2024/projects"]
+    article = build_article(rng, 0)
+    category = SimpleNamespace(
+        name="Category",
+        auth_required=False,
+        links=[
+            SimpleNamespace(
+                id=f"id-{index}",
+                title=f"Link {index}",
+                url=f"https://x.test/{index}",
+                icon=None,
+                sort_order=rng.randint(0, 100),
+            )
+            for index in range(50)
+        ],
+    )
+    backend = InMemoryCacheBackend()
+    for index in range(1000):
+        backend.set(f"article:{index}", {"index": index}, ttl=3600)
+    backend.set("links:all", {"categories": []}, ttl=3600)
+
+    return [
+        Case("normalize_article_path", lambda: normalize_article_path(nested_path)),
+        Case("safe_path_under_root", lambda: safe_path_under_root(articles_dir, article_paths[3])),
+        Case("is_path_protected_hit", lambda: is_path_protected("notes/2024/projects/a.md", protected)),
+        Case("is_path_protected_miss", lambda: is_path_protected("public/a.md", protected)),
+        Case("render_markdown", lambda: ArticleService.render_markdown(article)),
+        Case("serialize_category_50_links", lambda: NavigationDomainService._serialize_category(category)),
+        Case("memory_cache_get_hit", lambda: backend.get("links:all")),
+        Case("memory_cache_get_miss", lambda: backend.get("links:missing")),
+        Case("cache_proxy_get_miss", lambda: cache.get("bench:missing")),
+    ]
+
+
+def run_primitives(only: list[str] | None = None, rounds: int = 5, min_time: float = 0.2) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nav-micro-") as workdir:
+        for case in build_cases(Path(workdir)):
+            if only and case.name not in only:
+                continue
+            results[case.name] = measure(case.func, rounds=rounds, min_time=min_time)
+            print(f"{case.name:<32} {results[case.name]['median_us']:>12.3f} us", file=sys.stderr)
+    return {"suite": "primitives", "meta": run_metadata(), "results": results}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Nav System 基础函数微基准")
+    parser.add_argument("--only", nargs="*", help="只运行指定用例")
+    parser.add_argument("--rounds", type=int, default=5, help="每个用例的测量轮数")
+    parser.add_argument("--min-time", type=float, default=0.2, help="每轮最少耗时（秒）")
+    parser.add_argument("--output", type=Path, help="结果 JSON 路径")
+    parser.add_argument("--save-baseline", action="store_true", help=f"把结果写入 {BASELINE_PATH.name} 作为基线")
+    parser.add_argument("--compare", type=Path, help="与指定基线对比，退化超过阈值时返回 1")
+    parser.add_argument("--threshold", type=float, default=0.25, help="允许的退化比例，默认 0.25")
+    args = parser.parse_args(argv)
+
+    result = run_primitives(args.only, args.rounds, args.min_time)
+    payload = json.dumps(result, ensure_ascii=False, indent=2) + "\n"
+    if args.output:
+        args.output.write_text(payload, encoding="utf-8")
+    if args.save_baseline:
+        BASELINE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_PATH.write_text(payload, encoding="utf-8")
+    if not args.output and not args.save_baseline and not args.compare:
+        print(payload, end="")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        return report(compare_results(baseline, result, COMPARE_METRIC, args.threshold), args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Latency summaries and run metadata shared by the benchmark runners."""
+
+import math
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+
+def run_metadata() -> dict:
+    """Describe where and on which revision a benchmark ran."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = ""
+    return {
+        "revision": revision,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list (``fraction`` in 0..1)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies: list[float], wall_seconds: float, errors: int = 0) -> dict:
+    """Summarize per-request latencies (seconds) into millisecond percentiles and throughput."""
+    ordered = sorted(latencies)
+    to_ms = 1000.0
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 4),
+        "throughput_rps": round(len(ordered) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * to_ms, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * to_ms, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * to_ms, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * to_ms, 3),
+        "max_ms": round(ordered[-1] * to_ms, 3) if ordered else 0.0,
+    }
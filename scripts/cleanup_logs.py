@@ -5,16 +5,29 @@ import argparse
 import asyncio
 
 from app.config import get_settings
-from app.database import async_session
+from app.database import get_async_session_factory
 from app.services.log import run_log_cleanup_job
 
 
-async def cleanup_logs(max_visits: int | None, max_updates: int | None) -> dict[str, int]:
+def print_progress(table: str, deleted: int, total: int) -> None:
+    print(f"{table}: {deleted}/{total}")
+
+
+async def cleanup_logs(
+    max_visits: int | None,
+    max_updates: int | None,
+    max_visit_age_days: int | None = None,
+    max_update_age_days: int | None = None,
+    show_progress: bool = False,
+) -> dict[str, int]:
     """Run visit/update log retention cleanup."""
     return await run_log_cleanup_job(
-        async_session,
+        get_async_session_factory(),
         max_visits=max_visits,
         max_updates=max_updates,
+        max_visit_age_days=max_visit_age_days,
+        max_update_age_days=max_update_age_days,
+        progress=print_progress if show_progress else None,
     )
 
 
@@ -33,9 +46,30 @@ def main() -> None:
         default=settings.max_update_records,
         help="保留的更新记录数量上限",
     )
+    parser.add_argument(
+        "--max-visit-age-days",
+        type=int,
+        default=settings.max_visit_age_days,
+        help="访问记录最长保留天数，0 表示不按时间清理",
+    )
+    parser.add_argument(
+        "--max-update-age-days",
+        type=int,
+        default=settings.max_update_age_days,
+        help="更新记录最长保留天数，0 表示不按时间清理",
+    )
+    parser.add_argument("--progress", action="store_true", help="输出分批删除进度")
     args = parser.parse_args()
 
-    result = asyncio.run(cleanup_logs(args.max_visits, args.max_updates))
+    result = asyncio.run(
+        cleanup_logs(
+            args.max_visits,
+            args.max_updates,
+            args.max_visit_age_days,
+            args.max_update_age_days,
+            args.progress,
+        )
+    )
     print(f"已删除访问记录: {result['deleted_visits']}")
     print(f"已删除更新记录: {result['deleted_updates']}")
     print(f"当前访问记录保留数: {result['remaining_visits']}")
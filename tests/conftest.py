@@ -12,11 +12,17 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 os.environ.setdefault("SECRET_KEY", "test-secret-key-32-chars-minimum-123456")
 os.environ.setdefault("ADMIN_USERNAME", "admin")
 os.environ.setdefault("ADMIN_PASSWORD", "admin123")
+os.environ.setdefault("HIGHLIGHT_CACHE_PERSIST", "false")
+os.environ.setdefault("ENABLE_METRICS", "true")
 
 from app.config import get_settings
 from app.database import Base, get_db
+from app.services.article_search import set_article_index_ready
 from app.services.auth import reset_auth_service_state
+from app.services.highlight_cache import reset_highlight_cache
 from app.services.rate_limit import get_rate_limiter, reset_rate_limiter
+from app.services.user_agents import reset_user_agent_cache
+from app.services.visit_filter import reset_visit_filter
 from app.utils.cache import get_cache_backend, reset_cache_backend
 
 settings = get_settings()
@@ -37,6 +43,10 @@ def reset_in_memory_state():
     reset_auth_service_state()
     reset_cache_backend()
     reset_rate_limiter()
+    reset_user_agent_cache()
+    reset_visit_filter()
+    reset_highlight_cache()
+    set_article_index_ready(False)
     cache_backend = get_cache_backend()
     if hasattr(cache_backend, "clear"):
         cache_backend.clear()
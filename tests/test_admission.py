@@ -0,0 +1,77 @@
+"""Admission control tests: route-class rate limits and in-flight shedding."""
+
+import pytest
+
+from app.config import get_settings
+from app.services.admission import classify_request, get_in_flight_limiter
+from app.utils.metrics import HTTP_REQUESTS_REJECTED
+
+
+def test_classify_request_picks_expensive_routes():
+    assert classify_request("POST", "/api/v1/favicon/fetch") == "favicon"
+    assert classify_request("POST", "/api/v1/links/import") == "import"
+    assert classify_request("GET", "/api/v1/articles/notes/a.md") == "render"
+    assert classify_request("GET", "/api/v1/articles/search") is None
+    assert classify_request("GET", "/api/v1/articles") is None
+    assert classify_request("PUT", "/api/v1/articles/notes/a.md") is None
+
+
+@pytest.mark.asyncio
+async def test_route_class_limit_returns_429_per_client(client, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "import_rate_limit_per_minute", 60)
+    monkeypatch.setattr(settings, "import_rate_limit_burst", 1)
+    before = HTTP_REQUESTS_REJECTED.value(reason="rate_limited", route_class="import")
+
+    first = await client.post("/api/v1/links/import")
+    second = await client.post("/api/v1/links/import")
+
+    assert first.status_code != 429
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "1"
+    assert HTTP_REQUESTS_REJECTED.value(reason="rate_limited", route_class="import") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_render_limit_only_charges_uncached_renders(client, isolated_articles_dir, monkeypatch):
+    """Reads served from the rendered sidecar stay unlimited; fresh renders spend the budget."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "render_rate_limit_per_minute", 60)
+    monkeypatch.setattr(settings, "render_rate_limit_burst", 1)
+    for name in ("a", "b", "c"):
+        (isolated_articles_dir / f"{name}.md").write_text(f"# {name}", encoding="utf-8")
+    before = HTTP_REQUESTS_REJECTED.value(reason="rate_limited", route_class="render")
+
+    assert (await client.get("/api/v1/articles/a.md")).status_code == 200
+    for _ in range(3):
+        assert (await client.get("/api/v1/articles/a.md")).status_code == 200
+    assert (await client.get("/api/v1/articles/missing.md")).status_code == 404
+    limited = await client.get("/api/v1/articles/b.md")
+    limited_html = await client.get("/api/v1/articles/c.md", params={"format": "html"})
+
+    assert limited.status_code == 429
+    assert limited.headers["Retry-After"] == "1"
+    assert limited_html.status_code == 429
+    assert (await client.get("/api/v1/articles")).status_code == 200
+    assert HTTP_REQUESTS_REJECTED.value(reason="rate_limited", route_class="render") == before + 2
+
+
+@pytest.mark.asyncio
+async def test_in_flight_cap_sheds_with_503_but_keeps_health(client, monkeypatch):
+    monkeypatch.setattr(get_settings(), "max_in_flight_requests", 1)
+    limiter = get_in_flight_limiter()
+    before = HTTP_REQUESTS_REJECTED.value(reason="overloaded", route_class="other")
+
+    assert limiter.try_acquire(1)
+    try:
+        shed = await client.get("/api/v1/links")
+        health = await client.get("/health")
+    finally:
+        limiter.release()
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert health.status_code == 200
+    assert HTTP_REQUESTS_REJECTED.value(reason="overloaded", route_class="other") == before + 1
+    assert (await client.get("/api/v1/links")).status_code == 200
+    assert limiter.in_flight == 0
@@ -0,0 +1,115 @@
+"""Article search service tests."""
+
+import os
+
+import pytest
+
+from app.services.article_search import ArticleSearchService
+
+
+def _write(root, path, content):
+    target = root / path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(content, encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_reconcile_indexes_vault_and_search_highlights_matches(test_db, isolated_articles_dir):
+    """Reconcile should index the vault and FTS search should return escaped snippets."""
+    _write(isolated_articles_dir, "notes/fastapi.md", "# FastAPI\n\nDependency injection <b>tips</b> and tricks")
+    _write(isolated_articles_dir, "notes/导航.md", "个人导航系统的部署笔记")
+    service = ArticleSearchService(test_db)
+
+    summary = await service.reconcile()
+    await test_db.commit()
+    assert summary == {"indexed": 2, "removed": 0, "total": 2}
+    assert (await service.reconcile())["indexed"] == 0
+
+    english = await service.search("injection", [], include_protected=False)
+    chinese = await service.search("导航系统", [], include_protected=False)
+    short = await service.search("部署", [], include_protected=False)
+
+    assert [item["path"] for item in english] == ["notes/fastapi.md"]
+    assert "<mark>injection</mark>" in english[0]["snippet"]
+    assert "&lt;b&gt;" in english[0]["snippet"]
+    assert [item["path"] for item in chinese] == ["notes/导航.md"]
+    assert [item["path"] for item in short] == ["notes/导航.md"]
+    assert "<mark>部署</mark>" in short[0]["snippet"]
+
+
+@pytest.mark.asyncio
+async def test_search_filters_protected_paths(test_db, isolated_articles_dir):
+    """Protected articles should only be returned to authenticated callers."""
+    _write(isolated_articles_dir, "private/secret.md", "shared keyword")
+    _write(isolated_articles_dir, "private.md", "shared keyword")
+    service = ArticleSearchService(test_db)
+    await service.reconcile()
+
+    anonymous = await service.search("keyword", ["private"], include_protected=False)
+    authenticated = await service.search("keyword", ["private"], include_protected=True)
+
+    assert [item["path"] for item in anonymous] == ["private.md"]
+    assert {item["path"]: item["protected"] for item in authenticated} == {
+        "private.md": False,
+        "private/secret.md": True,
+    }
+
+
+@pytest.mark.asyncio
+async def test_folder_rename_and_delete_update_index(test_db, isolated_articles_dir):
+    """Folder operations should rewrite or drop indexed paths."""
+    _write(isolated_articles_dir, "drafts/idea.md", "unique phrase")
+    _write(isolated_articles_dir, "drafts-old/other.md", "unique phrase")
+    service = ArticleSearchService(test_db)
+    await service.reconcile()
+
+    await service.rename_folder("drafts", "published")
+    renamed = await service.search("unique", [], include_protected=True)
+    await service.remove_folder("published")
+    remaining = await service.search("unique", [], include_protected=True)
+
+    assert sorted(item["path"] for item in renamed) == ["drafts-old/other.md", "published/idea.md"]
+    assert [item["path"] for item in remaining] == ["drafts-old/other.md"]
+
+
+@pytest.mark.asyncio
+async def test_list_page_walks_stable_keyset_order(test_db, isolated_articles_dir):
+    """Paged listings should cover every visible article once, newest first."""
+    for index, path in enumerate(["a/one.md", "a/two.md", "b/three.md", "private/four.md", "a/five.md"]):
+        _write(isolated_articles_dir, path, "body")
+        os.utime(isolated_articles_dir / path, (1000 + index, 1000 + (index // 2)))
+    service = ArticleSearchService(test_db)
+    await service.reconcile()
+
+    seen, cursor = [], None
+    while True:
+        page = await service.list_page(["private"], include_protected=False, limit=2, cursor=cursor)
+        seen.extend(item["path"] for item in page["articles"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    folder_page = await service.list_page([], include_protected=True, limit=10, folder="a")
+
+    assert seen == ["a/five.md", "b/three.md", "a/one.md", "a/two.md"]
+    assert [item["path"] for item in folder_page["articles"]] == ["a/five.md", "a/one.md", "a/two.md"]
+    with pytest.raises(ValueError):
+        await service.list_page([], include_protected=True, limit=2, cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_reconcile_commits_between_batches(test_db, isolated_articles_dir):
+    """Reconcile should hand control back after every batch of indexed files."""
+    for index in range(5):
+        _write(isolated_articles_dir, f"bulk/{index}.md", "body")
+    service = ArticleSearchService(test_db)
+    commits = []
+
+    async def between_batches():
+        page = await service.list_page([], include_protected=True, limit=10)
+        commits.append(len(page["articles"]))
+        await test_db.commit()
+
+    summary = await service.reconcile(batch_size=2, between_batches=between_batches)
+
+    assert summary["indexed"] == 5
+    assert commits == [2, 4]
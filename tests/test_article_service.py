@@ -1,8 +1,15 @@
 """Article service tests."""
 
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
 import pytest
 
+from app.config import get_settings
 from app.services.articles import ArticleAuthenticationRequiredError, ArticleService
+from app.services.markdown_pool import MarkdownRenderPool, MarkdownRenderTimeoutError, shutdown_markdown_pool
+from app.utils.metrics import MARKDOWN_RENDERS
 
 
 def test_list_articles_filters_protected_paths(isolated_articles_dir):
@@ -73,3 +80,124 @@ async def test_article_async_facade_uses_threadpool(monkeypatch):
     assert captured["func"] == fake_sync
     assert captured["args"] == ("notes/hello.md", ["private"], True)
     assert result == {"path": "notes/hello.md"}
+
+
+@pytest.mark.asyncio
+async def test_large_articles_render_in_process_pool(isolated_articles_dir, monkeypatch):
+    """Documents over the threshold render in a worker process with identical output."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "markdown_process_workers", 1)
+    monkeypatch.setattr(settings, "markdown_process_min_chars", 200)
+    large = "# Large\n\n" + "```python\nprint('x')\n```\n\n" * 20
+    (isolated_articles_dir / "small.md").write_text("# Small", encoding="utf-8")
+    (isolated_articles_dir / "large.md").write_text(large, encoding="utf-8")
+    service = ArticleService()
+    before = MARKDOWN_RENDERS.value(mode="process")
+
+    try:
+        small = await service.get_article_async("small.md", [], False)
+        article = await service.get_article_async("large.md", [], False)
+    finally:
+        shutdown_markdown_pool()
+
+    assert small["html"] == ArticleService.render_markdown("# Small")
+    assert article["html"] == ArticleService.render_markdown(large)
+    assert MARKDOWN_RENDERS.value(mode="process") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_render_pool_overflows_inline_and_times_out():
+    """A full queue renders on the threadpool; a slow render raises instead of hanging."""
+    pool = MarkdownRenderPool(workers=1, min_chars=0, max_pending=1, timeout=0.001)
+    pool.pending = 1
+    html, toc = await pool.render("**hi**")
+    assert html == ArticleService.render_markdown("**hi**")
+    assert toc == []
+
+    pool.pending = 0
+    try:
+        with pytest.raises(MarkdownRenderTimeoutError):
+            await pool.render("**hi**")
+        # The worker is still busy with the timed-out render, so its slot stays taken.
+        assert pool.pending == 1
+        overflow = MARKDOWN_RENDERS.value(mode="overflow")
+        await pool.render("**again**")
+        assert MARKDOWN_RENDERS.value(mode="overflow") == overflow + 1
+        for _ in range(600):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.05)
+    finally:
+        pool.shutdown()
+    assert pool.pending == 0
+
+
+class _FakeExecutor:
+    def __init__(self):
+        self.futures: list[Future] = []
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_recovery_only_retires_the_executor_that_broke():
+    """A late recovery must not shut down the executor an earlier recovery already replaced."""
+    pool = MarkdownRenderPool(workers=1, min_chars=0, max_pending=4, timeout=5)
+    broken, replacement = _FakeExecutor(), _FakeExecutor()
+    pool._executor = broken
+
+    first = asyncio.create_task(pool.render("**one**"))
+    second = asyncio.create_task(pool.render("**two**"))
+    await asyncio.sleep(0)
+    assert len(broken.futures) == 2
+
+    broken.futures[0].set_exception(BrokenProcessPool("worker died"))
+    assert (await first)[0] == ArticleService.render_markdown("**one**")
+    assert broken.shut_down is True
+    assert pool._executor is None
+
+    pool._executor = replacement
+    broken.futures[1].set_exception(BrokenProcessPool("worker died"))
+    assert (await second)[0] == ArticleService.render_markdown("**two**")
+    assert replacement.shut_down is False
+    assert pool._executor is replacement
+
+
+def test_sidecars_are_reused_until_the_source_changes(isolated_articles_dir, monkeypatch):
+    """Reads serve the stored render; an out-of-band edit makes it stale and re-renders."""
+    service = ArticleService()
+    service.sync_article("notes/a", "# First")
+
+    def fail(content):
+        raise AssertionError("fresh sidecar should not be re-rendered")
+
+    monkeypatch.setattr("app.services.articles.render_document", fail)
+    assert "First" in service.get_article("notes/a.md", [], False)["html"]
+
+    monkeypatch.undo()
+    source = isolated_articles_dir / "notes" / "a.md"
+    source.write_text("# Second edition", encoding="utf-8")
+    assert "Second edition" in service.get_article("notes/a.md", [], False)["html"]
+    assert service.renders.lookup("notes/a.md", source.stat()).meta["title"] == "Second edition"
+
+
+def test_sidecars_follow_folder_rename_and_delete(isolated_articles_dir):
+    from app.services.folders import FolderService
+
+    articles, folders = ArticleService(), FolderService()
+    articles.sync_article("old/a", "# A")
+    folders.rename_folder("old", "new")
+    moved = isolated_articles_dir / "new" / "a.md"
+
+    assert articles.renders.lookup("new/a.md", moved.stat()) is not None
+    assert [folder["name"] for folder in folders.list_folders()] == ["new"]
+
+    folders.delete_folder("new")
+    assert not (isolated_articles_dir / ".rendered" / "new").exists()
@@ -48,3 +48,97 @@ async def test_legacy_article_routes_redirect_to_home(client, auth_headers, isol
     assert list_page.headers["location"] == "/"
     assert detail_page.status_code == 307
     assert detail_page.headers["location"] == "/?article=notes%2Flegacy.md"
+
+
+@pytest.mark.asyncio
+async def test_search_articles_tracks_sync_update_and_delete(client, auth_headers, isolated_articles_dir):
+    """Article writes through the API should keep the search index current."""
+    await client.post(
+        "/api/v1/articles/sync",
+        json={"path": "notes/search", "content": "original wording"},
+        headers=auth_headers,
+    )
+    assert (await client.get("/api/v1/articles/search", params={"q": "original"})).json()["results"]
+
+    await client.put("/api/v1/articles/notes/search.md", json={"content": "revised wording"}, headers=auth_headers)
+    assert (await client.get("/api/v1/articles/search", params={"q": "original"})).json()["results"] == []
+    revised = await client.get("/api/v1/articles/search", params={"q": "revised"})
+    assert [item["path"] for item in revised.json()["results"]] == ["notes/search.md"]
+
+    await client.delete("/api/v1/articles/notes/search.md", headers=auth_headers)
+    assert (await client.get("/api/v1/articles/search", params={"q": "revised"})).json()["results"] == []
+
+
+@pytest.mark.asyncio
+async def test_article_html_format_serves_prerendered_sidecar(client, auth_headers, isolated_articles_dir):
+    """Synced articles are rendered once; format=html streams the stored file."""
+    await client.post(
+        "/api/v1/articles/sync",
+        json={"path": "notes/sidecar", "content": "# Sidecar\n\n## Part\n\nBody"},
+        headers=auth_headers,
+    )
+    sidecar = isolated_articles_dir / ".rendered" / "notes" / "sidecar.md.html"
+    assert sidecar.is_file()
+
+    response = await client.get("/api/v1/articles/notes/sidecar.md", params={"format": "html"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.text == sidecar.read_text(encoding="utf-8")
+
+    detail = (await client.get("/api/v1/articles/notes/sidecar.md")).json()
+    assert [entry["name"] for entry in detail["toc"]] == ["Sidecar"]
+    assert [entry["name"] for entry in detail["toc"][0]["children"]] == ["Part"]
+    for entry in (detail["toc"][0], detail["toc"][0]["children"][0]):
+        assert f'id="{entry["id"]}"' in detail["html"]
+        assert f'id="{entry["id"]}"' in response.text
+    assert (await client.get("/api/v1/articles/notes/missing.md", params={"format": "html"})).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_paged_listing_uses_filesystem_until_index_is_reconciled(
+    client, auth_headers, isolated_articles_dir, test_db
+):
+    """Paged listings should see files written directly to the vault until the index has caught up."""
+    from app.services.article_search import ArticleSearchService, set_article_index_ready
+
+    for index in range(3):
+        (isolated_articles_dir / f"direct-{index}.md").write_text("body", encoding="utf-8")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/api/v1/articles", params=params)).json()
+        seen.extend(item["path"] for item in page["articles"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert sorted(seen) == ["direct-0.md", "direct-1.md", "direct-2.md"]
+
+    await ArticleSearchService(test_db, isolated_articles_dir).reconcile()
+    await test_db.commit()
+    set_article_index_ready(True)
+    indexed = (await client.get("/api/v1/articles", params={"limit": 10})).json()
+    assert [item["path"] for item in indexed["articles"]] == seen
+
+
+@pytest.mark.asyncio
+async def test_article_html_format_renders_through_pool_and_maps_timeout(client, isolated_articles_dir, monkeypatch):
+    """Stale large articles requested as HTML go through the render pool and its timeout."""
+    from app.services.markdown_pool import MarkdownRenderTimeoutError
+
+    class TimingOutPool:
+        min_chars = 10
+
+        async def render(self, content):
+            raise MarkdownRenderTimeoutError("文章渲染超时")
+
+    monkeypatch.setattr("app.services.articles.get_markdown_pool", lambda: TimingOutPool())
+    (isolated_articles_dir / "small.md").write_text("# Small", encoding="utf-8")
+    (isolated_articles_dir / "large.md").write_text("# Large\n\n" + "body " * 100, encoding="utf-8")
+
+    small = await client.get("/api/v1/articles/small.md", params={"format": "html"})
+    large = await client.get("/api/v1/articles/large.md", params={"format": "html"})
+
+    assert small.status_code == 200
+    assert 'id="toc-small"' in small.text
+    assert large.status_code == 503
@@ -1,12 +1,13 @@
 """Authentication tests."""
 
+import threading
 from datetime import timedelta
 
 import pytest
 
 from app.config import get_settings
 from app.services.auth import AuthService, CredentialService, reset_auth_service_state
-from app.services.rate_limit import reset_rate_limiter, set_rate_limiter
+from app.services.rate_limit import InMemoryRateLimiter, reset_rate_limiter, set_rate_limiter
 from app.utils.security import create_access_token, get_password_hash, verify_password, verify_token
 
 
@@ -135,6 +136,28 @@ async def test_login_rate_limit_response_uses_service_boundary(client, monkeypat
     assert "42" in response.json()["detail"]
 
 
+def test_concurrent_failures_from_worker_threads_still_lock_out():
+    """Threadpool logins must not lose recorded failures to races in the in-memory limiter."""
+    attempts = 16
+    for _ in range(20):
+        limiter = InMemoryRateLimiter(max_attempts=attempts, window_seconds=60, lockout_seconds=900)
+        barrier = threading.Barrier(attempts)
+
+        def fail():
+            barrier.wait()
+            limiter.record_failure("10.0.0.1")
+
+        threads = [threading.Thread(target=fail) for _ in range(attempts)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        allowed, remaining = limiter.check("10.0.0.1")
+        assert allowed is False
+        assert remaining > 0
+
+
 def test_auth_service_supports_swappable_rate_limiter_backend():
     """Auth service should work with a replaced rate-limit backend."""
 
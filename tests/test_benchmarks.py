@@ -0,0 +1,60 @@
+"""Benchmark helper tests."""
+
+import json
+import random
+
+from benchmarks.compare import compare_results
+from benchmarks.dataset import build_article
+from benchmarks.stats import percentile, summarize
+
+
+def test_summarize_reports_nearest_rank_percentiles():
+    """Latency summaries should use nearest-rank percentiles in milliseconds."""
+    latencies = [index / 1000 for index in range(1, 101)]
+
+    assert percentile(sorted(latencies), 0.95) == 0.095
+    summary = summarize(latencies, wall_seconds=2.0, errors=1)
+    assert summary["requests"] == 100
+    assert summary["throughput_rps"] == 50.0
+    assert summary["p50_ms"] == 50.0
+    assert summary["p99_ms"] == 99.0
+    assert summary["errors"] == 1
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    """Latency increases and throughput drops past the threshold count as regressions."""
+    baseline = {"results": {"links": {"p95_ms": 10.0, "throughput_rps": 100}, "home": {"p95_ms": 10.0}}}
+    current = {"results": {"links": {"p95_ms": 11.0, "throughput_rps": 70}, "home": {"p95_ms": 13.0}}}
+
+    latency = {row["name"]: row for row in compare_results(baseline, current, "p95_ms", 0.15)}
+    throughput = compare_results(baseline, current, "throughput_rps", 0.15)
+
+    assert latency["links"]["regressed"] is False
+    assert latency["home"]["regressed"] is True
+    assert throughput == [
+        {"name": "links", "baseline": 100.0, "current": 70.0, "change": 0.3, "regressed": True}
+    ]
+
+
+def test_generated_articles_are_deterministic_and_feature_rich():
+    """Synthetic articles should exercise tables and fenced code, and repeat for a seed."""
+    article = build_article(random.Random(3), 1)
+
+    assert article == build_article(random.Random(3), 1)
+    assert "| --- | --- | --- |" in article
+    assert "```python" in article
+
+
+def test_primitive_cases_run_and_measure(tmp_path):
+    """Every microbenchmark case should execute, and measure() should report per-call timings."""
+    from benchmarks.primitives import BASELINE_PATH, build_cases, measure
+
+    cases = build_cases(tmp_path)
+    for case in cases:
+        case.func()
+
+    result = measure(lambda: sum(range(10)), rounds=2, min_time=0.01)
+    assert 0 < result["min_us"] <= result["median_us"] <= result["max_us"]
+    assert result["rounds"] == 2
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    assert {case.name for case in cases} == set(baseline["results"])
@@ -0,0 +1,213 @@
+"""In-memory cache backend tests."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.config import get_settings
+from app.utils import cache as cache_module
+from app.utils.cache import InMemoryCacheBackend, cache, estimate_size
+
+
+def _fake_clock(monkeypatch, start: float = 1000.0) -> list[float]:
+    clock = [start]
+    monkeypatch.setattr(
+        cache_module, "time", SimpleNamespace(monotonic=lambda: clock[0], time=time.time, time_ns=time.time_ns)
+    )
+    return clock
+
+
+def test_lru_evicts_least_recently_used_over_entry_budget():
+    """Reading a key refreshes it, so the untouched oldest key is evicted first."""
+    backend = InMemoryCacheBackend(max_entries=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    assert backend.get("a") == 1
+
+    backend.set("c", 3)
+
+    assert backend.get("b") is None
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+    assert backend.stats()["evictions"] == 1
+
+
+def test_byte_budget_is_enforced_and_accounted():
+    """Estimated bytes are tracked per entry and released on delete."""
+    value = "x" * 1000
+    budget = estimate_size(value) * 2 + 500
+    backend = InMemoryCacheBackend(max_bytes=budget)
+
+    for key in ("k1", "k2", "k3"):
+        backend.set(key, value)
+
+    assert len(backend) == 2
+    assert backend.stats()["bytes"] <= budget
+    backend.delete("k3")
+    backend.delete("k2")
+    assert backend.stats()["bytes"] == 0
+    backend.set("huge", "y" * budget)
+    assert backend.get("huge") is None
+
+
+def test_estimate_size_samples_large_containers(monkeypatch):
+    """Large values are sized from a bounded sample that stays close to a full walk."""
+    import sys
+
+    rows = [{"id": index, "title": f"title {index}", "tags": ["a", "b"]} for index in range(5000)]
+    sized = []
+
+    def getsizeof(item):
+        sized.append(item)
+        return sys.getsizeof(item)
+
+    monkeypatch.setattr(cache_module, "sys", SimpleNamespace(getsizeof=getsizeof))
+    estimate = estimate_size(rows)
+    assert len(sized) < 1000
+
+    monkeypatch.setattr(cache_module, "SIZE_SAMPLE", len(rows))
+    exact = estimate_size(rows)
+    assert 0.8 * exact <= estimate <= 1.25 * exact
+
+
+def test_expired_entries_are_purged_without_being_read(monkeypatch):
+    """The TTL heap should drop due entries on any hit or write, not just reads of that key."""
+    clock = _fake_clock(monkeypatch)
+    backend = InMemoryCacheBackend()
+    backend.set("short", 1, ttl=5)
+    backend.set("long", 2, ttl=60)
+    backend.set("short", 3, ttl=30)
+
+    clock[0] += 10
+    assert backend.get("long") == 2
+    assert backend.get("short") == 3
+
+    clock[0] += 25
+    assert backend.purge_expired() == 1
+    assert backend.stats()["entries"] == 1
+    clock[0] += 30
+    backend.set("other", 4)
+    assert len(backend) == 1
+
+
+def test_invalidate_pattern_only_touches_matching_prefix():
+    """Prefix invalidation should remove matching keys and keep neighbours."""
+    backend = InMemoryCacheBackend()
+    for key in ("links:all", "links:public", "linksx", "settings", "article:1"):
+        backend.set(key, key)
+
+    backend.invalidate_pattern("links:")
+
+    assert backend.get("links:all") is None
+    assert backend.get("links:public") is None
+    assert backend.get("linksx") == "linksx"
+    assert backend.get("settings") == "settings"
+    assert backend.stats()["entries"] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_or_load_runs_one_loader_for_concurrent_misses():
+    """Concurrent misses for one key should share a single load."""
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": calls}
+
+    results = await asyncio.gather(*(cache.get_or_load("demo:key", loader, ttl=60) for _ in range(10)))
+
+    assert calls == 1
+    assert all(result == {"value": 1} for result in results)
+    assert cache.get("demo:key") == {"value": 1}
+
+
+@pytest.mark.asyncio
+async def test_stale_value_is_served_while_refreshing(monkeypatch):
+    """After TTL expiry, callers get the previous value while one caller refreshes it."""
+    clock = _fake_clock(monkeypatch)
+    monkeypatch.setattr(get_settings(), "cache_stale_grace_seconds", 30)
+    await cache.get_or_load("demo:stale", _constant("v1"), ttl=5)
+    clock[0] += 10
+
+    release = asyncio.Event()
+
+    async def slow_refresh():
+        await release.wait()
+        return "v2"
+
+    leader = asyncio.create_task(cache.get_or_load("demo:stale", slow_refresh, ttl=5))
+    await asyncio.sleep(0)
+    assert await cache.get_or_load("demo:stale", _constant("unused"), ttl=5) == "v1"
+
+    release.set()
+    assert await leader == "v2"
+    assert cache.get("demo:stale") == "v2"
+
+
+@pytest.mark.asyncio
+async def test_invalidation_beats_stale_copy_and_in_flight_load():
+    """A delete during a load keeps the loaded value out of the cache and drops the stale copy."""
+    await cache.get_or_load("demo:inv", _constant("old"), ttl=60)
+    release = asyncio.Event()
+
+    async def slow_load():
+        await release.wait()
+        return "loaded-before-write"
+
+    cache.delete("demo:inv")
+    leader = asyncio.create_task(cache.get_or_load("demo:inv", slow_load, ttl=60))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_load("demo:inv", _constant("unused"), ttl=60))
+    await asyncio.sleep(0)
+    cache.delete("demo:inv")
+    release.set()
+
+    assert await leader == "loaded-before-write"
+    assert await follower == "loaded-before-write"
+    assert cache.get("demo:inv") is None
+
+
+@pytest.mark.asyncio
+async def test_proxy_bookkeeping_is_bounded_to_loaded_keys(monkeypatch):
+    """Plain sets keep no extra references; stale copies end with eviction or the grace window."""
+    clock = _fake_clock(monkeypatch)
+    monkeypatch.setattr(get_settings(), "cache_stale_grace_seconds", 30)
+    cache_module.set_cache_backend(InMemoryCacheBackend(max_entries=2))
+    for index in range(10):
+        cache.set(f"plain:{index}", index)
+    await cache.get_or_load("demo:a", _constant("a"), ttl=5)
+
+    assert list(cache._stale) == ["demo:a"]
+    assert cache._generations == {}
+
+    cache.set("plain:x", 1)
+    cache.set("plain:y", 2)
+    release = asyncio.Event()
+
+    async def slow_reload():
+        await release.wait()
+        return "reloaded"
+
+    # Evicted within its TTL: followers wait for the reload instead of getting the dropped copy.
+    leader = asyncio.create_task(cache.get_or_load("demo:a", slow_reload, ttl=5))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(cache.get_or_load("demo:a", _constant("unused"), ttl=5))
+    await asyncio.sleep(0)
+    release.set()
+    assert (await leader, await follower) == ("reloaded", "reloaded")
+
+    await cache.get_or_load("demo:b", _constant("b"), ttl=5)
+    clock[0] += 40
+    await cache.get_or_load("demo:c", _constant("c"), ttl=5)
+    assert list(cache._stale) == ["demo:c"]
+
+
+def _constant(value):
+    async def loader():
+        return value
+
+    return loader
@@ -136,3 +136,59 @@ async def test_health_check(client):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+
+
+@pytest.mark.asyncio
+async def test_search_links_matches_prefix_and_cjk_titles(client, auth_headers):
+    """Search should match word prefixes, hostnames, and Chinese bigrams."""
+    for category, title, url in (
+        ("开发", "GitHub 代码托管", "https://github.com/explore"),
+        ("开发", "Python Docs", "https://docs.python.org"),
+        ("Private", "Secret Git Server", "https://git.internal.example.com"),
+    ):
+        response = await client.post(
+            f"/api/v1/links?category_name={category}",
+            json={"title": title, "url": url},
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+    update_response = await client.put(
+        "/api/v1/categories/Private",
+        json={"name": "Private", "auth_required": True},
+        headers=auth_headers,
+    )
+    assert update_response.status_code == 200
+
+    prefix = await client.get("/api/v1/links/search", params={"q": "git"}, headers=auth_headers)
+    cjk = await client.get("/api/v1/links/search", params={"q": "托管"})
+    hostname = await client.get("/api/v1/links/search", params={"q": "python.org"})
+    anonymous = await client.get("/api/v1/links/search", params={"q": "git"})
+
+    assert [link["title"] for link in prefix.json()["links"]] == ["Secret Git Server", "GitHub 代码托管"]
+    assert [link["title"] for link in cjk.json()["links"]] == ["GitHub 代码托管"]
+    assert [link["title"] for link in hostname.json()["links"]] == ["Python Docs"]
+    assert [link["title"] for link in anonymous.json()["links"]] == ["GitHub 代码托管"]
+
+
+@pytest.mark.asyncio
+async def test_search_links_follows_writes(client, auth_headers):
+    """The search index should reflect updates and deletes immediately."""
+    created = await client.post(
+        "/api/v1/links?category_name=Tools",
+        json={"title": "Old Name", "url": "https://tool.example.com"},
+        headers=auth_headers,
+    )
+    link_id = created.json()["link"]["id"]
+    assert (await client.get("/api/v1/links/search", params={"q": "old"})).json()["links"]
+
+    await client.put(
+        f"/api/v1/links/{link_id}",
+        json={"title": "New Name", "url": "https://tool.example.com"},
+        headers=auth_headers,
+    )
+    assert (await client.get("/api/v1/links/search", params={"q": "old"})).json()["links"] == []
+    renamed = await client.get("/api/v1/links/search", params={"q": "new"})
+    assert [link["id"] for link in renamed.json()["links"]] == [link_id]
+
+    await client.delete(f"/api/v1/links/{link_id}", headers=auth_headers)
+    assert (await client.get("/api/v1/links/search", params={"q": "new"})).json()["links"] == []
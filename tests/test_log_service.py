@@ -6,8 +6,11 @@ from datetime import datetime, timedelta
 import pytest
 from sqlalchemy import select
 
-from app.models import UpdateLog, VisitLog
+from app.config import get_settings
+from app.models import LogCounter, UpdateLog, UserAgent, VisitLog
 from app.services.log import LogService, run_log_cleanup_job
+from app.services.log_archive import LogArchive
+from app.services.user_agents import UserAgentCache, get_user_agent_cache
 
 
 @pytest.mark.asyncio
@@ -72,8 +75,9 @@ async def test_cleanup_old_updates_keeps_newest_rows(test_db):
 
 
 @pytest.mark.asyncio
-async def test_run_log_cleanup_job_reports_deleted_and_remaining_counts(test_db):
-    """Cleanup job should return both deleted and remaining totals."""
+async def test_run_log_cleanup_job_reports_deleted_and_remaining_counts(test_db, tmp_path, monkeypatch):
+    """Cleanup job should return both deleted and remaining totals and archive what it drops."""
+    monkeypatch.setattr(get_settings(), "log_archive_dir", tmp_path / "log_archive")
     now = datetime.utcnow()
     test_db.add_all(
         [
@@ -97,3 +101,174 @@ async def test_run_log_cleanup_job_reports_deleted_and_remaining_counts(test_db)
         "remaining_visits": 1,
         "remaining_updates": 1,
     }
+    archive = LogArchive(tmp_path / "log_archive")
+    assert [record["path"] for record in archive.iter_records("visit_logs")] == ["/old"]
+    assert [record["target_name"] for record in archive.iter_records("update_logs")] == ["old"]
+
+
+@pytest.mark.asyncio
+async def test_get_visits_pages_by_cursor_with_filters(test_db):
+    """Visit pages should follow the keyset cursor and honour filters."""
+    now = datetime.utcnow()
+    test_db.add_all(
+        [
+            VisitLog(ip="10.0.0.1", path="/articles/a", created_at=now - timedelta(minutes=4)),
+            VisitLog(ip="10.0.0.2", path="/articles/b", created_at=now - timedelta(minutes=3)),
+            VisitLog(ip="10.0.0.1", path="/", created_at=now - timedelta(minutes=2)),
+            VisitLog(ip="10.0.0.1", path="/articles/c", created_at=now - timedelta(minutes=2)),
+            VisitLog(ip="10.0.0.3", path="/articles/d", created_at=now),
+        ]
+    )
+    await test_db.commit()
+    service = LogService(test_db)
+
+    pages = []
+    cursor = None
+    while True:
+        page = await service.get_visits(limit=2, cursor=cursor)
+        pages.append([visit["path"] for visit in page["visits"]])
+        assert page["total"] == 5
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == [["/articles/d", "/articles/c"], ["/", "/articles/b"], ["/articles/a"]]
+
+    filtered = await service.get_visits(path="/articles/", ip="10.0.0.1")
+    assert [visit["path"] for visit in filtered["visits"]] == ["/articles/c", "/articles/a"]
+
+    ranged = await service.get_visits(since=now - timedelta(minutes=3), until=now)
+    assert [visit["path"] for visit in ranged["visits"]] == ["/articles/c", "/", "/articles/b"]
+
+    with pytest.raises(ValueError):
+        await service.get_visits(cursor="not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_log_totals_come_from_trigger_maintained_counters(test_db):
+    """Inserts and deletes should keep log_counters in step with the tables."""
+    service = LogService(test_db)
+    for index in range(3):
+        await service.record_visit("127.0.0.1", f"/{index}", "pytest")
+    await service.record_update("add", "link", "Example")
+    await test_db.commit()
+
+    counters = dict((await test_db.execute(select(LogCounter.name, LogCounter.value))).all())
+    assert counters == {"visit_logs": 3, "update_logs": 1}
+    assert (await service.get_visits())["total"] == 3
+
+    await service.cleanup_old_visits(max_records=1)
+    await service.clear_updates()
+    await test_db.commit()
+
+    assert (await service.get_visits())["total"] == 1
+    assert (await service.get_updates())["total"] == 0
+
+
+@pytest.mark.asyncio
+async def test_retention_deletes_in_batches_and_reports_progress(test_db):
+    """Count-based retention should delete id ranges in bounded batches."""
+    now = datetime.utcnow()
+    test_db.add_all(
+        [VisitLog(ip=str(index), path=f"/{index}", created_at=now - timedelta(minutes=10 - index)) for index in range(7)]
+    )
+    await test_db.commit()
+    service = LogService(test_db)
+    commits = []
+    progress = []
+
+    async def between_batches():
+        commits.append(True)
+        await test_db.commit()
+
+    deleted = await service.cleanup_old_visits(
+        max_records=2,
+        max_age_days=0,
+        batch_size=2,
+        between_batches=between_batches,
+        progress=lambda table, done, total: progress.append((table, done, total)),
+    )
+    await test_db.commit()
+
+    assert deleted == 5
+    assert progress == [("visit_logs", 2, 5), ("visit_logs", 4, 5), ("visit_logs", 5, 5)]
+    assert len(commits) == 2
+    remaining = (await test_db.execute(select(VisitLog.path).order_by(VisitLog.id))).scalars().all()
+    assert remaining == ["/5", "/6"]
+
+
+@pytest.mark.asyncio
+async def test_age_based_retention_and_compaction(test_db):
+    """Age limits should apply on top of count limits, then compaction can run."""
+    now = datetime.utcnow()
+    test_db.add_all(
+        [
+            UpdateLog(action="add", target_type="link", target_name="ancient", created_at=now - timedelta(days=40)),
+            UpdateLog(action="add", target_type="link", target_name="old", created_at=now - timedelta(days=31)),
+            UpdateLog(action="add", target_type="link", target_name="recent", created_at=now - timedelta(days=1)),
+        ]
+    )
+    await test_db.commit()
+    service = LogService(test_db)
+
+    deleted = await service.cleanup_old_updates(max_records=100, max_age_days=30)
+    await test_db.commit()
+
+    assert deleted == 2
+    remaining = (await test_db.execute(select(UpdateLog.target_name))).scalars().all()
+    assert remaining == ["recent"]
+    assert await service.compact(min_free_ratio=0) is True
+
+
+@pytest.mark.asyncio
+async def test_retention_archives_rows_into_daily_segments(test_db, tmp_path):
+    """Dropped rows should land in per-day segments that read back lazily by range."""
+    first_day = datetime(2026, 9, 1, 23, 30)
+    test_db.add_all(
+        [VisitLog(ip=str(index), path=f"/{index}", created_at=first_day + timedelta(hours=index)) for index in range(5)]
+    )
+    await test_db.commit()
+    archive = LogArchive(tmp_path)
+
+    deleted = await LogService(test_db, archive).cleanup_old_visits(max_records=1, max_age_days=0, batch_size=2)
+    await test_db.commit()
+
+    assert deleted == 4
+    assert [path.name for path in archive.list_segments("visit_logs")] == [
+        "2026-09-01.ndjson.gz",
+        "2026-09-02.ndjson.gz",
+    ]
+    assert [record["path"] for record in archive.iter_records("visit_logs")] == ["/0", "/1", "/2", "/3"]
+    window = archive.iter_records("visit_logs", since=first_day + timedelta(hours=1), until=first_day + timedelta(hours=3))
+    assert [record["path"] for record in window] == ["/1", "/2"]
+
+
+@pytest.mark.asyncio
+async def test_visit_user_agents_are_stored_once_and_joined_back(test_db):
+    """Repeated user agents should share one dimension row and read back as strings."""
+    service = LogService(test_db)
+    for index, user_agent in enumerate(["Mozilla/5.0 A", "Mozilla/5.0 B", "Mozilla/5.0 A", ""]):
+        await service.record_visit(f"10.0.0.{index}", "/", user_agent)
+        await test_db.commit()
+
+    assert len((await test_db.execute(select(UserAgent))).scalars().all()) == 2
+    visit_ids = (await test_db.execute(select(VisitLog.user_agent_id).order_by(VisitLog.id))).scalars().all()
+    assert visit_ids[0] == visit_ids[2]
+    assert visit_ids[3] is None
+    assert get_user_agent_cache().get("Mozilla/5.0 A") == visit_ids[0]
+
+    visits = (await service.get_visits())["visits"]
+    assert [visit["user_agent"] for visit in visits] == ["", "Mozilla/5.0 A", "Mozilla/5.0 B", "Mozilla/5.0 A"]
+
+
+def test_user_agent_cache_evicts_least_recently_used():
+    """The user-agent LRU should stay within its entry limit."""
+    cache = UserAgentCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert len(cache) == 2
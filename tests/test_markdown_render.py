@@ -0,0 +1,202 @@
+"""Markdown rendering pipeline tests."""
+
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bleach
+import markdown
+import pytest
+
+from app.services.highlight_cache import HighlightCache, set_highlight_cache
+from app.services.markdown_render import (
+    ALLOWED_ATTRIBUTES,
+    ALLOWED_TAGS,
+    MARKDOWN_EXTENSION_CONFIGS,
+    MARKDOWN_EXTENSIONS,
+    render_document,
+    render_markdown,
+)
+from benchmarks.dataset import build_article
+
+SAMPLES = [
+    "",
+    "# Title\n\n## Same\n\n## Same\n\nline one\nline two",
+    "<script>alert(1)</script>\n\n**bold** <span onclick='x'>span</span> <iframe src='x'></iframe>",
+    "[link](javascript:alert(1)) ![img](https://x.test/a.png \"t\")",
+    "| a | b |\n| --- | --- |\n| 1 | <b>2</b> |",
+    "```python\nprint('<tag>')\n```\n\n    indented code\n\n1. one\n2. two\n\n* a\n* b",
+    "> quote with `code` & entities &amp; <br> raw",
+    "Setext\n======\n\n[ref]: https://x.test\n\nUse [ref] and [missing].",
+    "```{.python .extra #id hl_lines=\"1\"}\nx = 1\n```\n\n~~~ {.text use_pygments=false}\n<plain>\n~~~\n\n"
+    "```js hl_lines=\"1\"\nvar a;\n```\n\n```\nno lang\n```",
+]
+
+
+def _reference(content: str) -> str:
+    """The original one-shot pipeline the renderer must reproduce."""
+    html = markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS, extension_configs=MARKDOWN_EXTENSION_CONFIGS)
+    return bleach.clean(html, tags=list(ALLOWED_TAGS), attributes=ALLOWED_ATTRIBUTES, strip=True)
+
+
+@pytest.mark.parametrize("content", SAMPLES + [build_article(random.Random(seed), seed) for seed in range(3)])
+def test_render_matches_one_shot_pipeline(content):
+    assert render_markdown(content) == _reference(content)
+
+
+def test_heading_ids_are_prefixed_and_author_ids_are_dropped():
+    """Headings may only carry generated ``toc-`` ids, never ones that could shadow page elements."""
+    html, toc = render_document(
+        '# Home search input\n\n## Same\n\n## Same\n\n<h2 id="home-search-input">raw</h2>\n\n'
+        '<h3 id="toc-kept">raw</h3>\n\n<h3 class="x" id="toc bad">raw</h3>'
+    )
+
+    assert [entry["id"] for entry in toc] == ["toc-home-search-input"]
+    assert [entry["id"] for entry in toc[0]["children"]] == ["toc-same", "toc-same_1"]
+    assert 'id="home-search-input"' not in html
+    assert "<h2>raw</h2>" in html
+    assert '<h3 id="toc-kept">raw</h3>' in html
+    assert "<h3>raw</h3>" in html
+
+
+def test_reused_renderer_does_not_leak_state_between_documents():
+    """Reference links defined in one document must not resolve in the next."""
+    first = render_markdown("## Intro\n\n[ref]: https://x.test\n\n[ref]")
+    second = render_markdown("## Intro\n\n[ref]")
+
+    assert 'href="https://x.test"' in first
+    assert "https://x.test" not in second
+    assert second == _reference("## Intro\n\n[ref]")
+
+
+def test_renderers_are_per_thread():
+    documents = [build_article(random.Random(seed), seed, sections=2) for seed in range(8)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        rendered = list(executor.map(render_markdown, documents * 3))
+    assert rendered == [_reference(document) for document in documents * 3]
+
+
+CODE_NOTE = "# Note\n\n{intro}\n\n```python\ndef f(x):\n    return x * 2\n```\n\n```sql\nSELECT 1;\n```\n"
+
+
+def test_highlight_cache_skips_unchanged_code_blocks():
+    """Editing prose re-renders the page but not its code blocks; output is unchanged."""
+    set_highlight_cache(None)
+    expected = render_markdown(CODE_NOTE.format(intro="edited"))
+    cache = HighlightCache()
+    set_highlight_cache(cache)
+
+    render_markdown(CODE_NOTE.format(intro="first"))
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert render_markdown(CODE_NOTE.format(intro="edited")) == expected
+    assert (cache.hits, cache.misses) == (2, 2)
+
+    render_markdown("```python\ndef f(x):\n    return x * 2\n```\n\n```text\ndef f(x):\n    return x * 2\n```")
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_highlight_cache_persists_and_respects_size_bound(tmp_path):
+    path = tmp_path / "highlight.sqlite3"
+    cache = HighlightCache(path=path)
+    set_highlight_cache(cache)
+    html = render_markdown(CODE_NOTE.format(intro="x"))
+    cache.close()
+
+    restarted = HighlightCache(path=path)
+    set_highlight_cache(restarted)
+    assert render_markdown(CODE_NOTE.format(intro="x")) == html
+    assert (restarted.hits, restarted.misses) == (2, 0)
+    restarted.close()
+
+    bounded = HighlightCache(path=path, max_bytes=250)
+    assert 0 < bounded.stored_bytes() <= 250
+    for index in range(64):
+        bounded.set(f"k{index}", "x" * 100)
+    assert bounded.stored_bytes() <= 250
+    bounded._memory.clear()
+    assert bounded.get("k63") == "x" * 100
+    assert bounded.get("k0") is None
+    bounded.close()
+
+
+def test_highlight_cache_falls_back_to_memory_on_sqlite_errors(tmp_path):
+    """A broken cache file must turn into cache misses, never into a failed render."""
+    corrupt = tmp_path / "corrupt.sqlite3"
+    corrupt.write_bytes(b"not a database" * 100)
+    cache = HighlightCache(path=corrupt)
+    set_highlight_cache(cache)
+    assert render_markdown(CODE_NOTE.format(intro="x")) == render_markdown(CODE_NOTE.format(intro="x"))
+    assert cache.stored_bytes() == 0
+
+    path = tmp_path / "highlight.sqlite3"
+    cache = HighlightCache(path=path)
+    set_highlight_cache(cache)
+    cache.set("key", "<pre>cached</pre>")
+    cache._memory.clear()
+    cache._connection().execute("DROP TABLE highlights")
+    assert cache.get("key") is None
+    assert cache._connection() is None
+    cache.set("key", "<pre>cached</pre>")
+    assert cache.get("key") == "<pre>cached</pre>"
+
+
+def test_highlight_cache_batches_last_used_updates(tmp_path):
+    """Hits served from the file record their use in batches, not one write per read."""
+    path = tmp_path / "highlight.sqlite3"
+    cache = HighlightCache(path=path)
+    cache.set("key", "<pre>cached</pre>")
+    written = cache._connection().execute("SELECT last_used FROM highlights").fetchone()[0]
+    cache._memory.clear()
+
+    assert cache.get("key") == "<pre>cached</pre>"
+    assert cache._connection().execute("SELECT last_used FROM highlights").fetchone()[0] == written
+    assert "key" in cache._touched
+    cache.close()
+
+    reopened = sqlite3.connect(str(path))
+    assert reopened.execute("SELECT last_used FROM highlights").fetchone()[0] > written
+    reopened.close()
+
+
+def test_highlight_cache_file_io_does_not_hold_the_memory_lock(tmp_path):
+    """A render waiting on a locked cache file must not block memory hits on other threads."""
+    path = tmp_path / "highlight.sqlite3"
+    cache = HighlightCache(path=path)
+    cache.set("warm", "<pre>warm</pre>")
+    blocker = sqlite3.connect(str(path), isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    writer = threading.Thread(target=cache.set, args=("cold", "<pre>cold</pre>"))
+    try:
+        writer.start()
+        time.sleep(0.05)
+        started = time.monotonic()
+        assert cache.get("warm") == "<pre>warm</pre>"
+        assert time.monotonic() - started < 0.1
+        writer.join()
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+
+    # A busy file skips the write but stays in use.
+    assert cache._connection() is not None
+    assert cache.get("cold") == "<pre>cold</pre>"
+    cache.close()
+
+
+def test_highlight_cache_is_scoped_to_the_app_renderer():
+    """Other Markdown instances in the process keep the stock highlighter."""
+    from markdown.extensions import codehilite, fenced_code
+
+    cache = HighlightCache()
+    set_highlight_cache(cache)
+    indented = "Intro\n\n    :::python\n    x = 1\n"
+
+    markdown.markdown(CODE_NOTE.format(intro="x") + indented, extensions=MARKDOWN_EXTENSIONS)
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert fenced_code.CodeHilite is codehilite.CodeHilite
+
+    render_markdown(indented)
+    render_markdown(indented)
+    assert (cache.hits, cache.misses) == (1, 1)
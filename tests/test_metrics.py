@@ -0,0 +1,83 @@
+"""Metrics registry and /metrics endpoint tests."""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import Settings, get_settings
+from app.utils.metrics import DB_QUERY_DURATION, MetricsRegistry, instrument_engine
+
+
+def test_registry_renders_prometheus_text():
+    """Counters, gauges and cumulative histogram buckets should use the text format."""
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Demo requests.", ("route",))
+    registry.gauge("demo_depth", "Demo depth.", callback=lambda: {(): 3})
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("route",), buckets=(0.1, 1.0))
+
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+
+    lines = registry.render().splitlines()
+    assert "# TYPE demo_requests_total counter" in lines
+    assert 'demo_requests_total{route="/a\\"b"} 3' in lines
+    assert "demo_depth 3" in lines
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'demo_seconds_count{route="/a"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_engine_instrumentation_times_statements():
+    """Engine listeners should record statement timings by operation."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+    before = DB_QUERY_DURATION.count(operation="SELECT")
+
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    await engine.dispose()
+
+    assert DB_QUERY_DURATION.count(operation="SELECT") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_route_templates_and_cache(client):
+    """Requests should be labelled by route template and show up on /metrics."""
+    await client.get("/api/v1/links")
+    await client.get("/api/v1/links")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/links",status="200"}' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/links"}' in body
+    assert 'cache_requests_total{prefix="links",result="hit"}' in body
+    assert 'threadpool_workers{state="waiting"}' in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_honours_token(client, monkeypatch):
+    """A configured METRICS_TOKEN should be required as a bearer token."""
+    monkeypatch.setattr(get_settings(), "metrics_token", "scrape-secret")
+
+    assert (await client.get("/metrics")).status_code == 401
+    non_ascii = await client.get("/metrics", headers={"Authorization": "Bearer caf\u00e9".encode("latin-1")})
+    assert non_ascii.status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_is_off_by_default(client, monkeypatch):
+    """Without ENABLE_METRICS the endpoint should not exist."""
+    monkeypatch.delenv("ENABLE_METRICS")
+    monkeypatch.setattr(get_settings(), "enable_metrics", Settings.from_env().enable_metrics)
+
+    assert (await client.get("/metrics")).status_code == 404
@@ -56,16 +56,22 @@ def test_alembic_upgrade_head_creates_core_schema_on_empty_db(tmp_path):
         }
         assert {
             "alembic_version",
+            "article_index",
+            "article_search",
             "categories",
             "links",
+            "log_counters",
             "site_settings",
             "token_blacklist",
             "update_logs",
+            "user_agents",
             "visit_logs",
+            "visit_rollups",
+            "visit_rollup_state",
         }.issubset(table_names)
         assert "settings" not in table_names
         version = conn.execute("SELECT version_num FROM alembic_version").fetchone()
-        assert version == ("20260324_03",)
+        assert version == ("20261019_04",)
         site_settings_columns = {
             row[1]
             for row in conn.execute("PRAGMA table_info(site_settings)").fetchall()
@@ -150,3 +156,32 @@ def test_alembic_upgrade_head_rejects_ambiguous_dual_settings_sources(tmp_path):
 
     assert result.returncode != 0
     assert "Refusing automatic migration" in combined_output
+
+
+def _sqlite_objects(conn: sqlite3.Connection) -> dict[str, str]:
+    return dict(
+        conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' OR name = 'article_search'"
+        ).fetchall()
+    )
+
+
+def test_migrated_triggers_and_search_table_match_the_models(tmp_path):
+    """Migrations carry their own DDL; the models are the source they must agree with."""
+    from sqlalchemy import create_engine
+
+    import app.models  # noqa: F401
+    from app.database import Base
+
+    model_path = tmp_path / "models.db"
+    engine = create_engine(f"sqlite:///{model_path.resolve().as_posix()}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    migrated_path = tmp_path / "migrated.db"
+    result = _run_alembic(migrated_path, "upgrade", "head")
+    assert result.returncode == 0, f"{result.stdout}\n{result.stderr}"
+
+    with _connect(model_path) as models, _connect(migrated_path) as migrated:
+        expected = _sqlite_objects(models)
+        assert {"article_search", "visit_logs_count_ai", "update_logs_count_ad"} <= expected.keys()
+        assert _sqlite_objects(migrated) == expected
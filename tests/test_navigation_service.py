@@ -0,0 +1,92 @@
+"""Navigation domain service cache tests."""
+
+import pytest
+
+from app.application.unit_of_work import SqlAlchemyUnitOfWork
+from app.domain.navigation_snapshot import NavigationSnapshot, SnapshotMismatchError
+from app.utils.cache import CACHE_LINKS_ALL, cache
+
+
+def _count_rebuilds(monkeypatch, uow):
+    calls = {"count": 0}
+    original = uow.navigation.repository.list_categories
+
+    async def counting_list_categories(*args, **kwargs):
+        calls["count"] += 1
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(uow.navigation.repository, "list_categories", counting_list_categories)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_mutations_patch_cached_snapshot_without_rebuild(test_db, monkeypatch):
+    """Committed writes should update the cached snapshot in place."""
+    uow = SqlAlchemyUnitOfWork(test_db)
+    await uow.navigation.add_link("Dev", "Alpha", "https://alpha.example.com")
+    await uow.navigation.create_category("Private", auth_required=True)
+    await uow.commit()
+
+    assert (await uow.navigation.get_all_categories())["categories"][0]["name"] == "Dev"
+    version = cache.get(CACHE_LINKS_ALL).version
+    calls = _count_rebuilds(monkeypatch, uow)
+
+    alpha_id = (await uow.navigation.get_all_categories())["categories"][0]["links"][0]["id"]
+    beta = await uow.navigation.add_link("Dev", "Beta", "https://beta.example.com")
+    await uow.navigation.add_link("Private", "Secret", "https://secret.example.com")
+    await uow.commit()
+    await uow.navigation.batch_reorder_links([beta["id"], alpha_id])
+    await uow.commit()
+
+    full = await uow.navigation.get_all_categories(include_auth_required=True)
+    public = await uow.navigation.get_all_categories(include_auth_required=False)
+
+    assert calls["count"] == 0
+    assert cache.get(CACHE_LINKS_ALL).version > version
+    assert [link["title"] for link in full["categories"][0]["links"]] == ["Beta", "Alpha"]
+    assert [category["name"] for category in full["categories"]] == ["Dev", "Private"]
+    assert [category["name"] for category in public["categories"]] == ["Dev"]
+
+
+@pytest.mark.asyncio
+async def test_rollback_discards_pending_snapshot_patches(test_db):
+    """Rolled back writes must not leak into the cached snapshot."""
+    uow = SqlAlchemyUnitOfWork(test_db)
+    await uow.navigation.create_category("Dev")
+    await uow.commit()
+    await uow.navigation.get_all_categories()
+
+    await uow.navigation.create_category("Temp")
+    await uow.rollback()
+
+    payload = await uow.navigation.get_all_categories()
+    assert [category["name"] for category in payload["categories"]] == ["Dev"]
+
+
+@pytest.mark.asyncio
+async def test_inconsistent_snapshot_falls_back_to_rebuild(test_db):
+    """A patch that does not match the cached snapshot should drop it."""
+    uow = SqlAlchemyUnitOfWork(test_db)
+    await uow.navigation.create_category("Dev")
+    await uow.commit()
+    await uow.navigation.get_all_categories()
+    cached = cache.get(CACHE_LINKS_ALL)
+    cache.set(CACHE_LINKS_ALL, NavigationSnapshot(version=cached.version, categories=()))
+
+    await uow.navigation.add_link("Dev", "Alpha", "https://alpha.example.com")
+    await uow.commit()
+
+    assert cache.get(CACHE_LINKS_ALL) is None
+    payload = await uow.navigation.get_all_categories()
+    assert [link["title"] for link in payload["categories"][0]["links"]] == ["Alpha"]
+
+
+def test_snapshot_patch_rejects_unknown_link():
+    """Snapshot patches should raise on links the snapshot does not know about."""
+    snapshot = NavigationSnapshot(
+        version=1,
+        categories=({"name": "Dev", "auth_required": False, "links": []},),
+    )
+
+    with pytest.raises(SnapshotMismatchError):
+        snapshot.with_link_deleted("missing")
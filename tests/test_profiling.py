@@ -0,0 +1,77 @@
+"""Request profiler and profile endpoint tests."""
+
+import json
+import sys
+
+import pytest
+
+from app.config import get_settings
+from app.utils.profiling import ProfileStore, StackSampler
+
+
+def _busy_leaf(sampler):
+    sampler.sample_frame(sys._getframe(), "MainThread")
+
+
+def test_sampler_emits_collapsed_and_speedscope():
+    """Sampled stacks should fold into collapsed lines and a speedscope sampled profile."""
+    sampler = StackSampler(interval=0.01)
+    _busy_leaf(sampler)
+    _busy_leaf(sampler)
+    sampler.duration = 0.02
+
+    collapsed = sampler.collapsed().splitlines()
+    assert len(collapsed) == 1
+    assert collapsed[0].startswith("thread:MainThread;")
+    assert "_busy_leaf (tests/test_profiling.py:" in collapsed[0]
+    assert collapsed[0].endswith(" 2")
+
+    document = sampler.speedscope("GET /")
+    profile = document["profiles"][0]
+    assert profile["type"] == "sampled"
+    assert len(profile["samples"]) == 2
+    assert profile["weights"] == [0.01, 0.01]
+    leaf = document["shared"]["frames"][profile["samples"][0][-1]]
+    assert leaf["name"] == "_busy_leaf"
+
+
+def test_store_prunes_and_rejects_unsafe_names(tmp_path):
+    """Only the newest profiles are kept and downloads are confined to the store."""
+    store = ProfileStore(tmp_path, max_profiles=2)
+    ids = []
+    for index in range(3):
+        sampler = StackSampler()
+        _busy_leaf(sampler)
+        ids.append(store.save(sampler, "GET", f"/page/{index}"))
+
+    listed = store.list_profiles()
+    assert len(listed) == 2
+    assert all(len(entry["files"]) == 2 for entry in listed)
+    assert store.resolve(f"{listed[0]['id']}.speedscope.json") is not None
+    assert store.resolve("../secret.speedscope.json") is None
+    assert store.resolve("notes.txt") is None
+
+
+@pytest.mark.asyncio
+async def test_admin_header_captures_downloadable_profile(client, auth_headers, tmp_path, monkeypatch):
+    """X-Profile with a valid token should store a profile listed and served by the API."""
+    settings = get_settings()
+    monkeypatch.setattr(settings, "enable_profiling", True)
+    monkeypatch.setattr(settings, "profiles_dir", tmp_path)
+
+    anonymous = await client.get("/api/v1/links", headers={"X-Profile": "1"})
+    assert "x-profile-id" not in anonymous.headers
+
+    response = await client.get("/api/v1/links", headers={**auth_headers, "X-Profile": "1"})
+    profile_id = response.headers["x-profile-id"]
+
+    assert (await client.get("/api/v1/profiles")).status_code == 401
+    listing = await client.get("/api/v1/profiles", headers=auth_headers)
+    assert listing.json()["total"] == 1
+    assert listing.json()["profiles"][0]["id"] == profile_id
+
+    download = await client.get(f"/api/v1/profiles/{profile_id}.speedscope.json", headers=auth_headers)
+    assert download.status_code == 200
+    assert json.loads(download.content)["profiles"][0]["name"].startswith("GET /api/v1/links")
+    missing = await client.get("/api/v1/profiles/missing.collapsed.txt", headers=auth_headers)
+    assert missing.status_code == 404
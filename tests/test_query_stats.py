@@ -0,0 +1,70 @@
+"""Per-request SQL statement accounting tests."""
+
+import logging
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import get_settings
+from app.utils.metrics import DB_STATEMENTS_PER_REQUEST, instrument_engine
+from app.utils.query_stats import statement_shape, track_queries
+
+
+def test_statement_shape_collapses_placeholder_lists():
+    """Expanded IN lists and whitespace should not split one shape into many."""
+    assert statement_shape("SELECT * FROM links\n WHERE id IN (?, ?, ?)") == statement_shape(
+        "SELECT * FROM links WHERE id IN (?)"
+    )
+    assert statement_shape("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?...)"
+
+
+@pytest.mark.asyncio
+async def test_track_queries_flags_repeated_shapes_and_slow_queries(monkeypatch, caplog):
+    """Statements run through an instrumented engine are counted inside the tracking block."""
+    monkeypatch.setattr(get_settings(), "slow_query_ms", 0.000001)
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    instrument_engine(engine)
+
+    with caplog.at_level(logging.WARNING, logger="app.utils.query_stats"):
+        with track_queries() as stats:
+            async with engine.connect() as conn:
+                for value in range(6):
+                    await conn.execute(text("SELECT :value"), {"value": value})
+                await conn.execute(text("SELECT 1, 2"))
+    await engine.dispose()
+
+    assert stats.statements == 7
+    assert stats.duration > 0
+    assert stats.repeated(5) == [("SELECT ?", 6)]
+    assert stats.repeated(7) == []
+    slow = [record for record in caplog.records if record.getMessage() == "Slow query"]
+    assert slow[0].statement == "SELECT ?"
+    assert slow[0].parameters == "(0,)"
+
+
+@pytest.mark.asyncio
+async def test_debug_headers_report_request_statements(client, test_db, monkeypatch):
+    """QUERY_DEBUG_HEADERS should expose the per-request statement count and DB time."""
+    monkeypatch.setattr(get_settings(), "query_debug_headers", True)
+    instrument_engine(test_db.bind)
+
+    response = await client.get("/api/v1/links")
+
+    assert int(response.headers["x-db-statements"]) > 0
+    assert float(response.headers["x-db-time-ms"]) > 0
+    assert response.headers["x-db-repeated"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_request_statement_accounting_is_off_without_metrics(client, test_db, monkeypatch):
+    """With metrics and debug headers disabled, requests skip statement accounting."""
+    monkeypatch.setattr(get_settings(), "enable_metrics", False)
+    monkeypatch.setattr(get_settings(), "query_debug_headers", False)
+    instrument_engine(test_db.bind)
+    before = DB_STATEMENTS_PER_REQUEST.count(route="/api/v1/links")
+
+    response = await client.get("/api/v1/links")
+
+    assert response.status_code == 200
+    assert DB_STATEMENTS_PER_REQUEST.count(route="/api/v1/links") == before
@@ -0,0 +1,131 @@
+"""Rate limiter tests."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import rate_limit as rate_limit_module
+from app.config import get_settings
+from app.services.rate_limit import InMemoryRateLimiter, KeyedRateLimiter, SqliteRateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(rate_limit_module, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def _limiter(path, **overrides):
+    options = {"max_attempts": 5, "window_seconds": 300, "lockout_seconds": 900, **overrides}
+    return SqliteRateLimiter(path, **options)
+
+
+def test_sqlite_limiter_counts_failures_across_workers_and_restarts(tmp_path, clock):
+    """Failures from every worker share one counter and lockouts survive a restart."""
+    path = tmp_path / "limits.sqlite3"
+    first, second = _limiter(path), _limiter(path)
+    for _ in range(3):
+        first.record_failure("10.0.0.1")
+    second.record_failure("10.0.0.1")
+    assert first.check("10.0.0.1") == (True, 0)
+
+    second.record_failure("10.0.0.1")
+    first.close()
+    second.close()
+
+    restarted = _limiter(path)
+    assert restarted.check("10.0.0.1") == (False, 900)
+    restarted.clear("10.0.0.1")
+    assert restarted.check("10.0.0.1") == (True, 0)
+    restarted.close()
+
+
+def test_sliding_window_weights_previous_window(tmp_path, clock):
+    """Failures from the previous window count in proportion to their overlap."""
+    limiter = _limiter(tmp_path / "limits.sqlite3", max_attempts=5, window_seconds=100)
+
+    def fail(at: float, times: int) -> None:
+        clock[0] = at
+        for _ in range(times):
+            limiter.record_failure("ip")
+
+    fail(1_000_090.0, 4)
+    fail(1_000_160.0, 2)  # 4 * 0.4 + 2 = 3.6
+    assert limiter.check("ip") == (True, 0)
+
+    limiter.clear("ip")
+    fail(1_000_090.0, 4)
+    fail(1_000_110.0, 2)  # 4 * 0.9 + 2 = 5.6
+    assert limiter.check("ip")[0] is False
+    limiter.close()
+
+
+def test_sweep_drops_idle_keys_but_keeps_lockouts(tmp_path, clock):
+    """Idle counters are swept; keys still locked out are kept."""
+    limiter = _limiter(tmp_path / "limits.sqlite3", max_attempts=2, window_seconds=60, lockout_seconds=3600)
+    limiter.record_failure("idle")
+    limiter.record_failure("locked")
+    limiter.record_failure("locked")
+
+    clock[0] += 600
+    assert limiter.sweep() == 1
+    assert limiter.check("locked")[0] is False
+    limiter.close()
+
+
+def test_in_memory_limiter_bounds_keys_and_locks_out(clock):
+    """Unknown keys are not stored by check(), and the key table is LRU-capped."""
+    limiter = InMemoryRateLimiter(max_attempts=3, window_seconds=60, lockout_seconds=900, max_keys=2)
+    assert limiter.check("probe") == (True, 0)
+    assert len(limiter) == 0
+
+    for _ in range(2):
+        limiter.record_failure("10.0.0.1")
+    clock[0] += 61
+    limiter.record_failure("10.0.0.1")
+    assert limiter.check("10.0.0.1") == (True, 0)
+    limiter.record_failure("10.0.0.1")
+    limiter.record_failure("10.0.0.1")
+    assert limiter.check("10.0.0.1") == (False, 900)
+
+    limiter.record_failure("10.0.0.2")
+    limiter.record_failure("10.0.0.3")
+    assert len(limiter) == 2
+    assert limiter.evictions == 1
+    assert limiter.check("10.0.0.1") == (True, 0)
+
+    clock[0] += 61
+    assert limiter.sweep() == 2
+    assert len(limiter) == 0
+
+
+def test_keyed_limiter_allows_bursts_then_paces_requests(clock):
+    limiter = KeyedRateLimiter(rate=60, period=60, burst=3)
+    assert [limiter.hit("a")[0] for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("a") == (False, pytest.approx(1.0))
+    assert limiter.hit("b") == (True, 0.0)
+
+    clock[0] += 1
+    assert limiter.hit("a")[0] is True
+    clock[0] += 10
+    assert limiter.sweep() == 2
+    assert len(limiter) == 0
+
+
+@pytest.mark.asyncio
+async def test_write_endpoints_are_rate_limited_per_client(client, auth_headers):
+    settings = get_settings()
+    original = settings.write_rate_limit_per_minute, settings.write_rate_limit_burst
+    settings.write_rate_limit_per_minute, settings.write_rate_limit_burst = 60, 2
+    try:
+        statuses = []
+        for index in range(3):
+            response = await client.post("/api/v1/categories", json={"name": f"限流 {index}"}, headers=auth_headers)
+            statuses.append(response.status_code)
+        assert statuses[:2] == [200, 200]
+        assert statuses[2] == 429
+        assert response.headers["Retry-After"] == "1"
+        assert (await client.get("/api/v1/links", headers=auth_headers)).status_code != 429
+    finally:
+        settings.write_rate_limit_per_minute, settings.write_rate_limit_burst = original
@@ -0,0 +1,146 @@
+"""Cross-worker shared cache backend tests."""
+
+import sqlite3
+import time
+
+import pytest
+
+from app.domain.navigation_snapshot import NavigationSnapshot
+from app.utils.shared_cache import SharedCacheBackend
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """Two backends on one file stand in for two uvicorn worker processes."""
+    path = tmp_path / "cache" / "shared.sqlite3"
+    first, second = SharedCacheBackend(path), SharedCacheBackend(path)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_values_written_by_one_worker_are_read_by_another(workers):
+    """A set in one worker is visible to the other, including pickled snapshots."""
+    first, second = workers
+    snapshot = NavigationSnapshot(version=7, categories=({"name": "Dev", "auth_required": False, "links": []},))
+
+    first.set("links:all", snapshot, ttl=60)
+
+    assert second.get("links:all") == snapshot
+    assert second.stats()["shared_reads"] == 1
+    assert second.get("links:all") == snapshot
+    assert second.stats()["shared_reads"] == 1
+
+
+def test_writes_and_invalidations_are_broadcast_to_local_copies(workers):
+    """Another worker's local LRU must not keep serving a value after a write elsewhere."""
+    first, second = workers
+    first.set("links:version", 1)
+    first.set("links:all", "old")
+    first.set("settings", {"site_title": "A"})
+    assert second.get("links:version") == 1
+    assert second.get("links:all") == "old"
+    assert second.get("settings") == {"site_title": "A"}
+
+    first.set("links:version", 2)
+    assert second.get("links:version") == 2
+
+    first.invalidate_pattern("links:")
+    assert second.get("links:all") is None
+    assert second.get("settings") == {"site_title": "A"}
+
+    second.delete("settings")
+    assert first.get("settings") is None
+
+    first.set("settings", {"site_title": "B"})
+    second.clear()
+    assert first.get("settings") is None
+
+
+def test_expired_shared_entries_are_not_served(workers):
+    """Entries past their TTL stay invisible to workers that never cached them locally."""
+    first, second = workers
+    first.set("short", "value", ttl=-1)
+
+    assert second.get("short") is None
+
+
+def test_incr_and_set_if_do_not_lose_interleaved_writes(workers):
+    """Version bumps from two workers stay distinct and a compare-and-set on a replaced value fails."""
+    first, second = workers
+    assert first.incr("links:version", 100) == 101
+    assert second.get("links:version") == 101
+    assert second.incr("links:version", 100) == 102
+    assert first.incr("links:version", 100) == 103
+
+    first.set("links:all", "base")
+    assert second.set_if("links:all", "second", 60, lambda current: current == "base")
+    assert not first.set_if("links:all", "first", 60, lambda current: current == "base")
+    assert first.get("links:all") == "second"
+
+
+def test_concurrent_navigation_patches_from_two_workers_are_not_lost(workers, monkeypatch):
+    """A patch that raced with another worker's must not leave a current-looking snapshot missing a write."""
+    from app.domain import navigation
+    from app.utils import cache as cache_module
+
+    first, second = workers
+    monkeypatch.setattr(cache_module, "_cache_backend", first)
+    base = NavigationSnapshot(version=cache_module.get_links_version(), categories=())
+    cache_module.cache.set("links:all", base, ttl=60)
+
+    def patch_in_second_worker(snapshot):
+        # Worker two bumps and patches while worker one sits between its read and its write.
+        monkeypatch.setattr(cache_module, "_cache_backend", second)
+        navigation._patch_snapshot([lambda inner: inner.with_category_added("Second", False)])
+        monkeypatch.setattr(cache_module, "_cache_backend", first)
+        return snapshot.with_category_added("First", False)
+
+    navigation._patch_snapshot([patch_in_second_worker])
+
+    for backend in (first, second):
+        monkeypatch.setattr(cache_module, "_cache_backend", backend)
+        snapshot = cache_module.cache.get("links:all")
+        assert cache_module.get_links_version() == base.version + 2
+        if snapshot is not None and navigation._is_current_snapshot(snapshot):
+            assert {category["name"] for category in snapshot.categories} == {"First", "Second"}
+
+
+def test_writes_behind_a_busy_lock_are_queued_and_reads_degrade_to_misses(tmp_path):
+    """A held write lock must not stall callers; queued writes land in order once it is released."""
+    path = tmp_path / "cache" / "shared.sqlite3"
+    first = SharedCacheBackend(path, busy_timeout=0.01)
+    second = SharedCacheBackend(path, busy_timeout=0.01)
+    first.set("settings", "old")
+    first.set("links:version", 5)
+    assert second.get("settings") == "old"
+
+    blocker = sqlite3.connect(str(path), isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        started = time.monotonic()
+        first.set("settings", "new")
+        first.delete("links:version")
+        assert first.incr("links:counter", 0) is None
+        assert first.set_if("links:all", "snapshot", 60, lambda current: current is None) is False
+        assert time.monotonic() - started < 1
+        assert first.stats()["deferred_writes"] == 3
+        assert first.get("settings") is None
+        assert second.get("settings") == "old"
+    finally:
+        blocker.execute("COMMIT")
+        blocker.close()
+
+    for _ in range(200):
+        if not first._pending:
+            break
+        time.sleep(0.01)
+    try:
+        assert first.get("settings") == "new"
+        assert second.get("settings") == "new"
+        assert second.get("links:version") is None
+        assert second.get("links:counter") == 1
+        assert second.get("links:all") is None
+    finally:
+        first.close()
+        second.close()
@@ -0,0 +1,81 @@
+"""Visit ingest filter tests."""
+
+import ipaddress
+import random
+
+import pytest
+from sqlalchemy import select
+
+from app.config import get_settings
+from app.models import VisitLog
+from app.services.visit_filter import BOT, DENIED, HUMAN, MONITOR, VisitFilter, get_visit_filter
+
+BROWSER_UA = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/126.0 Safari/537.36"
+
+
+def test_classify_separates_humans_bots_and_monitors():
+    """User-agent patterns and CIDR lists should decide the traffic class."""
+    visit_filter = VisitFilter(
+        deny_networks=(ipaddress.ip_network("10.0.0.0/8"),),
+        allow_networks=(ipaddress.ip_network("192.168.1.0/24"),),
+        extra_bot_patterns=("internal-scanner",),
+    )
+
+    assert visit_filter.classify("203.0.113.5", BROWSER_UA) == HUMAN
+    assert visit_filter.classify("203.0.113.5", "Mozilla/5.0 (compatible; Googlebot/2.1)") == BOT
+    assert visit_filter.classify("203.0.113.5", "curl/8.4.0") == BOT
+    assert visit_filter.classify("203.0.113.5", "") == BOT
+    assert visit_filter.classify("203.0.113.5", "internal-scanner 1.0") == BOT
+    assert visit_filter.classify("203.0.113.5", "kube-probe/1.29") == MONITOR
+    assert visit_filter.classify("203.0.113.5", "Mozilla/5.0 (compatible; UptimeRobot/2.0)") == MONITOR
+    assert visit_filter.classify("203.0.113.5", "Mozilla/5.0 (compatible; bingpreview/2.0)") == BOT
+    assert visit_filter.classify("10.1.2.3", BROWSER_UA) == DENIED
+    assert visit_filter.should_record("192.168.1.20", "curl/8.4.0") is True
+    assert visit_filter.should_record("unknown", BROWSER_UA) is True
+
+
+def test_sampling_rates_and_counters():
+    """Each class should be sampled at its own rate and every decision counted."""
+    visit_filter = VisitFilter(bot_sample_rate=0.5, monitor_sample_rate=0.0, rng=random.Random(7))
+
+    bot_recorded = sum(visit_filter.should_record("203.0.113.5", "AhrefsBot/7.0") for _ in range(1000))
+    for _ in range(5):
+        visit_filter.should_record("203.0.113.5", "kube-probe/1.29")
+        visit_filter.should_record("203.0.113.5", BROWSER_UA)
+
+    assert 400 < bot_recorded < 600
+    snapshot = visit_filter.snapshot()
+    assert snapshot[BOT] == {"recorded": bot_recorded, "dropped": 1000 - bot_recorded}
+    assert snapshot[MONITOR] == {"recorded": 0, "dropped": 5}
+    assert snapshot[HUMAN] == {"recorded": 5, "dropped": 0}
+
+
+def test_generic_words_in_browser_user_agents_stay_human():
+    """Only named bot and monitor tools are matched, not words a browser UA may contain."""
+    visit_filter = VisitFilter()
+
+    assert visit_filter.classify("203.0.113.5", f"{BROWSER_UA} MonitorApp/3.1") == HUMAN
+    assert visit_filter.classify("203.0.113.5", f"{BROWSER_UA} PreviewBrowser/1.0") == HUMAN
+    assert visit_filter.classify("203.0.113.5", f"{BROWSER_UA} UptimeTracker/1.0") == HUMAN
+
+
+@pytest.mark.asyncio
+async def test_visit_filter_is_opt_in(client, test_db):
+    """Without ENABLE_VISIT_FILTER every page visit is logged, crawlers included."""
+    assert get_settings().enable_visit_filter is False
+    await client.get("/articles", headers={"User-Agent": "Mozilla/5.0 (compatible; bingbot/2.0)"})
+
+    visits = (await test_db.execute(select(VisitLog))).scalars().all()
+    assert len(visits) == 1
+
+
+@pytest.mark.asyncio
+async def test_page_visits_from_crawlers_are_not_written(client, test_db, monkeypatch):
+    """Filtered page visits should never reach the visit log."""
+    monkeypatch.setattr(get_settings(), "enable_visit_filter", True)
+    await client.get("/articles", headers={"User-Agent": "Mozilla/5.0 (compatible; bingbot/2.0)"})
+    await client.get("/articles", headers={"User-Agent": BROWSER_UA})
+
+    visits = (await test_db.execute(select(VisitLog))).scalars().all()
+    assert len(visits) == 1
+    assert get_visit_filter().snapshot()[BOT] == {"recorded": 0, "dropped": 1}
@@ -0,0 +1,109 @@
+"""Visit rollup and HyperLogLog tests."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core import HyperLogLog
+from app.database import Base
+from app.models import VisitLog, VisitRollupState
+from app.services.log import LogService
+from app.services.visit_stats import ROLLUP_STATE_NAME, VisitStatsService
+
+
+def test_hyperloglog_estimates_and_round_trips():
+    """Sketches should estimate cardinality closely and survive serialization."""
+    sketch = HyperLogLog()
+    for index in range(5000):
+        sketch.add(f"10.0.{index // 256}.{index % 256}")
+    sketch.add("10.0.0.0")
+
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.registers == sketch.registers
+    assert abs(restored.count() - 5000) < 5000 * 0.1
+
+    small = HyperLogLog()
+    small.add("127.0.0.1")
+    assert len(small.to_bytes()) < 10
+    assert HyperLogLog.from_bytes(small.to_bytes()).count() == 1
+
+
+@pytest.mark.asyncio
+async def test_rollup_is_incremental_and_survives_retention(test_db):
+    """Rollups should fold only new visits and keep history after cleanup."""
+    day = datetime(2026, 10, 1, 8, 30)
+    test_db.add_all(
+        [
+            VisitLog(ip="1.1.1.1", path="/", created_at=day),
+            VisitLog(ip="1.1.1.1", path="/", created_at=day + timedelta(minutes=10)),
+            VisitLog(ip="2.2.2.2", path="/articles/a", created_at=day + timedelta(hours=1)),
+        ]
+    )
+    await test_db.commit()
+    stats = VisitStatsService(test_db)
+
+    assert await stats.rollup() == 3
+    assert await stats.rollup() == 0
+    test_db.add(VisitLog(ip="3.3.3.3", path="/", created_at=day + timedelta(days=1)))
+    await test_db.commit()
+    assert await stats.rollup() == 1
+
+    await LogService(test_db).cleanup_old_visits(max_records=0)
+    await test_db.commit()
+
+    daily = await stats.get_trend("day", since=day, until=day + timedelta(days=1))
+    assert [(bucket["visits"], bucket["unique_ips"]) for bucket in daily["buckets"]] == [(3, 2), (1, 1)]
+    assert daily["total_visits"] == 4
+    assert daily["unique_ips"] == 3
+
+    hourly = await stats.get_trend("hour", path="/", since=day, until=day + timedelta(hours=1))
+    assert [bucket["visits"] for bucket in hourly["buckets"]] == [2, 0]
+
+    with pytest.raises(ValueError):
+        await stats.get_trend("week")
+
+
+@pytest.mark.asyncio
+async def test_rollups_from_two_workers_do_not_fold_visits_twice(tmp_path):
+    """A worker whose watermark was advanced by another worker must not re-fold those visits."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'rollup.db'}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    day = datetime(2026, 10, 1, 8, 30)
+    async with session_factory() as db:
+        # The migration seeds the state row; the workers only update it.
+        db.add(VisitRollupState(name=ROLLUP_STATE_NAME, watermark=0))
+        db.add_all([VisitLog(ip=f"1.1.1.{index}", path="/", created_at=day) for index in range(3)])
+        await db.commit()
+
+    class RacingStats(VisitStatsService):
+        async def _claim(self, expected, watermark):
+            # The other worker folds and commits after this one read the watermark.
+            async with session_factory() as other:
+                assert await VisitStatsService(other).rollup() == 3
+                await other.commit()
+            return await super()._claim(expected, watermark)
+
+    try:
+        async with session_factory() as db:
+            assert await RacingStats(db).rollup() == 0
+            await db.commit()
+            trend = await VisitStatsService(db).get_trend("day", since=day, until=day)
+        assert trend["total_visits"] == 3
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_visit_stats_endpoint_requires_auth_and_validates(client, auth_headers):
+    """The stats endpoint is private and rejects unknown granularities."""
+    assert (await client.get("/api/v1/logs/visits/stats")).status_code == 401
+
+    response = await client.get("/api/v1/logs/visits/stats?granularity=hour", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["buckets"]) == 24
+
+    response = await client.get("/api/v1/logs/visits/stats?granularity=week", headers=auth_headers)
+    assert response.status_code == 400